@@ -0,0 +1,75 @@
+# benchmarks/bench_env.py
+import sys
+import os
+import time
+import argparse
+import numpy as np
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.environments import TradingEnvironment
+from models.vec_environment import VectorTradingEnvironment
+
+def bench_env_step(n_rows=100000, n_features=13, n_steps=200000, seed=0, data=None):
+    """
+    Measure TradingEnvironment.step throughput with random actions
+
+    Args:
+        data: Dataset or feature matrix to step over; uniform noise of
+            (n_rows, n_features) when None
+
+    Returns:
+        float: Environment steps per second
+    """
+    rng = np.random.default_rng(seed)
+    if data is None:
+        data = rng.uniform(100, 200, (n_rows, n_features))
+    actions = rng.integers(0, 3, n_steps).tolist()
+
+    env = TradingEnvironment(data)
+    env.reset(seed=seed)
+
+    start = time.perf_counter()
+    for action in actions:
+        _, _, done, _, _ = env.step(action)
+        if done:
+            env.reset()
+    return n_steps / (time.perf_counter() - start)
+
+def bench_vec_env_step(n_rows=100000, n_features=13, n_steps=200000, n_envs=64, seed=0, data=None):
+    """
+    Measure VectorTradingEnvironment throughput with random actions
+
+    Args:
+        data: Dataset or feature matrix to step over; uniform noise of
+            (n_rows, n_features) when None
+
+    Returns:
+        float: Account steps per second (vector steps * n_envs)
+    """
+    rng = np.random.default_rng(seed)
+    if data is None:
+        data = rng.uniform(100, 200, (n_rows, n_features))
+    actions = rng.integers(0, 3, (max(n_steps // n_envs, 1), n_envs))
+
+    env = VectorTradingEnvironment(data, n_envs=n_envs, seed=seed)
+    env.reset()
+
+    start = time.perf_counter()
+    for step_actions in actions:
+        env.step(step_actions)
+    return actions.size / (time.perf_counter() - start)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="TradingEnvironment.step microbenchmark")
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--features', type=int, default=13)
+    parser.add_argument('--steps', type=int, default=200000)
+    parser.add_argument('--n-envs', type=int, default=64)
+    args = parser.parse_args()
+
+    rate = bench_env_step(args.rows, args.features, args.steps)
+    print(f"TradingEnvironment.step: {rate:,.0f} steps/sec")
+    rate = bench_vec_env_step(args.rows, args.features, args.steps, args.n_envs)
+    print(f"VectorTradingEnvironment.step ({args.n_envs} envs): {rate:,.0f} env steps/sec")
@@ -0,0 +1,78 @@
+# benchmarks/bench_inference.py
+import sys
+import os
+import time
+import argparse
+import numpy as np
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stable_baselines3 import PPO
+from models.vec_environment import VectorTradingEnvironment
+from models.inference import NumpyPolicy
+
+def make_model(n_features=13, seed=0):
+    """
+    Untrained PPO MlpPolicy with the trading observation layout (weights are random)
+    """
+    data = np.random.default_rng(seed).uniform(100, 200, (4096, n_features))
+    env = VectorTradingEnvironment(data, n_envs=4, seed=seed)
+    return PPO("MlpPolicy", env, n_steps=64, batch_size=64, seed=seed, device='cpu')
+
+def latency_percentiles(predict, observations):
+    """
+    Per-call latency of predict over single observations
+
+    Returns:
+        dict: p50_us and p99_us
+    """
+    timings = np.empty(len(observations))
+    for i, observation in enumerate(observations):
+        start = time.perf_counter()
+        predict(observation)
+        timings[i] = time.perf_counter() - start
+    return {'p50_us': float(np.percentile(timings, 50) * 1e6), 'p99_us': float(np.percentile(timings, 99) * 1e6)}
+
+def batch_throughput(predict, observations, repeats=5):
+    """
+    Observations per second for predict over the whole matrix
+    """
+    predict(observations)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        predict(observations)
+    return repeats * len(observations) / (time.perf_counter() - start)
+
+def bench_inference(n_features=13, n_single=2000, batch_size=100000, seed=0):
+    """
+    Compare PPO.predict with the exported NumpyPolicy
+
+    Returns:
+        dict: Per-backend single-call latency percentiles and batch throughput
+    """
+    model = make_model(n_features, seed)
+    policy = NumpyPolicy.from_sb3(model)
+    rng = np.random.default_rng(seed)
+    singles = rng.normal(size=(n_single, n_features + 3)).astype(np.float32)
+    batch = rng.normal(size=(batch_size, n_features + 3)).astype(np.float32)
+
+    results = {}
+    for name, single, batched in (
+        ('sb3', lambda obs: model.predict(obs, deterministic=True), lambda obs: model.predict(obs, deterministic=True)),
+        ('numpy', policy.predict_one, policy.predict)
+    ):
+        results[name] = latency_percentiles(single, singles)
+        results[name]['batch_obs_per_sec'] = batch_throughput(batched, batch)
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Policy inference latency and throughput: PPO.predict vs NumpyPolicy")
+    parser.add_argument('--features', type=int, default=13)
+    parser.add_argument('--single', type=int, default=2000)
+    parser.add_argument('--batch', type=int, default=100000)
+    args = parser.parse_args()
+
+    for name, stats in bench_inference(args.features, args.single, args.batch).items():
+        print(f"{name:>6}: p50 {stats['p50_us']:8.1f} us  p99 {stats['p99_us']:8.1f} us  "
+              f"batch {stats['batch_obs_per_sec']:,.0f} obs/sec")
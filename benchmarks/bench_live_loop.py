@@ -0,0 +1,116 @@
+# benchmarks/bench_live_loop.py
+import sys
+import os
+import time
+import asyncio
+import logging
+import argparse
+
+# Add project root to Python path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+from benchmarks.synthetic import PolicyAgent, synthetic_ohlcv
+from config.config import Config
+from data.market_feed import CCXTStreamSource, MarketDataFeed
+from data.universe import feature_columns
+from scripts.live_trading import WARM_UP_BARS, trading_loop
+from trading.live_trader import BTCLiveTrader
+from trading.simulator import SimulatedExchange
+from utils.indicators import IndicatorEngine
+
+async def run_live_loop(config, exchange, agent, timeframe='1m'):
+    """
+    Run scripts/live_trading.trading_loop against a SimulatedExchange until its replay ends
+
+    Returns:
+        list: The BTCLiveTrader of every symbol, drained
+    """
+    symbols = list(exchange.candles)
+    traders = [BTCLiveTrader(config, agent, exchange, symbols[0], 1.0 / len(symbols))]
+    traders += [
+        BTCLiveTrader(config, agent, exchange, symbol, 1.0 / len(symbols), traders[0].engine.rate_limiter)
+        for symbol in symbols[1:]
+    ]
+    feeds = []
+    for symbol in symbols:
+        feed = MarketDataFeed(CCXTStreamSource(symbol, timeframe, exchange), window_size=WARM_UP_BARS)
+        feed.warm_up(exchange.history(symbol))
+        feeds.append(feed)
+
+    await asyncio.gather(*(trader.start() for trader in traders))
+    feed_tasks = [asyncio.create_task(feed.run()) for feed in feeds]
+    logger = logging.getLogger('bench_live_loop')
+    logger.setLevel(logging.WARNING)
+    try:
+        await trading_loop(feeds, agent, traders, logger)
+    finally:
+        for feed_task in feed_tasks:
+            feed_task.cancel()
+        for trader in traders:
+            await trader.close(close_session=False)
+    return traders
+
+def bench_live_loop(n_bars=5000, n_symbols=2, latency=0.0, latency_jitter=0.0, bar_interval=0.001, seed=0):
+    """
+    Load-test the live decision loop offline on replayed synthetic candles
+
+    Every symbol's feed, the batched policy decision, the risk checks and
+    the async order pipeline run as in production; only the exchange is
+    simulated (fills with slippage and fees, configurable latency). Bars
+    arrive every bar_interval seconds; when the loop cannot keep up, bars
+    queue and the order latency (bar close to fill) grows. With
+    bar_interval 0 the replay is unpaced and decisions_per_sec is the
+    loop's capacity, but fills then lag the replay.
+
+    Returns:
+        dict: Decisions per second, order latency and fill costs
+    """
+    config = Config(os.path.join(ROOT, 'config.yaml'))
+    trading_params = config.TRADING_PARAMS
+    candles = {
+        f'SYN{i}/USDT': synthetic_ohlcv(WARM_UP_BARS + n_bars, seed + i) for i in range(n_symbols)
+    }
+    exchange = SimulatedExchange(
+        candles, balance=trading_params['initial_balance'], fee_rate=trading_params['trading_fee_rate'],
+        leverage=trading_params['leverage'], latency=latency, latency_jitter=latency_jitter,
+        start=WARM_UP_BARS, bar_interval=bar_interval, seed=seed
+    )
+    agent = PolicyAgent(len(feature_columns(IndicatorEngine())) + 3, seed=seed)
+
+    start = time.perf_counter()
+    traders = asyncio.run(run_live_loop(config, exchange, agent, trading_params['timeframe']))
+    elapsed = time.perf_counter() - start
+
+    decisions = sum(trader.metrics.bars + 1 for trader in traders)
+    latencies = [trader.engine.latency_report() for trader in traders]
+    return {
+        'decisions': decisions,
+        'decisions_per_sec': decisions / elapsed,
+        'orders': exchange.fills['orders'],
+        'failed_orders': sum(report['failed_orders'] for report in latencies),
+        'order_p50_ms': max(report.get('p50_ms', 0.0) for report in latencies),
+        'order_p99_ms': max(report.get('p99_ms', 0.0) for report in latencies),
+        'fill_costs': exchange.cost_report(),
+        'final_equity': exchange.equity()
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline load test of the live trading loop on a simulated exchange")
+    parser.add_argument('--bars', type=int, default=5000)
+    parser.add_argument('--symbols', type=int, default=2)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help="Median simulated network latency")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Lognormal sigma of the latency")
+    parser.add_argument('--bar-interval-ms', type=float, default=1.0, help="Time between replayed bars")
+    args = parser.parse_args()
+
+    result = bench_live_loop(
+        args.bars, args.symbols, args.latency_ms / 1000, args.jitter, args.bar_interval_ms / 1000
+    )
+    costs = result['fill_costs']
+    print(f"Decisions:       {result['decisions']:,} ({result['decisions_per_sec']:,.0f}/sec)")
+    print(f"Orders:          {result['orders']:,} filled, {result['failed_orders']:,} failed, "
+          f"p50 {result['order_p50_ms']:.2f} ms, p99 {result['order_p99_ms']:.2f} ms")
+    print(f"Fill costs:      fees {costs['fee_bps']:.2f} bps, slippage {costs['slippage_bps']:.2f} bps "
+          f"on {costs['notional']:,.0f} USDT")
+    print(f"Final equity:    {result['final_equity']:,.2f}")
@@ -0,0 +1,95 @@
+# benchmarks/bench_startup.py
+import sys
+import os
+import json
+import time
+import argparse
+import subprocess
+import tempfile
+import numpy as np
+
+# Add project root to Python path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+from models.inference import NumpyPolicy
+
+# Modules the live decision path must not pull in (ccxt only once an exchange client is built)
+HEAVY_MODULES = ('torch', 'stable_baselines3', 'matplotlib', 'pandas', 'ccxt')
+
+# Runs in a fresh interpreter: import of the live-trading script, then its warm start to the first decision
+WARM_START = """
+import sys, time, json
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+import scripts.live_trading as live_trading
+imported = time.perf_counter() - start
+import numpy as np
+agent = live_trading.BTCRLTrader(live_trading.Config())
+agent.load_policy({model_path!r})
+agent.predict_action(np.zeros(agent.policy.observation_size, dtype=np.float32))
+ready = time.perf_counter() - start
+heavy = sorted(m for m in {heavy!r} if m in sys.modules)
+import ccxt.pro
+print(json.dumps({{
+    'script_import_sec': imported,
+    'first_decision_sec': ready,
+    'with_exchange_client_sec': time.perf_counter() - start,
+    'heavy_modules': heavy
+}}))
+"""
+
+def make_artifact(directory, observation_size=16, hidden=(64, 64), seed=0):
+    """
+    Write a random-weight policy artifact shaped like the trained one
+
+    Returns:
+        str: Model path to pass to BTCRLTrader.load_policy
+    """
+    rng = np.random.default_rng(seed)
+    sizes = (observation_size,) + hidden + (3,)
+    policy = NumpyPolicy(
+        [rng.normal(size=(a, b)) for a, b in zip(sizes[:-1], sizes[1:])],
+        [rng.normal(size=b) for b in sizes[1:]]
+    )
+    model_path = os.path.join(directory, 'btc_trading_model')
+    policy.save(model_path + '_policy.npz')
+    return model_path
+
+def bench_startup(repeats=3):
+    """
+    Time a fresh process importing scripts/live_trading.py, up to the script's first decision
+
+    Returns:
+        dict: Best-of-repeats timings (seconds) and heavy modules imported
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        code = WARM_START.format(root=ROOT, model_path=make_artifact(tmp_dir), heavy=HEAVY_MODULES)
+        runs = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            output = subprocess.run([sys.executable, '-c', code], check=True, capture_output=True, text=True, cwd=ROOT).stdout
+            run = json.loads(output.strip().splitlines()[-1])
+            run['process_sec'] = time.perf_counter() - start
+            runs.append(run)
+    timings = ('script_import_sec', 'first_decision_sec', 'with_exchange_client_sec', 'process_sec')
+    best = {key: min(run[key] for run in runs) for key in timings}
+    best['heavy_modules'] = runs[0]['heavy_modules']
+    return best
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Live-trading warm start benchmark (fails on regression)")
+    parser.add_argument('--budget', type=float, default=0.5, help="Max seconds from script import to first decision")
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    result = bench_startup(args.repeats)
+    print(f"Script import:         {result['script_import_sec'] * 1000:.0f} ms")
+    print(f"First decision:        {result['first_decision_sec'] * 1000:.0f} ms")
+    print(f"With exchange client:  {result['with_exchange_client_sec'] * 1000:.0f} ms")
+    print(f"Whole process:         {result['process_sec'] * 1000:.0f} ms")
+    print(f"Heavy modules loaded:  {result['heavy_modules'] or 'none'}")
+
+    if result['heavy_modules'] or result['first_decision_sec'] > args.budget:
+        print(f"Startup regression (budget {args.budget:.2f}s, no {', '.join(HEAVY_MODULES)})")
+        sys.exit(1)
@@ -0,0 +1,276 @@
+# benchmarks/run_suite.py
+import sys
+import os
+import json
+import time
+import platform
+import argparse
+import subprocess
+import numpy as np
+
+# Add project root to Python path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+from benchmarks.bench_env import bench_env_step, bench_vec_env_step
+from benchmarks.bench_live_loop import bench_live_loop
+from benchmarks.synthetic import PolicyAgent, synthetic_dataset, synthetic_ohlcv
+from trading.backtester import BTCBacktester
+from utils.indicators import IndicatorEngine
+from utils.instrumentation import metrics
+from utils.performance_metrics import PerformanceMetrics, StreamingMetrics
+
+DEFAULT_BASELINE = os.path.join(ROOT, 'benchmarks', 'baseline.json')
+
+# Workload presets; --bars / --steps override the chosen one
+SIZES = {
+    'quick': {
+        'bars': 20000, 'env_steps': 20000, 'n_envs': 16, 'ppo_n_steps': 64, 'ppo_rollouts': 2, 'live_bars': 1000
+    },
+    'full': {
+        'bars': 200000, 'env_steps': 200000, 'n_envs': 64, 'ppo_n_steps': 128, 'ppo_rollouts': 4, 'live_bars': 10000
+    }
+}
+
+TRADING_PARAMS = {
+    'leverage': 3,
+    'max_trade_amount': 100,
+    'max_drawdown': 0.25,
+    'risk_per_trade': 0.01,
+    'atr_stop_multiple': 2.0,
+    'initial_balance': 10000,
+    'trading_fee_rate': 0.0004
+}
+
+def best_rate(run, units, repeats):
+    """
+    Best-of-repeats throughput of run(), which processes units items per call
+    """
+    best = np.inf
+    for _ in range(repeats):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return units / best
+
+def bench_indicators(ohlcv, repeats=3):
+    """
+    IndicatorEngine.compute_matrix rows per second (no feature cache)
+    """
+    engine = IndicatorEngine()
+    return best_rate(lambda: engine.compute_matrix(ohlcv[:, 2], ohlcv[:, 3], ohlcv[:, 4]), len(ohlcv), repeats)
+
+def bench_ppo_rollout(dataset, n_envs=16, n_steps=64, rollouts=2, seed=0):
+    """
+    PPO training throughput on VectorTradingEnvironment
+
+    Returns:
+        dict: ThroughputCallback report (env_steps_per_sec covers rollouts
+            only, overall_steps_per_sec includes the gradient updates)
+    """
+    from stable_baselines3 import PPO
+    from models.callbacks import ThroughputCallback
+    from models.vec_environment import VectorTradingEnvironment
+
+    env = VectorTradingEnvironment(dataset, n_envs=n_envs, episode_length=2048, seed=seed)
+    model = PPO("MlpPolicy", env, n_steps=n_steps, batch_size=64, n_epochs=10, seed=seed, device='cpu', verbose=0)
+    throughput = ThroughputCallback()
+    model.learn(total_timesteps=n_steps * n_envs * rollouts, callback=throughput)
+    return throughput.report
+
+def bench_backtest(dataset, repeats=3, seed=0):
+    """
+    BTCBacktester.run_on_arrays bars per second with a NumpyPolicy agent
+    """
+    agent = PolicyAgent(dataset.features.shape[-1] + 3, seed=seed)
+    backtester = BTCBacktester(agent, TRADING_PARAMS)
+    low, atr = dataset.column('low'), dataset.column('atr')
+    return best_rate(
+        lambda: backtester.run_on_arrays(dataset.features, dataset.prices, low, atr=atr), len(dataset), repeats
+    )
+
+def bench_metrics(equity, repeats=3):
+    """
+    PerformanceMetrics.summary and StreamingMetrics.update throughput
+
+    Returns:
+        dict: Equity points per second for the batch summary and the streaming accumulator
+    """
+    def stream():
+        streaming = StreamingMetrics()
+        for value in values:
+            streaming.update(value)
+        streaming.snapshot()
+
+    values = equity.tolist()
+    return {
+        'summary_points_per_sec': best_rate(lambda: PerformanceMetrics.summary(equity), len(equity), repeats),
+        'streaming_updates_per_sec': best_rate(stream, len(values), repeats)
+    }
+
+def environment_info():
+    """
+    Machine and code version the results were measured on
+    """
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count()
+    }
+
+def run_suite(size='quick', bars=None, env_steps=None, repeats=3, seed=0, include_ppo=True):
+    """
+    Run every pipeline benchmark on synthetic data
+
+    Instrumentation is switched off while measuring so the figures are the
+    code's own cost.
+
+    Args:
+        size (str): Workload preset in SIZES
+        bars (int): Synthetic 1m candles (overrides the preset)
+        env_steps (int): Steps for the environment benchmarks (overrides the preset)
+        repeats (int): Repetitions per benchmark; the fastest counts
+        include_ppo (bool): Also run the PPO rollout benchmark (needs torch)
+
+    Returns:
+        dict: 'environment', 'config' and 'results' (name -> {'value', 'unit'});
+            every value is a rate, higher is better
+    """
+    if size not in SIZES:
+        raise ValueError(f"Unknown benchmark size {size!r}, expected one of {sorted(SIZES)}")
+    config = dict(SIZES[size], size=size, repeats=repeats, seed=seed)
+    if bars is not None:
+        config['bars'] = bars
+    if env_steps is not None:
+        config['env_steps'] = env_steps
+
+    enabled = metrics.enabled
+    metrics.enabled = False
+    try:
+        ohlcv = synthetic_ohlcv(config['bars'], seed)
+        dataset = synthetic_dataset(config['bars'], seed)
+
+        results = {
+            'indicators.rows_per_sec': (bench_indicators(ohlcv, repeats), 'rows/sec'),
+            'env.steps_per_sec': (
+                max(bench_env_step(n_steps=config['env_steps'], seed=seed, data=dataset) for _ in range(repeats)),
+                'steps/sec'
+            ),
+            'vec_env.steps_per_sec': (
+                max(
+                    bench_vec_env_step(n_steps=config['env_steps'], n_envs=config['n_envs'], seed=seed, data=dataset)
+                    for _ in range(repeats)
+                ),
+                'steps/sec'
+            ),
+            'backtest.bars_per_sec': (bench_backtest(dataset, repeats, seed), 'bars/sec')
+        }
+        equity = 10000 * np.exp(np.cumsum(np.random.default_rng(seed).normal(0, 1e-4, config['bars'])))
+        for name, rate in bench_metrics(equity, repeats).items():
+            results[f'metrics.{name}'] = (rate, 'points/sec')
+        results['live.decisions_per_sec'] = (
+            bench_live_loop(config['live_bars'], bar_interval=0.0, seed=seed)['decisions_per_sec'], 'decisions/sec'
+        )
+        if include_ppo:
+            report = bench_ppo_rollout(
+                dataset, config['n_envs'], config['ppo_n_steps'], config['ppo_rollouts'], seed
+            )
+            results['ppo.rollout_steps_per_sec'] = (report['env_steps_per_sec'], 'steps/sec')
+            results['ppo.overall_steps_per_sec'] = (report['overall_steps_per_sec'], 'steps/sec')
+    finally:
+        metrics.enabled = enabled
+
+    return {
+        'environment': environment_info(),
+        'config': config,
+        'results': {name: {'value': float(value), 'unit': unit} for name, (value, unit) in results.items()}
+    }
+
+def compare(current, baseline, tolerance=0.2):
+    """
+    Compare two run_suite outputs benchmark by benchmark
+
+    A benchmark regresses when its rate falls more than tolerance (a
+    fraction) below the baseline's.
+
+    Returns:
+        list: (name, baseline value or None, current value, relative change, status)
+            with status 'ok', 'improved', 'regressed' or 'new'
+    """
+    rows = []
+    for name, result in current['results'].items():
+        value = result['value']
+        reference = baseline['results'].get(name)
+        if reference is None:
+            rows.append((name, None, value, None, 'new'))
+            continue
+        change = value / reference['value'] - 1
+        if change < -tolerance:
+            status = 'regressed'
+        elif change > tolerance:
+            status = 'improved'
+        else:
+            status = 'ok'
+        rows.append((name, reference['value'], value, change, status))
+    return rows
+
+def write_json(results, path):
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
+        f.write('\n')
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline data -> train -> backtest benchmark suite")
+    parser.add_argument('--size', choices=sorted(SIZES), default='full')
+    parser.add_argument('--quick', action='store_const', const='quick', dest='size', help="Same as --size quick")
+    parser.add_argument('--bars', type=int, help="Synthetic candles (overrides the size preset)")
+    parser.add_argument('--steps', type=int, help="Environment steps (overrides the size preset)")
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-ppo', action='store_true', help="Skip the PPO rollout benchmark")
+    parser.add_argument('--output', default='benchmark_results.json', help="Where to write this run's results")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="Stored results to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="Allowed slowdown as a fraction of baseline")
+    parser.add_argument('--save-baseline', action='store_true', help="Store this run as the new baseline")
+    args = parser.parse_args()
+
+    results = run_suite(args.size, args.bars, args.steps, args.repeats, args.seed, not args.no_ppo)
+    write_json(results, args.output)
+
+    if args.save_baseline:
+        write_json(results, args.baseline)
+        print(f"Saved baseline to {args.baseline}")
+
+    baseline = None
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline['config'] != results['config']:
+            print(f"Warning: baseline workload {baseline['config']} differs from this run's {results['config']}")
+
+    rows = compare(results, baseline, args.tolerance) if baseline else [
+        (name, None, result['value'], None, '') for name, result in results['results'].items()
+    ]
+    for name, reference, value, change, status in rows:
+        unit = results['results'][name]['unit']
+        line = f"{name:<36} {value:>14,.0f} {unit:<10}"
+        if reference is not None:
+            line += f" baseline {reference:>14,.0f} ({change:+.1%}) {status}"
+        elif status:
+            line += f" {status}"
+        print(line)
+
+    regressions = [row[0] for row in rows if row[4] == 'regressed']
+    if regressions:
+        print(f"Performance regression beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
@@ -0,0 +1,63 @@
+# benchmarks/synthetic.py
+import sys
+import os
+import numpy as np
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.dataset import TradingDataset
+from data.universe import build_features, feature_columns
+from models.inference import NumpyPolicy
+from utils.indicators import IndicatorEngine
+
+START = 1672531200000  # 2023-01-01 UTC
+MINUTE = 60000
+
+def synthetic_ohlcv(n_bars, seed=0, start=START, interval_ms=MINUTE, volatility=0.002):
+    """
+    Deterministic random-walk candles in the CandleStore layout
+
+    Returns:
+        np.ndarray: (n_bars, 6) timestamp, open, high, low, close, volume
+    """
+    rng = np.random.default_rng(seed)
+    close = 20000 * np.exp(np.cumsum(rng.normal(0, volatility, n_bars)))
+    open_ = np.r_[close[0], close[:-1]]
+    spread = np.abs(rng.normal(0, 10, n_bars))
+    return np.column_stack([
+        start + interval_ms * np.arange(n_bars), open_, np.maximum(open_, close) + spread,
+        np.minimum(open_, close) - spread, close, rng.uniform(1, 50, n_bars)
+    ])
+
+def synthetic_dataset(n_bars, seed=0, higher_timeframes=(), indicator_engine=None):
+    """
+    Single-symbol TradingDataset built from synthetic_ohlcv like a real load
+
+    Indicator warm-up rows are dropped, so the dataset is slightly shorter
+    than n_bars.
+    """
+    indicator_engine = indicator_engine or IndicatorEngine()
+    ohlcv = synthetic_ohlcv(n_bars, seed)
+    features = build_features(ohlcv, '1m', higher_timeframes, indicator_engine)
+    valid = ~np.isnan(features).any(axis=1)
+    return TradingDataset(
+        features[valid], feature_columns(indicator_engine, higher_timeframes), ohlcv[valid, 4],
+        ohlcv[valid, 0].astype(np.int64).astype('datetime64[ms]')
+    )
+
+class PolicyAgent:
+    """
+    Agent over a random-weight NumpyPolicy (the live inference path), for backtests and live-loop runs
+    """
+    def __init__(self, observation_size, hidden=(64, 64), seed=0):
+        rng = np.random.default_rng(seed)
+        sizes = (observation_size,) + hidden + (3,)
+        self.policy = NumpyPolicy(
+            [rng.normal(size=(a, b)) / np.sqrt(a) for a, b in zip(sizes[:-1], sizes[1:])],
+            [np.zeros(b) for b in sizes[1:]]
+        )
+        self.policy.rng = np.random.default_rng(seed)
+
+    def predict_actions(self, states, deterministic=True):
+        return self.policy.predict(states, deterministic)
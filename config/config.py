@@ -16,13 +16,26 @@ class Config:
         # Trading Specific
         self.TRADING_PARAMS = {
             'symbol': 'BTC/USDT',
+            'symbols': ['BTC/USDT'],  # Universe traded by one process (data, training, backtest, live)
             'timeframe': '1m',
+            'higher_timeframes': [],  # Resampled from timeframe and added as features, e.g. ['15m', '1h']
             'leverage': 10,
-            'max_trade_amount': 100,  # USDT
+            'max_trade_amount': 100,  # USDT notional per order
+            'max_drawdown': 0.25,  # Refuse new exposure beyond this drawdown from peak equity
+            'risk_per_trade': 0.01,  # Equity at risk on an atr_stop_multiple * ATR move
+            'atr_stop_multiple': 2.0,
             'initial_balance': 10000,
             'trading_fee_rate': 0.0004  # 0.04% per trade
         }
         
+        # Historical Data
+        self.DATA_PARAMS = {
+            'cache_dir': 'data_cache',  # Local candle store
+            'max_workers': 4,  # Concurrent backfill workers
+            'feature_cache_dir': 'feature_cache',
+            'feature_cache_max_bytes': 4 * 1024 ** 3
+        }
+        
         # RL Training Parameters
         self.RL_PARAMS = {
             'total_timesteps': 500000,
@@ -32,9 +45,59 @@ class Config:
             'learning_starts': 1000,
             'tau': 0.005,
             'gamma': 0.99,
+            'n_epochs': 10,
+            'gae_lambda': 0.95,
+            'clip_range': 0.2,
+            'ent_coef': 0.01,
             'train_freq': 4,
             'gradient_steps': 1,
-            'target_update_interval': 10000
+            'target_update_interval': 10000,
+            'vec_env': 'native',  # 'native' (single process) or 'subproc' (worker processes)
+            'n_workers': 4,  # Worker processes in 'subproc' mode
+            'n_envs': 64,  # Accounts stepped together by VectorTradingEnvironment
+            'n_steps': 128,  # Rollout length per account
+            'episode_length': 2048,  # Steps per episode, from a start chosen by episode_sampler
+            'episode_sampler': 'random',  # 'random' windows, 'volatility' (ATR-stratified) or 'walk_forward'
+            'volatility_strata': 4,  # ATR quantile buckets of the 'volatility' sampler
+            'lookback': 1,  # Feature rows per observation; > 1 stacks the last lookback bars
+            'normalize_lookback': True,  # Z-score each lookback window per feature
+            'normalize_features': True,  # Running z-score of the features, fitted on the training rows
+            'inference': 'numpy',  # 'numpy' (exported NumpyPolicy) or 'sb3' (PPO.predict)
+            'verbose': 1,
+            'tensorboard_log': './ppo_trading_logs/'
+        }
+        
+        # Checkpoints and checkpoint evaluation during training (models/checkpoints.py)
+        self.CHECKPOINT_PARAMS = {
+            'enabled': True,
+            'directory': './checkpoints/',  # One run directory per training run
+            'interval': 50000,  # Timesteps between checkpoints
+            'keep': 3,  # Most recent checkpoints kept, besides the best one
+            'evaluate': True,  # Backtest each checkpoint on the validation rows in a separate process
+            'metric': 'sharpe_ratio',  # Backtest result key to maximize for best-model selection
+            'load_best': True  # Finish train() on the best checkpoint instead of the last weights
+        }
+        
+        # Hyperparameter search (models/tuning.py)
+        self.TUNING_PARAMS = {
+            'study_name': 'btc_ppo',
+            'storage': 'sqlite:///optuna_study.db',  # Resumable study store
+            'n_trials': 50,  # Total finished trials, including those of earlier runs
+            'n_workers': 4,  # Trial processes
+            'eval_interval': 50000,  # Timesteps between intermediate validation scores
+            'metric': 'sharpe_ratio',  # Backtest result key to maximize
+            'validation_fraction': 0.2  # Tail of the training data used for scoring
+        }
+    
+        # Instrumentation (utils/instrumentation.py)
+        self.MONITORING_PARAMS = {
+            'enabled': True,  # Counters and latency histograms on the hot paths
+            'metrics_path': 'metrics.json',  # Snapshot file, rewritten every export_interval seconds
+            'export_interval': 60,
+            'metrics_port': None,  # Serve /metrics and /metrics.json on localhost when set (0 picks a free port)
+            'profile': False,  # Opt-in sampling profiler for the whole run
+            'profile_path': 'profile.folded',  # Folded stacks for flamegraph.pl / speedscope
+            'profile_interval': 0.005  # Seconds between profiler samples
         }
     
     def get(self, key):
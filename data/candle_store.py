@@ -0,0 +1,124 @@
+import json
+import os
+import numpy as np
+
+OHLCV_WIDTH = 6  # timestamp, open, high, low, close, volume
+
+
+class CandleStore:
+    """
+    On-disk OHLCV cache with one memory-mapped .npy partition per month
+
+    Layout: <root>/<symbol>/<timeframe>/<YYYY-MM>.npy plus a coverage.json
+    listing the [start, end) millisecond ranges that have been synced from
+    the exchange, so gaps in the market itself are not refetched.
+    """
+    def __init__(self, root='data_cache'):
+        self.root = root
+
+    def read(self, symbol, timeframe, start_timestamp, end_timestamp):
+        """
+        Read cached candles in [start_timestamp, end_timestamp)
+
+        Returns:
+            np.ndarray: (n, 6) OHLCV rows sorted by timestamp
+        """
+        parts = []
+        for month in self._months(start_timestamp, end_timestamp - 1):
+            path = self._partition_path(symbol, timeframe, month)
+            if not os.path.exists(path):
+                continue
+            partition = np.load(path, mmap_mode='r')
+            lo, hi = np.searchsorted(partition[:, 0], [start_timestamp, end_timestamp])
+            parts.append(partition[lo:hi])
+
+        if not parts:
+            return np.empty((0, OHLCV_WIDTH))
+        return np.concatenate(parts)
+
+    def write(self, symbol, timeframe, ohlcv, start_timestamp, end_timestamp):
+        """
+        Merge candles into their monthly partitions and mark [start, end) as synced
+        """
+        ohlcv = np.asarray(ohlcv, dtype=np.float64).reshape(-1, OHLCV_WIDTH)
+        months = self._month_keys(ohlcv[:, 0])
+        for month in np.unique(months):
+            path = self._partition_path(symbol, timeframe, str(month))
+            rows = ohlcv[months == month]
+            if os.path.exists(path):
+                # New rows first so they win over stale copies of the same candle
+                rows = np.concatenate([rows, np.load(path)])
+            _, first_index = np.unique(rows[:, 0], return_index=True)
+            self._atomic_save(path, rows[first_index])
+
+        covered = self.coverage(symbol, timeframe) + [[int(start_timestamp), int(end_timestamp)]]
+        self._save_coverage(symbol, timeframe, self._merge_ranges(covered))
+
+    def coverage(self, symbol, timeframe):
+        """
+        Synced [start, end) ranges for a symbol and timeframe
+        """
+        path = os.path.join(self._series_dir(symbol, timeframe), 'coverage.json')
+        if not os.path.exists(path):
+            return []
+        with open(path, 'r') as f:
+            return json.load(f)
+
+    def missing_ranges(self, symbol, timeframe, start_timestamp, end_timestamp):
+        """
+        Sub-ranges of [start_timestamp, end_timestamp) not yet synced
+        """
+        missing = []
+        cursor = start_timestamp
+        for covered_start, covered_end in self.coverage(symbol, timeframe):
+            if covered_end <= cursor:
+                continue
+            if covered_start >= end_timestamp:
+                break
+            if covered_start > cursor:
+                missing.append((cursor, covered_start))
+            cursor = max(cursor, covered_end)
+        if cursor < end_timestamp:
+            missing.append((cursor, end_timestamp))
+        return missing
+
+    def _series_dir(self, symbol, timeframe):
+        return os.path.join(self.root, symbol.replace('/', '_'), timeframe)
+
+    def _partition_path(self, symbol, timeframe, month):
+        return os.path.join(self._series_dir(symbol, timeframe), f'{month}.npy')
+
+    def _save_coverage(self, symbol, timeframe, ranges):
+        path = os.path.join(self._series_dir(symbol, timeframe), 'coverage.json')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(ranges, f)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _atomic_save(path, array):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.save(f, array)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _month_keys(timestamps):
+        return np.asarray(timestamps, dtype=np.int64).astype('datetime64[ms]').astype('datetime64[M]')
+
+    @classmethod
+    def _months(cls, first_timestamp, last_timestamp):
+        first, last = cls._month_keys([first_timestamp, last_timestamp])
+        return [str(month) for month in np.arange(first, last + 1)]
+
+    @staticmethod
+    def _merge_ranges(ranges):
+        merged = []
+        for start, end in sorted(ranges):
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        return merged
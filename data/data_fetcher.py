@@ -1,55 +1,237 @@
-import ccxt
-import pandas as pd
+import logging
+import threading
+import time
 import numpy as np
-from datetime import datetime, timedelta
-import ta  # Technical Analysis Library
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from utils.indicators import IndicatorEngine
+from utils.instrumentation import metrics
+
+OHLCV_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+
+class BackfillError(Exception):
+    """
+    Raised when some backfill chunks could not be fetched
+
+    Chunks that did succeed are kept on the fetcher, so calling
+    fetch_ohlcv_range again with the same range only retries the failures.
+    """
+    def __init__(self, failed_chunks):
+        self.failed_chunks = failed_chunks
+        super().__init__(
+            f"{len(failed_chunks)} backfill chunk(s) failed: "
+            + ", ".join(f"[{start}, {end}): {error}" for (start, end), error in failed_chunks.items())
+        )
+
 
 class BTCDataFetcher:
-    def __init__(self, symbol='BTC/USDT', timeframe='1m'):
-        self.exchange = ccxt.binance({
-            'enableRateLimit': True,
-            'options': {
-                'defaultType': 'future'  # Futures market
-            }
-        })
+    # Candles requested per fetch_ohlcv call (Binance caps klines at 1000)
+    PAGE_LIMIT = 1000
+    # Pages per chunk handed to a worker
+    CHUNK_PAGES = 10
+    MAX_RETRIES = 3
+    RETRY_BACKOFF = 1.0  # seconds, doubled on each retry
+
+    def __init__(self, symbol='BTC/USDT', timeframe='1m', exchange=None, max_workers=4, store=None, feature_cache=None):
+        # Imported here so scripts importing this module start without ccxt
+        import ccxt
+
+        if exchange is None:
+            exchange = ccxt.binance({
+                'enableRateLimit': True,
+                'options': {
+                    'defaultType': 'future'  # Futures market
+                }
+            })
+        self.exchange = exchange
         self.symbol = symbol
         self.timeframe = timeframe
-    
+        self.timeframe_ms = ccxt.Exchange.parse_timeframe(timeframe) * 1000
+        self.max_workers = max_workers
+        self.store = store
+        self.feature_cache = feature_cache
+        self.logger = logging.getLogger(__name__)
+
+        # Shared request throttle for all workers, spaced by the exchange rate limit
+        self._rate_limit_lock = threading.Lock()
+        self._next_request_time = 0.0
+
+        # Chunks fetched by earlier (possibly failed) backfills, keyed by (start, end)
+        self._completed_chunks = {}
+
     def fetch_historical_btc_data(self, start_date, end_date, include_advanced_features=True):
         """
         Fetch comprehensive BTC historical data with advanced features
-        
+
         Args:
-            start_date (str): Start date in 'YYYY-MM-DD'
-            end_date (str): End date in 'YYYY-MM-DD'
+            start_date (str): Start date in 'YYYY-MM-DD' (UTC, inclusive)
+            end_date (str): End date in 'YYYY-MM-DD' (UTC, exclusive)
             include_advanced_features (bool): Add technical indicators
-        
+
         Returns:
             pd.DataFrame: Comprehensive BTC OHLCV data
         """
-        start_timestamp = int(datetime.strptime(start_date, '%Y-%m-%d').timestamp() * 1000)
-        end_timestamp = int(datetime.strptime(end_date, '%Y-%m-%d').timestamp() * 1000)
-        
+        import pandas as pd
+
+        start_timestamp = self._date_to_timestamp(start_date)
+        end_timestamp = self._date_to_timestamp(end_date)
+
         # Fetch OHLCV data
-        ohlcv = self.exchange.fetch_ohlcv(
-            symbol=self.symbol, 
-            timeframe=self.timeframe, 
-            since=start_timestamp
-        )
-        
-        df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        ohlcv = self.load_ohlcv(start_timestamp, end_timestamp)
+
+        df = pd.DataFrame(ohlcv, columns=OHLCV_COLUMNS)
+        df['timestamp'] = pd.to_datetime(df['timestamp'].astype(np.int64), unit='ms')
         df.set_index('timestamp', inplace=True)
-        
+
         if include_advanced_features:
-            # Advanced Technical Indicators
-            df['rsi'] = ta.momentum.RSIIndicator(df['close']).rsi()
-            df['macd'] = ta.trend.MACD(df['close']).macd()
-            df['atr'] = ta.volatility.AverageTrueRange(df['high'], df['low'], df['close']).average_true_range()
-            
-            # Bollinger Bands
-            bollinger = ta.volatility.BollingerBands(df['close'])
-            df['bb_high'] = bollinger.bollinger_hband()
-            df['bb_low'] = bollinger.bollinger_lband()
-        
+            # Advanced Technical Indicators (moving averages, RSI, MACD, Bollinger Bands, ATR)
+            IndicatorEngine(cache=self.feature_cache).add_indicators(df)
+
         return df
+
+    @metrics.timed('fetch.load_ohlcv')
+    def load_ohlcv(self, start_timestamp, end_timestamp):
+        """
+        Load candles in [start_timestamp, end_timestamp), local store first
+
+        Without a store this is a plain backfill. With one, only the ranges the
+        store has not synced yet are fetched from the exchange and written back;
+        the still-open candle is never cached.
+        """
+        if self.store is None:
+            return self.fetch_ohlcv_range(start_timestamp, end_timestamp)
+
+        current_candle_start = int(time.time() * 1000) // self.timeframe_ms * self.timeframe_ms
+        end_timestamp = min(end_timestamp, current_candle_start)
+
+        for gap_start, gap_end in self.store.missing_ranges(self.symbol, self.timeframe, start_timestamp, end_timestamp):
+            self.logger.info(f"Syncing {self.symbol} {self.timeframe} candles [{gap_start}, {gap_end}) into local store")
+            ohlcv = self.fetch_ohlcv_range(gap_start, gap_end)
+            self.store.write(self.symbol, self.timeframe, ohlcv, gap_start, gap_end)
+
+        return self.store.read(self.symbol, self.timeframe, start_timestamp, end_timestamp)
+
+    def fetch_ohlcv_range(self, start_timestamp, end_timestamp):
+        """
+        Backfill every candle in [start_timestamp, end_timestamp)
+
+        The range is split into chunks of CHUNK_PAGES pages which are fetched
+        concurrently by up to max_workers threads. Every request goes through
+        a shared throttle that follows the exchange rate limit.
+
+        Args:
+            start_timestamp (int): Range start in epoch milliseconds
+            end_timestamp (int): Range end in epoch milliseconds
+
+        Returns:
+            np.ndarray: (n, 6) OHLCV rows sorted by timestamp, without duplicates
+
+        Raises:
+            BackfillError: If any chunk still fails after MAX_RETRIES attempts
+        """
+        chunks = self._split_range(start_timestamp, end_timestamp)
+        pending = [chunk for chunk in chunks if chunk not in self._completed_chunks]
+        if len(pending) < len(chunks):
+            self.logger.info(f"Resuming backfill: {len(chunks) - len(pending)}/{len(chunks)} chunks already fetched")
+
+        failed_chunks = {}
+        if pending:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(pending))) as pool:
+                futures = {pool.submit(self._fetch_chunk, *chunk): chunk for chunk in pending}
+                for future in as_completed(futures):
+                    chunk = futures[future]
+                    try:
+                        self._completed_chunks[chunk] = future.result()
+                    except Exception as e:
+                        failed_chunks[chunk] = e
+
+        if failed_chunks:
+            raise BackfillError(failed_chunks)
+
+        ohlcv = self._merge_chunks([self._completed_chunks.pop(chunk) for chunk in chunks])
+        in_range = (ohlcv[:, 0] >= start_timestamp) & (ohlcv[:, 0] < end_timestamp)
+        return ohlcv[in_range]
+
+    def _split_range(self, start_timestamp, end_timestamp):
+        """
+        Split a time range into contiguous (start, end) chunks
+        """
+        chunk_ms = self.timeframe_ms * self.PAGE_LIMIT * self.CHUNK_PAGES
+        return [
+            (chunk_start, min(chunk_start + chunk_ms, end_timestamp))
+            for chunk_start in range(start_timestamp, end_timestamp, chunk_ms)
+        ]
+
+    def _fetch_chunk(self, chunk_start, chunk_end):
+        """
+        Fetch all pages of a single chunk, retrying transient network errors
+        """
+        rows = []
+        since = chunk_start
+        while since < chunk_end:
+            page = self._fetch_page(since)
+            if not page:
+                break
+            rows.extend(row for row in page if row[0] < chunk_end)
+
+            next_since = page[-1][0] + self.timeframe_ms
+            if next_since <= since:
+                break
+            since = next_since
+
+        return np.asarray(rows, dtype=np.float64).reshape(-1, len(OHLCV_COLUMNS))
+
+    def _fetch_page(self, since):
+        """
+        Fetch one page of candles with rate limiting and exponential backoff
+        """
+        import ccxt
+
+        for attempt in range(self.MAX_RETRIES):
+            self._throttle()
+            try:
+                with metrics.timer('fetch.request'):
+                    page = self.exchange.fetch_ohlcv(
+                        symbol=self.symbol,
+                        timeframe=self.timeframe,
+                        since=since,
+                        limit=self.PAGE_LIMIT
+                    )
+                metrics.count('fetch.candles', len(page))
+                return page
+            except ccxt.NetworkError as e:
+                metrics.count('fetch.errors')
+                if attempt == self.MAX_RETRIES - 1:
+                    raise
+                delay = self.RETRY_BACKOFF * 2 ** attempt
+                self.logger.warning(f"fetch_ohlcv since={since} failed ({e}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+
+    def _throttle(self):
+        """
+        Block until the next request slot allowed by the exchange rate limit
+        """
+        interval = getattr(self.exchange, 'rateLimit', 0) / 1000
+        with self._rate_limit_lock:
+            now = time.monotonic()
+            wait = self._next_request_time - now
+            self._next_request_time = max(now, self._next_request_time) + interval
+        if wait > 0:
+            time.sleep(wait)
+
+    @staticmethod
+    def _merge_chunks(chunks):
+        """
+        Concatenate chunk arrays in timestamp order, keeping the first copy of duplicate candles
+        """
+        ohlcv = np.concatenate(chunks) if chunks else np.empty((0, len(OHLCV_COLUMNS)))
+        _, first_index = np.unique(ohlcv[:, 0], return_index=True)
+        return ohlcv[first_index]
+
+    @staticmethod
+    def _date_to_timestamp(date):
+        """
+        Convert a 'YYYY-MM-DD' UTC date to epoch milliseconds
+        """
+        return int(datetime.strptime(date, '%Y-%m-%d').replace(tzinfo=timezone.utc).timestamp() * 1000)
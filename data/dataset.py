@@ -0,0 +1,158 @@
+import json
+import os
+import numpy as np
+
+
+class TradingDataset:
+    """
+    Compact training data: float32 feature matrix, named column offsets and a separate price vector
+
+    features is C-contiguous float32 (optionally a read-only memory map) and
+    prices holds the float64 fill price per row, so environments never guess
+    which feature column is the close. Row slices and splits are views that
+    share memory with the parent.
+
+    A universe of symbols on a shared time index (see data.universe) has
+    (n, n_symbols, n_features) features and (n, n_symbols) prices.
+
+    Args:
+        features (np.ndarray): (n, n_features) or (n, n_symbols, n_features) observation features
+        columns (list): Feature column names, in matrix order
+        prices (np.ndarray): (n,) or (n, n_symbols) fill prices (close)
+        index (np.ndarray): Optional (n,) row timestamps
+        symbols (list): Symbol names of a universe dataset
+    """
+    def __init__(self, features, columns, prices, index=None, symbols=None):
+        self.features = features if features.dtype == np.float32 and features.flags.c_contiguous \
+            else np.ascontiguousarray(features, dtype=np.float32)
+        self.prices = np.asarray(prices, dtype=np.float64)
+        self.index = index
+        self.columns = list(columns)
+        self.offsets = {name: i for i, name in enumerate(self.columns)}
+        self.symbols = None if symbols is None else list(symbols)
+        if self.features.shape != self.prices.shape + (len(self.columns),):
+            raise ValueError(f"Feature matrix {self.features.shape} does not match "
+                             f"{self.prices.shape} prices and {len(self.columns)} columns")
+        if self.symbols is not None and self.prices.shape[1:] != (len(self.symbols),):
+            raise ValueError(f"Prices {self.prices.shape} do not match {len(self.symbols)} symbols")
+
+    @classmethod
+    def from_frame(cls, df, price_column='close', dropna=True):
+        """
+        Build from an OHLCV + indicator DataFrame, column by column
+
+        Rows with a NaN in any column (indicator warm-up) are dropped when
+        dropna is set; the float32 matrix is filled one column at a time so
+        no float64 copy of the whole frame is made.
+        """
+        columns = list(df.columns)
+        valid = np.ones(len(df), dtype=bool)
+        if dropna:
+            for name in columns:
+                valid &= ~np.isnan(df[name].to_numpy(dtype=np.float64))
+
+        n_rows = int(valid.sum())
+        features = np.empty((n_rows, len(columns)), dtype=np.float32)
+        for i, name in enumerate(columns):
+            features[:, i] = df[name].to_numpy()[valid]
+
+        return cls(
+            features,
+            columns,
+            df[price_column].to_numpy(dtype=np.float64)[valid],
+            np.asarray(df.index)[valid]
+        )
+
+    def __len__(self):
+        return len(self.prices)
+
+    def __array__(self, dtype=None, copy=None):
+        return self.features if dtype is None else self.features.astype(dtype)
+
+    @property
+    def shape(self):
+        return self.features.shape
+
+    @property
+    def nbytes(self):
+        return self.features.nbytes + self.prices.nbytes
+
+    @property
+    def n_symbols(self):
+        return 1 if self.prices.ndim == 1 else self.prices.shape[1]
+
+    def column(self, name):
+        """
+        View of one feature column, (n,) or (n, n_symbols)
+        """
+        return self.features[..., self.offsets[name]]
+
+    def symbol(self, name):
+        """
+        Single-symbol dataset for one member of a universe (a compacted copy)
+        """
+        i = self.symbols.index(name)
+        return TradingDataset(self.features[:, i], self.columns, self.prices[:, i], self.index)
+
+    def slice(self, start=None, stop=None):
+        """
+        Rows [start, stop) as a dataset view (no copy)
+        """
+        return TradingDataset(
+            self.features[start:stop],
+            self.columns,
+            self.prices[start:stop],
+            None if self.index is None else self.index[start:stop],
+            self.symbols
+        )
+
+    def split(self, train_fraction=0.8, validation_fraction=0.0):
+        """
+        Chronological train / validation / test views
+
+        Returns:
+            tuple: (train, validation, test) TradingDatasets; validation is
+                empty when validation_fraction is 0
+        """
+        n_rows = len(self)
+        train_end = int(n_rows * train_fraction)
+        validation_end = train_end + int(n_rows * validation_fraction)
+        if validation_end > n_rows:
+            raise ValueError("train_fraction + validation_fraction exceeds 1")
+        return self.slice(0, train_end), self.slice(train_end, validation_end), self.slice(validation_end, None)
+
+    def save(self, directory):
+        """
+        Write the dataset as .npy files plus column metadata
+        """
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, 'features.npy'), self.features)
+        np.save(os.path.join(directory, 'prices.npy'), self.prices)
+        if self.index is not None:
+            np.save(os.path.join(directory, 'index.npy'), self.index)
+        with open(os.path.join(directory, 'columns.json'), 'w') as f:
+            json.dump(self.columns, f)
+        if self.symbols is not None:
+            with open(os.path.join(directory, 'symbols.json'), 'w') as f:
+                json.dump(self.symbols, f)
+
+    @classmethod
+    def load(cls, directory, mmap_mode='r'):
+        """
+        Load a saved dataset, memory-mapped by default so it is paged in on demand
+        """
+        with open(os.path.join(directory, 'columns.json')) as f:
+            columns = json.load(f)
+        symbols = None
+        symbols_path = os.path.join(directory, 'symbols.json')
+        if os.path.exists(symbols_path):
+            with open(symbols_path) as f:
+                symbols = json.load(f)
+        index_path = os.path.join(directory, 'index.npy')
+        return cls(
+            np.load(os.path.join(directory, 'features.npy'), mmap_mode=mmap_mode),
+            columns,
+            np.load(os.path.join(directory, 'prices.npy'), mmap_mode=mmap_mode),
+            np.load(index_path, mmap_mode=mmap_mode, allow_pickle=False) if os.path.exists(index_path) else None,
+            symbols
+        )
@@ -0,0 +1,212 @@
+import asyncio
+import logging
+import time
+import numpy as np
+from data.universe import TimeframeAggregator, feature_columns
+from utils.indicators import IndicatorEngine
+from utils.instrumentation import metrics
+
+OHLCV_WIDTH = 6  # timestamp, open, high, low, close, volume
+
+
+class CandleWindow:
+    """
+    Fixed-capacity ring buffer of closed OHLCV candles
+    """
+    def __init__(self, capacity=1000):
+        self.capacity = capacity
+        self._rows = np.zeros((capacity, OHLCV_WIDTH))
+        self._next = 0
+        self.size = 0
+
+    def append(self, candle):
+        self._rows[self._next] = candle
+        self._next = (self._next + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def latest(self):
+        return self._rows[(self._next - 1) % self.capacity]
+
+    def to_array(self):
+        """
+        Candles oldest first (a copy)
+        """
+        if self.size < self.capacity:
+            return self._rows[:self.size].copy()
+        return np.roll(self._rows, -self._next, axis=0)
+
+
+class BarClose:
+    """
+    Event pushed to the decision loop when a candle closes
+
+    features holds OHLCV, the indicator columns and any higher-timeframe
+    blocks, in MarketDataFeed.columns order; closed_at is the perf_counter
+    time the feed saw the close, for decision-latency measurement. window
+    holds the last lookback feature rows, oldest first, when the feed keeps
+    a lookback (None otherwise).
+    """
+    __slots__ = ('candle', 'features', 'closed_at', 'window')
+
+    def __init__(self, candle, features, closed_at, window=None):
+        self.candle = candle
+        self.features = features
+        self.closed_at = closed_at
+        self.window = window
+
+    @property
+    def timestamp(self):
+        return int(self.candle[0])
+
+    @property
+    def close(self):
+        return float(self.candle[4])
+
+
+class ReplaySource:
+    """
+    Replays stored candles (e.g. from CandleStore.read) as closed bars
+
+    Args:
+        ohlcv (np.ndarray): (n, 6) candles
+        interval (float): Seconds between bars; 0 replays as fast as the consumer reads
+    """
+    def __init__(self, ohlcv, interval=0.0):
+        self.ohlcv = np.asarray(ohlcv, dtype=np.float64)
+        self.interval = interval
+
+    async def stream(self):
+        for candle in self.ohlcv:
+            if self.interval:
+                await asyncio.sleep(self.interval)
+            yield candle, True
+
+    async def close(self):
+        pass
+
+
+class CCXTStreamSource:
+    """
+    Live candles from an exchange websocket via ccxt.pro watch_ohlcv
+
+    ccxt does not expose the kline 'closed' flag, so a candle is reported
+    closed when the first update for the next candle arrives. In-progress
+    updates are yielded with closed=False so the feed can track the last price.
+    """
+    def __init__(self, symbol='BTC/USDT', timeframe='1m', exchange=None):
+        if exchange is None:
+            import ccxt.pro
+            exchange = ccxt.pro.binance({
+                'enableRateLimit': True,
+                'options': {
+                    'defaultType': 'future'
+                }
+            })
+        self.exchange = exchange
+        self.symbol = symbol
+        self.timeframe = timeframe
+
+    async def stream(self):
+        current = None
+        while True:
+            for candle in await self.exchange.watch_ohlcv(self.symbol, self.timeframe):
+                if current is not None and candle[0] > current[0]:
+                    yield np.asarray(current, dtype=np.float64), True
+                if current is None or candle[0] >= current[0]:
+                    current = candle
+                    yield np.asarray(candle, dtype=np.float64), False
+
+    async def close(self):
+        await self.exchange.close()
+
+
+class MarketDataFeed:
+    """
+    Rolling in-memory market state fed by a streaming source
+
+    Keeps a CandleWindow of closed candles, streaming indicator state (O(1)
+    per bar) and the last traded price, and pushes a BarClose event to
+    subscribers as soon as a candle closes. Higher timeframes are
+    aggregated from the closed candles as they arrive, matching the
+    offline features of data.universe.build_features. With lookback > 1 the
+    feature rows of the last lookback closes (warm-up included) are kept
+    for lookback-window observations.
+    """
+    def __init__(self, source, window_size=1000, indicator_engine=None, timeframe='1m', higher_timeframes=(),
+                 lookback=1):
+        self.source = source
+        self.window = CandleWindow(window_size)
+        self.indicator_engine = indicator_engine or IndicatorEngine()
+        self.indicators = self.indicator_engine.stream()
+        self.higher_timeframes = list(higher_timeframes)
+        self.aggregators = [
+            TimeframeAggregator(higher, timeframe, self.indicator_engine) for higher in self.higher_timeframes
+        ]
+        self.lookback = lookback
+        self._feature_rows = None
+        self._feature_next = 0
+        self.last_price = None
+        self.last_update = None
+        self._queue = asyncio.Queue()
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def columns(self):
+        """
+        Names of the BarClose.features entries
+        """
+        return feature_columns(self.indicator_engine, self.higher_timeframes)
+
+    def warm_up(self, ohlcv):
+        """
+        Seed the window and indicator state with historical candles (oldest first)
+        """
+        for candle in np.asarray(ohlcv, dtype=np.float64):
+            self._on_closed(candle, publish=False)
+
+    async def run(self):
+        """
+        Consume the source until it ends, publishing bar-close events
+        """
+        try:
+            async for candle, closed in self.source.stream():
+                self.last_price = float(candle[4])
+                self.last_update = time.time()
+                if closed:
+                    self._on_closed(candle, publish=True)
+        finally:
+            await self._queue.put(None)
+
+    async def bars(self):
+        """
+        Async iterator over BarClose events; ends when the source is exhausted
+        """
+        while True:
+            event = await self._queue.get()
+            if event is None:
+                return
+            yield event
+
+    @metrics.timed('features.stream_update')
+    def _on_closed(self, candle, publish):
+        if self.window.size and candle[0] <= self.window.latest()[0]:
+            return  # Duplicate or out-of-order close
+        self.window.append(candle)
+        indicators = self.indicators.update(candle[2], candle[3], candle[4])
+        blocks = [aggregator.update(candle) for aggregator in self.aggregators]
+        if not publish and self.lookback == 1:
+            return
+        features = np.concatenate([candle[1:], indicators, *blocks]).astype(np.float32)
+        window = self._remember(features) if self.lookback > 1 else None
+        if publish:
+            self._queue.put_nowait(BarClose(candle.copy(), features, time.perf_counter(), window))
+
+    def _remember(self, features):
+        """
+        Add a feature row to the lookback ring and return the last lookback rows, oldest first
+        """
+        if self._feature_rows is None:
+            self._feature_rows = np.full((self.lookback, len(features)), np.nan, dtype=np.float32)
+        self._feature_rows[self._feature_next] = features
+        self._feature_next = (self._feature_next + 1) % self.lookback
+        return np.roll(self._feature_rows, -self._feature_next, axis=0)
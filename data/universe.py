@@ -0,0 +1,297 @@
+import logging
+import numpy as np
+from data.dataset import TradingDataset
+from utils.indicators import IndicatorEngine
+from utils.performance_metrics import timeframe_minutes
+
+OHLCV_FIELDS = ['open', 'high', 'low', 'close', 'volume']
+
+
+def timeframe_ms(timeframe):
+    """
+    Length of a ccxt-style timeframe in milliseconds
+    """
+    return timeframe_minutes(timeframe) * 60 * 1000
+
+
+def feature_columns(indicator_engine, higher_timeframes=()):
+    """
+    Feature names of build_features / MarketDataFeed rows
+
+    OHLCV and indicators of the base timeframe, then the same block for each
+    higher timeframe with a '_<timeframe>' suffix.
+    """
+    base = OHLCV_FIELDS + indicator_engine.columns
+    return base + [f'{name}_{timeframe}' for timeframe in higher_timeframes for name in base]
+
+
+def _bucket_starts(timestamps, target_ms):
+    buckets = timestamps.astype(np.int64) // target_ms * target_ms
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    return buckets, starts
+
+
+def resample_ohlcv(ohlcv, target_ms):
+    """
+    Aggregate sorted (n, 6) candles into target_ms bars
+
+    Open is the bucket's first open, high/low its extremes, close its last
+    close and volume the sum; bars are stamped with their bucket start.
+    """
+    ohlcv = np.asarray(ohlcv, dtype=np.float64)
+    if len(ohlcv) == 0:
+        return ohlcv.reshape(0, 6)
+    buckets, starts = _bucket_starts(ohlcv[:, 0], target_ms)
+    ends = np.r_[starts[1:], len(ohlcv)] - 1
+
+    bars = np.empty((len(starts), 6))
+    bars[:, 0] = buckets[starts]
+    bars[:, 1] = ohlcv[starts, 1]
+    bars[:, 2] = np.maximum.reduceat(ohlcv[:, 2], starts)
+    bars[:, 3] = np.minimum.reduceat(ohlcv[:, 3], starts)
+    bars[:, 4] = ohlcv[ends, 4]
+    bars[:, 5] = np.add.reduceat(ohlcv[:, 5], starts)
+    return bars
+
+
+def resample_timeframes(ohlcv, base_timeframe, timeframes):
+    """
+    Resample base candles to every timeframe in one cascade
+
+    Each timeframe is built from the largest already-resampled timeframe
+    that divides it (e.g. 1h from 15m rather than from 1m), so every pass
+    reads fewer rows than the last.
+
+    Returns:
+        dict: timeframe -> (m, 6) bars, in the order of timeframes
+    """
+    resampled = {base_timeframe: np.asarray(ohlcv, dtype=np.float64)}
+    for timeframe in sorted(timeframes, key=timeframe_ms):
+        target_ms = timeframe_ms(timeframe)
+        source = max(
+            (name for name in resampled if target_ms % timeframe_ms(name) == 0),
+            key=timeframe_ms
+        )
+        resampled[timeframe] = resample_ohlcv(resampled[source], target_ms)
+    return {timeframe: resampled[timeframe] for timeframe in timeframes}
+
+
+def available_rows(timestamps, base_ms, target_ms):
+    """
+    First base row at which each target_ms bar (resample_ohlcv order) has closed
+
+    A bar is known on the row of its last base candle when that candle ends
+    the bucket, otherwise only from the first row of the next bucket, the
+    same rule TimeframeAggregator applies to a live stream. The trailing,
+    still open bar maps past the last row.
+    """
+    timestamps = np.asarray(timestamps)
+    buckets, starts = _bucket_starts(timestamps, target_ms)
+    last = np.r_[starts[1:], len(buckets)] - 1
+    complete = timestamps[last] + base_ms >= buckets[starts] + target_ms
+    return np.where(complete, last, last + 1)
+
+
+def _bar_block(ohlcv, indicator_engine):
+    return np.hstack([
+        ohlcv[:, 1:].astype(np.float32),
+        indicator_engine.compute_matrix(ohlcv[:, 2], ohlcv[:, 3], ohlcv[:, 4])
+    ])
+
+
+def build_features(ohlcv, base_timeframe='1m', higher_timeframes=(), indicator_engine=None):
+    """
+    Feature matrix of one symbol's base candles
+
+    Higher-timeframe blocks are resampled from the base candles and forward
+    filled from the row at which each bar closed, so no row sees a bar that
+    was still open at its time. Rows before the first closed bar are NaN.
+
+    Args:
+        ohlcv (np.ndarray): (n, 6) base candles sorted by timestamp
+        base_timeframe (str): Timeframe of ohlcv
+        higher_timeframes (list): Multiples of base_timeframe to add
+        indicator_engine (IndicatorEngine): Indicator set for every timeframe
+
+    Returns:
+        np.ndarray: (n, len(feature_columns(...))) float32 features
+    """
+    indicator_engine = indicator_engine or IndicatorEngine()
+    ohlcv = np.asarray(ohlcv, dtype=np.float64)
+    base_ms = timeframe_ms(base_timeframe)
+    n_rows = len(ohlcv)
+
+    blocks = [_bar_block(ohlcv, indicator_engine)]
+    for timeframe, bars in resample_timeframes(ohlcv, base_timeframe, higher_timeframes).items():
+        block = _bar_block(bars, indicator_engine)
+        rows = available_rows(ohlcv[:, 0], base_ms, timeframe_ms(timeframe))
+        latest = np.searchsorted(rows, np.arange(n_rows), side='right') - 1
+        filled = block[np.maximum(latest, 0)]
+        filled[latest < 0] = np.nan
+        blocks.append(filled)
+    return np.hstack(blocks)
+
+
+def align_ohlcv(ohlcv, index):
+    """
+    Place one symbol's candles on a shared timestamp index
+
+    Timestamps missing from the symbol repeat its previous close with zero
+    volume; rows before its first candle are NaN.
+
+    Args:
+        ohlcv (np.ndarray): (n, 6) candles whose timestamps are all in index
+        index (np.ndarray): Sorted shared timestamps (epoch milliseconds)
+
+    Returns:
+        np.ndarray: (len(index), 6) candles
+    """
+    ohlcv = np.asarray(ohlcv, dtype=np.float64)
+    aligned = np.full((len(index), 6), np.nan)
+    aligned[:, 0] = index
+    positions = np.searchsorted(index, ohlcv[:, 0])
+    aligned[positions, 1:] = ohlcv[:, 1:]
+
+    present = np.zeros(len(index), dtype=bool)
+    present[positions] = True
+    previous = np.maximum.accumulate(np.where(present, np.arange(len(index)), -1))
+    missing = ~present & (previous >= 0)
+    aligned[missing, 1:5] = aligned[previous[missing], 4][:, None]
+    aligned[missing, 5] = 0.0
+    return aligned
+
+
+def build_universe(candles, base_timeframe='1m', higher_timeframes=(), indicator_engine=None, dropna=True):
+    """
+    Universe TradingDataset from per-symbol base candles
+
+    All symbols are aligned on the union of their timestamps, features are
+    built per symbol (see build_features) and stacked into one
+    (n, n_symbols, n_features) float32 matrix. Rows where any symbol has a
+    NaN (indicator warm-up, not listed yet) are dropped when dropna is set.
+
+    Args:
+        candles (dict): symbol -> (n, 6) base candles
+
+    Returns:
+        TradingDataset: Universe dataset with symbols in candles order
+    """
+    indicator_engine = indicator_engine or IndicatorEngine()
+    symbols = list(candles)
+    columns = feature_columns(indicator_engine, higher_timeframes)
+    index = np.unique(np.concatenate([np.asarray(candles[symbol])[:, 0] for symbol in symbols]))
+
+    features = np.full((len(index), len(symbols), len(columns)), np.nan, dtype=np.float32)
+    prices = np.full((len(index), len(symbols)), np.nan)
+    for i, symbol in enumerate(symbols):
+        aligned = align_ohlcv(candles[symbol], index)
+        listed = ~np.isnan(aligned[:, 4])
+        features[listed, i] = build_features(aligned[listed], base_timeframe, higher_timeframes, indicator_engine)
+        prices[:, i] = aligned[:, 4]
+
+    if dropna:
+        valid = ~np.isnan(features).any(axis=(1, 2))
+        features, prices, index = features[valid], prices[valid], index[valid]
+
+    return TradingDataset(features, columns, prices, index.astype(np.int64).astype('datetime64[ms]'), symbols)
+
+
+class MarketUniverse:
+    """
+    Historical candles and features for a set of symbols
+
+    One BTCDataFetcher per symbol, all on the same exchange client and
+    candle store; symbols are backfilled one after another (each backfill
+    is already parallel over chunks) so the shared client stays within its
+    rate limit.
+    """
+    def __init__(self, symbols, timeframe='1m', higher_timeframes=(), exchange=None,
+                 max_workers=4, store=None, indicator_engine=None):
+        from data.data_fetcher import BTCDataFetcher
+
+        self.symbols = list(symbols)
+        self.timeframe = timeframe
+        self.higher_timeframes = list(higher_timeframes)
+        self.indicator_engine = indicator_engine or IndicatorEngine()
+        self.logger = logging.getLogger(__name__)
+
+        self.fetchers = {}
+        for symbol in self.symbols:
+            fetcher = BTCDataFetcher(symbol, timeframe, exchange, max_workers, store)
+            exchange = fetcher.exchange
+            self.fetchers[symbol] = fetcher
+
+    @classmethod
+    def from_config(cls, config, store=None, indicator_engine=None):
+        trading_params = config.TRADING_PARAMS
+        return cls(
+            trading_params['symbols'],
+            trading_params['timeframe'],
+            trading_params['higher_timeframes'],
+            max_workers=config.DATA_PARAMS['max_workers'],
+            store=store,
+            indicator_engine=indicator_engine
+        )
+
+    @property
+    def columns(self):
+        return feature_columns(self.indicator_engine, self.higher_timeframes)
+
+    def load(self, start_date, end_date):
+        """
+        Universe dataset for ['YYYY-MM-DD', 'YYYY-MM-DD') UTC
+
+        Returns:
+            TradingDataset: (n, n_symbols, n_features) features on a shared index
+        """
+        candles = {}
+        for symbol, fetcher in self.fetchers.items():
+            start_timestamp = fetcher._date_to_timestamp(start_date)
+            end_timestamp = fetcher._date_to_timestamp(end_date)
+            candles[symbol] = fetcher.load_ohlcv(start_timestamp, end_timestamp)
+            self.logger.info(f"Loaded {len(candles[symbol])} {symbol} {self.timeframe} candles")
+        return build_universe(candles, self.timeframe, self.higher_timeframes, self.indicator_engine)
+
+
+class TimeframeAggregator:
+    """
+    Streaming resampler for one higher timeframe
+
+    Folds closed base candles into the current higher-timeframe bar and,
+    once the bar is complete (or the next bucket starts), feeds it to that
+    timeframe's streaming indicators. block holds the last closed bar's
+    OHLCV and indicators, in build_features order; NaN until the first bar
+    closes.
+    """
+    def __init__(self, timeframe, base_timeframe='1m', indicator_engine=None):
+        indicator_engine = indicator_engine or IndicatorEngine()
+        self.timeframe = timeframe
+        self.target_ms = timeframe_ms(timeframe)
+        self.base_ms = timeframe_ms(base_timeframe)
+        self.indicators = indicator_engine.stream()
+        self.bar = None
+        self.block = np.full(len(OHLCV_FIELDS) + len(indicator_engine.columns), np.nan, dtype=np.float32)
+
+    def update(self, candle):
+        """
+        Consume one closed base candle and return the latest closed-bar block
+        """
+        bucket = int(candle[0]) // self.target_ms * self.target_ms
+        if self.bar is not None and bucket != self.bar[0]:
+            self._close_bar()
+        if self.bar is None:
+            self.bar = np.array(candle, dtype=np.float64)
+            self.bar[0] = bucket
+        else:
+            self.bar[2] = max(self.bar[2], candle[2])
+            self.bar[3] = min(self.bar[3], candle[3])
+            self.bar[4] = candle[4]
+            self.bar[5] += candle[5]
+        if candle[0] + self.base_ms >= bucket + self.target_ms:
+            self._close_bar()
+        return self.block
+
+    def _close_bar(self):
+        indicators = self.indicators.update(self.bar[2], self.bar[3], self.bar[4])
+        self.block = np.concatenate([self.bar[1:], indicators]).astype(np.float32)
+        self.bar = None
@@ -1,25 +1,38 @@
 from config.config import Config
-from data.data_fetcher import BTCDataFetcher
+from data.universe import MarketUniverse
+from data.candle_store import CandleStore
+from utils.feature_cache import FeatureCache
+from utils.indicators import IndicatorEngine
 from models.rl_agent import BTCRLTrader
 from trading.backtester import BTCBacktester
 from trading.live_trader import BTCLiveTrader
+from utils.instrumentation import Monitoring
+from utils.logging_config import setup_logging
 import logging
 
 def main():
     # Setup logging
-    logging.basicConfig(level=logging.INFO)
+    setup_logging()
     logger = logging.getLogger(__name__)
     
     # Load Configuration
     config = Config()
+    monitoring = Monitoring(config.MONITORING_PARAMS).start()
     
     try:
         # 1. Data Fetching
-        logger.info("Fetching Historical BTC Data...")
-        data_fetcher = BTCDataFetcher()
-        historical_data = data_fetcher.fetch_historical_btc_data(
-            '2022-01-01', 
-            '2024-01-01'
+        logger.info(f"Fetching Historical Data for {', '.join(config.TRADING_PARAMS['symbols'])}...")
+        universe = MarketUniverse.from_config(
+            config,
+            store=CandleStore(config.DATA_PARAMS['cache_dir']),
+            indicator_engine=IndicatorEngine(cache=FeatureCache(
+                config.DATA_PARAMS['feature_cache_dir'],
+                config.DATA_PARAMS['feature_cache_max_bytes']
+            ))
+        )
+        historical_data = universe.load(
+            start_date='2022-01-01', 
+            end_date='2024-01-01'
         )
         
         # 2. Training RL Agent
@@ -42,7 +55,10 @@ def main():
         logger.info("BTC Trading Bot Setup Complete!")
     
     except Exception as e:
-        logger.error(f"Critical Error: {e}")
+        logger.exception(f"Critical Error: {e}")
+    
+    finally:
+        monitoring.stop()
 
 if __name__ == "__main__":
     main()
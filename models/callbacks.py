@@ -0,0 +1,168 @@
+import logging
+import time
+import numpy as np
+from stable_baselines3.common.callbacks import BaseCallback
+
+logger = logging.getLogger(__name__)
+
+class ThroughputCallback(BaseCallback):
+    """
+    Measure rollout and optimization throughput during model.learn
+
+    Rollout time covers environment stepping plus policy inference; update
+    time is everything between the end of one rollout and the start of the
+    next (the PPO gradient phase). The running figures are recorded on the
+    SB3 logger under throughput/ and the totals are kept in `report`.
+    """
+    def __init__(self, verbose=0):
+        super().__init__(verbose)
+        self.report = {}
+        self._rollout_time = 0.0
+        self._update_time = 0.0
+        self._gradient_steps = 0
+        self._rollouts = 0
+        self._phase_start = None
+        self._rollout_end = None
+        self._training_start = None
+        self._start_timesteps = 0
+
+    def _on_training_start(self):
+        self._training_start = time.perf_counter()
+        self._start_timesteps = self.model.num_timesteps
+
+    def _on_rollout_start(self):
+        now = time.perf_counter()
+        self._close_update_phase(now)
+        self._phase_start = now
+
+    def _on_rollout_end(self):
+        now = time.perf_counter()
+        self._rollout_time += now - self._phase_start
+        self._rollout_end = now
+        self._rollouts += 1
+
+        env_steps = self.model.num_timesteps - self._start_timesteps
+        self.logger.record('throughput/env_steps_per_sec', env_steps / max(self._rollout_time, 1e-9))
+        if self._update_time > 0:
+            self.logger.record('throughput/updates_per_sec', self._gradient_steps / self._update_time)
+
+    def _on_step(self):
+        return True
+
+    def _on_training_end(self):
+        now = time.perf_counter()
+        self._close_update_phase(now)
+
+        env_steps = self.model.num_timesteps - self._start_timesteps
+        wall_time = now - self._training_start
+        self.report = {
+            'n_envs': self.model.n_envs,
+            'env_steps': env_steps,
+            'gradient_steps': self._gradient_steps,
+            'wall_time_sec': wall_time,
+            'rollout_time_sec': self._rollout_time,
+            'update_time_sec': self._update_time,
+            'env_steps_per_sec': env_steps / max(self._rollout_time, 1e-9),
+            'updates_per_sec': self._gradient_steps / max(self._update_time, 1e-9),
+            'overall_steps_per_sec': env_steps / max(wall_time, 1e-9)
+        }
+        logger.info(
+            "Training throughput: %(env_steps_per_sec).0f env steps/sec during rollouts, "
+            "%(updates_per_sec).1f gradient updates/sec, %(overall_steps_per_sec).0f steps/sec overall "
+            "(%(n_envs)d envs)", self.report
+        )
+
+    def _close_update_phase(self, now):
+        """
+        Account for the optimization phase that followed the previous rollout
+        """
+        if self._rollout_end is None:
+            return
+        self._update_time += now - self._rollout_end
+        self._gradient_steps += self._gradient_steps_per_update()
+        self._rollout_end = None
+
+    def _gradient_steps_per_update(self):
+        n_epochs = getattr(self.model, 'n_epochs', 1)
+        batch_size = getattr(self.model, 'batch_size', None)
+        rollout_size = getattr(self.model, 'n_steps', 1) * self.model.n_envs
+        if not batch_size:
+            return n_epochs
+        return n_epochs * int(np.ceil(rollout_size / batch_size))
+
+class TrialEvalCallback(BaseCallback):
+    """
+    Score the policy every eval_freq timesteps and report it to an optuna trial
+
+    evaluate() returns the intermediate score (e.g. a validation backtest
+    metric). Training stops as soon as the trial's pruner says so; `pruned`
+    tells the objective to raise optuna.TrialPruned.
+    """
+    def __init__(self, trial, evaluate, eval_freq, verbose=0):
+        super().__init__(verbose)
+        self.trial = trial
+        self.evaluate = evaluate
+        self.eval_freq = eval_freq
+        self.pruned = False
+        self.last_score = None
+        self._next_eval = eval_freq
+
+    def _on_step(self):
+        if self.num_timesteps < self._next_eval:
+            return True
+        self._next_eval += self.eval_freq
+
+        self.last_score = self.evaluate()
+        self.trial.report(self.last_score, self.num_timesteps)
+        if self.trial.should_prune():
+            logger.info(f"Trial {self.trial.number} pruned at {self.num_timesteps} timesteps (score {self.last_score:.4f})")
+            self.pruned = True
+            return False
+        return True
+
+class CheckpointCallback(BaseCallback):
+    """
+    Checkpoint training every interval timesteps and at the end
+
+    save(timesteps) writes a checkpoint and returns its path (see
+    models.checkpoints.CheckpointManager). With an evaluator
+    (CheckpointEvaluator) every checkpoint is handed over for an
+    out-of-process backtest; finished scores are collected between steps
+    and logged under eval/, and training end waits for the last ones.
+    """
+    def __init__(self, save, interval, evaluator=None, verbose=0):
+        super().__init__(verbose)
+        self.save = save
+        self.interval = interval
+        self.evaluator = evaluator
+        self.last_checkpoint = None
+        self._next_save = None
+        self._saved_at = None
+
+    def _on_training_start(self):
+        # Resumed models continue the schedule from their restored timestep count
+        self._next_save = (self.num_timesteps // self.interval + 1) * self.interval
+
+    def _on_step(self):
+        if self.evaluator is not None:
+            self._record(self.evaluator.poll())
+        if self.num_timesteps >= self._next_save:
+            self._next_save += self.interval
+            self._checkpoint()
+        return True
+
+    def _on_training_end(self):
+        if self._saved_at != self.num_timesteps:
+            self._checkpoint()
+        if self.evaluator is not None:
+            self._record(self.evaluator.poll(wait=True))
+
+    def _checkpoint(self):
+        self.last_checkpoint = self.save(self.num_timesteps)
+        self._saved_at = self.num_timesteps
+        if self.evaluator is not None:
+            self.evaluator.submit(self.last_checkpoint)
+
+    def _record(self, evaluations):
+        for evaluation in evaluations:
+            self.logger.record(f'eval/{self.evaluator.metric}', evaluation['score'])
@@ -0,0 +1,249 @@
+import json
+import logging
+import multiprocessing as mp
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from utils.shared_array import SharedArray
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_PREFIX = 'step_'
+BEST_FILE = 'best.json'
+
+# Per-process state set up by _init_eval_worker
+_worker = {}
+
+
+class CheckpointManager:
+    """
+    Training checkpoints of one run, in run_dir/step_<timesteps>/
+
+    A checkpoint is whatever BTCRLTrader.save_model writes (the PPO model
+    with its optimizer state, the NumPy policy and the feature normalizer)
+    under <checkpoint>/model, plus a checkpoint.json. It is written to a
+    temporary directory and renamed into place, so a crash mid-save never
+    leaves a partial checkpoint behind. Only the keep most recent
+    checkpoints are kept, plus the best-scoring one recorded in best.json
+    and any in protected (e.g. still being evaluated).
+    """
+    def __init__(self, run_dir, keep=3):
+        self.run_dir = run_dir
+        self.keep = keep
+        self.protected = set()
+        os.makedirs(run_dir, exist_ok=True)
+
+    @classmethod
+    def new_run(cls, directory, keep=3):
+        """
+        Manager of a fresh run directory under directory, named by start time
+        """
+        name = time.strftime('%Y%m%d-%H%M%S')
+        run_dir = os.path.join(directory, name)
+        suffix = 1
+        while os.path.exists(run_dir):
+            suffix += 1
+            run_dir = os.path.join(directory, f'{name}-{suffix}')
+        return cls(run_dir, keep)
+
+    @classmethod
+    def latest_run(cls, directory, keep=3):
+        """
+        Manager of the most recent run under directory that has a checkpoint, or None
+        """
+        if not os.path.isdir(directory):
+            return None
+        for name in sorted(os.listdir(directory), reverse=True):
+            if not os.path.isdir(os.path.join(directory, name)):
+                continue
+            manager = cls(os.path.join(directory, name), keep)
+            if manager.latest() is not None:
+                return manager
+        return None
+
+    @staticmethod
+    def model_path(checkpoint):
+        """
+        Model path of a checkpoint, as passed to BTCRLTrader.load_model / load_policy
+        """
+        return os.path.join(checkpoint, 'model')
+
+    def checkpoints(self):
+        """
+        Complete checkpoint directories, oldest first
+        """
+        names = sorted(
+            name for name in os.listdir(self.run_dir)
+            if name.startswith(CHECKPOINT_PREFIX) and os.path.isdir(os.path.join(self.run_dir, name))
+        )
+        return [os.path.join(self.run_dir, name) for name in names]
+
+    def latest(self):
+        checkpoints = self.checkpoints()
+        return checkpoints[-1] if checkpoints else None
+
+    def save(self, trader, timesteps):
+        """
+        Checkpoint trader's model and normalizer at timesteps
+
+        Returns:
+            str: The checkpoint directory
+        """
+        name = f'{CHECKPOINT_PREFIX}{timesteps:012d}'
+        path = os.path.join(self.run_dir, name)
+        tmp_path = os.path.join(self.run_dir, f'.tmp_{name}')
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        trader.save_model(self.model_path(tmp_path))
+        with open(os.path.join(tmp_path, 'checkpoint.json'), 'w') as f:
+            json.dump({'timesteps': int(timesteps), 'saved_at': time.time()}, f)
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp_path, path)
+        self._prune()
+        return path
+
+    def best(self):
+        """
+        Best checkpoint so far and its evaluation ({'checkpoint', 'timesteps', 'score', 'metrics'}), or None
+        """
+        best_path = os.path.join(self.run_dir, BEST_FILE)
+        if not os.path.exists(best_path):
+            return None
+        with open(best_path) as f:
+            best = json.load(f)
+        best['checkpoint'] = os.path.join(self.run_dir, best['checkpoint'])
+        return best
+
+    def record_evaluation(self, checkpoint, score, metrics=None):
+        """
+        Keep score for checkpoint; returns True when it is the new best
+        """
+        best = self.best()
+        if best is not None and best['score'] >= score:
+            return False
+        with open(os.path.join(self.run_dir, checkpoint, 'checkpoint.json')) as f:
+            timesteps = json.load(f)['timesteps']
+        tmp_path = os.path.join(self.run_dir, f'.tmp_{BEST_FILE}')
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                'checkpoint': os.path.basename(checkpoint),
+                'timesteps': timesteps,
+                'score': score,
+                'metrics': metrics or {}
+            }, f, indent=4)
+        os.replace(tmp_path, os.path.join(self.run_dir, BEST_FILE))
+        self._prune()
+        return True
+
+    def _prune(self):
+        best = self.best()
+        protected = self.protected | ({best['checkpoint']} if best else set())
+        checkpoints = self.checkpoints()
+        for path in checkpoints[:max(len(checkpoints) - self.keep, 0)]:
+            if path not in protected:
+                shutil.rmtree(path, ignore_errors=True)
+
+
+def _init_eval_worker(config, features, prices, columns, symbols):
+    """
+    Map the shared evaluation data once per worker process
+    """
+    from data.dataset import TradingDataset
+
+    _worker.update({
+        'config': config,
+        'dataset': TradingDataset(features.array, columns, prices.array, symbols=symbols)
+    })
+
+
+def _evaluate(checkpoint):
+    """
+    Backtest a checkpoint's policy inside the worker
+
+    Returns:
+        dict: Scalar backtest results
+    """
+    from models.rl_agent import BTCRLTrader
+    from trading.backtester import BTCBacktester
+
+    config = _worker['config']
+    agent = BTCRLTrader(config)
+    agent.load_policy(CheckpointManager.model_path(checkpoint))
+    results = BTCBacktester(agent, config.TRADING_PARAMS).run_comprehensive_backtest(data=_worker['dataset'])
+    return {key: float(value) for key, value in results.items() if isinstance(value, (int, float, np.number))}
+
+
+class CheckpointEvaluator:
+    """
+    Backtest checkpoints on held-out data in a separate process
+
+    submit() returns at once; the backtest (NumPy policy only, no torch)
+    runs in a single worker process that maps the evaluation features and
+    prices from SharedArrays, so training keeps stepping meanwhile. poll()
+    collects finished backtests and records their metric with the
+    CheckpointManager, which keeps track of the best checkpoint.
+
+    Args:
+        data (TradingDataset): Evaluation rows, e.g. BTCRLTrader.validation_data
+        metric (str): Backtest result key to maximize
+    """
+    def __init__(self, config, manager, data, metric='sharpe_ratio', start_method=None):
+        self.manager = manager
+        self.metric = metric
+        self.evaluations = []
+        self._pending = []
+        self._shared = [SharedArray(data.features), SharedArray(data.prices, dtype=np.float64)]
+        if start_method is None:
+            start_method = 'forkserver' if 'forkserver' in mp.get_all_start_methods() else 'spawn'
+        self._pool = ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=mp.get_context(start_method),
+            initializer=_init_eval_worker,
+            initargs=(config, *self._shared, data.columns, data.symbols)
+        )
+
+    def submit(self, checkpoint):
+        self.manager.protected.add(checkpoint)
+        self._pending.append((checkpoint, self._pool.submit(_evaluate, checkpoint)))
+
+    def poll(self, wait=False):
+        """
+        Record finished evaluations (all of them with wait)
+
+        Returns:
+            list: Evaluations recorded by this call, dicts with 'checkpoint', 'score', 'best' and 'metrics'
+        """
+        finished = []
+        for checkpoint, future in list(self._pending):
+            if not wait and not future.done():
+                continue
+            self._pending.remove((checkpoint, future))
+            self.manager.protected.discard(checkpoint)
+            try:
+                metrics = future.result()
+            except Exception as eval_error:
+                logger.error(f"Evaluation of {checkpoint} failed: {eval_error}")
+                continue
+            score = metrics[self.metric]
+            if not np.isfinite(score):
+                score = -np.inf
+            best = self.manager.record_evaluation(checkpoint, score, metrics)
+            evaluation = {'checkpoint': checkpoint, 'score': score, 'best': best, 'metrics': metrics}
+            logger.info(f"Checkpoint {os.path.basename(checkpoint)}: {self.metric} {score:.4f}"
+                        f"{' (best so far)' if best else ''}")
+            self.evaluations.append(evaluation)
+            finished.append(evaluation)
+        return finished
+
+    def close(self):
+        """
+        Wait for pending evaluations, then stop the worker and release the shared data
+        """
+        try:
+            self.poll(wait=True)
+        finally:
+            self._pool.shutdown()
+            for array in self._shared:
+                array.unlink()
@@ -1,58 +1,141 @@
 import gymnasium as gym
 import numpy as np
+from models.episode_sampler import RandomWindowSampler
+from models.observations import LookbackWindows
+
+# Portfolio fields appended to every observation: balance ratio, btc held, total reward
+PORTFOLIO_FIELDS = 3
+
+def split_features_and_prices(data, prices=None):
+    """
+    Feature matrix and fill prices of a TradingDataset, or of a plain array
+
+    A plain array without explicit prices trades at its first column.
+    """
+    if hasattr(data, 'prices'):
+        return data.features, data.prices
+    data = np.asarray(data)
+    return data, data[:, 0] if prices is None else prices
 
 class TradingEnvironment(gym.Env):
-    def __init__(self, data, initial_balance=10000):
+    """
+    Single trading account over a feature matrix
+
+    With universe data ((n, n_symbols, n_features) features) each episode
+    trades one symbol: the given symbol index, or one drawn at reset.
+
+    Without episode_length or episode_sampler every episode walks the whole
+    history from row 0. Otherwise each reset draws an episode_length window
+    from the sampler (random windows by default, see models.episode_sampler)
+    and the window end is reported as a truncation.
+
+    With lookback > 1 an observation is the last lookback feature rows
+    (oldest first, z-scored per window with normalize_lookback, see
+    models.observations) followed by the portfolio fields, and episodes
+    start no earlier than row lookback - 1.
+
+    A FeatureNormalizer (models.normalization) is applied to the features
+    once, here; prices stay raw.
+    """
+    def __init__(self, data, initial_balance=10000, prices=None, symbol=None, episode_length=None,
+                 episode_sampler=None, lookback=1, normalize_lookback=True, normalizer=None):
         super().__init__()
-        
+
+        data, prices = split_features_and_prices(data, prices)
         self.data = data
+        if normalizer is not None:
+            data = normalizer.transform(data)
         self.initial_balance = initial_balance
         self.current_step = 0
-        
+        self.symbol = symbol
+        if data.ndim == 2:
+            data = data[:, None]
+            prices = np.asarray(prices)[:, None]
+
+        n_rows, n_symbols, n_features = data.shape
+        self.lookback = lookback
+        if lookback > 1:
+            # Window views over the feature matrix
+            self._symbol_windows = [
+                LookbackWindows(data[:, symbol_idx], lookback, normalize_lookback) for symbol_idx in range(n_symbols)
+            ]
+        else:
+            # float32 feature rows per symbol, converted once here
+            self._symbol_features = np.ascontiguousarray(data.transpose(1, 0, 2), dtype=np.float32)
+        # Observations are assembled in two alternating buffers, so the one
+        # returned by step() survives the next step() or reset()
+        observation_size = lookback * n_features + PORTFOLIO_FIELDS
+        self._buffers = np.zeros((2, observation_size), dtype=np.float32)
+        self._buffer_idx = 0
+        self._symbol_prices = [column.tolist() for column in np.asarray(prices, dtype=np.float64).T]
+        self._n_features = n_features
+        self._last_step = n_rows - 1
+        if episode_sampler is None and (episode_length or lookback > 1):
+            episode_sampler = RandomWindowSampler(n_rows, episode_length, first_row=lookback - 1)
+        if episode_sampler is not None and episode_sampler.first_row < lookback - 1:
+            raise ValueError(f"Episode sampler starts before row {lookback - 1}, the first full lookback window")
+        self.episode_sampler = episode_sampler
+        self.episode_start = 0
+        self._episode_end = self._last_step
+
         # Action space: 0 (hold), 1 (buy), 2 (sell)
         self.action_space = gym.spaces.Discrete(3)
-        
+
         # Observation space: price features + portfolio status
         self.observation_space = gym.spaces.Box(
-            low=-np.inf, high=np.inf, 
-            shape=(data.shape[1] + 3,), 
+            low=-np.inf, high=np.inf,
+            shape=(observation_size,),
             dtype=np.float32
         )
-        
+
         self.reset()
-    
-    def reset(self, seed=None):
+
+    def reset(self, seed=None, options=None):
         super().reset(seed=seed)
-        
-        self.current_step = 0
-        self.balance = self.initial_balance
-        self.btc_held = 0
-        self.total_reward = 0
-        
+
+        symbol = self.symbol
+        if symbol is None:
+            symbol = self.np_random.integers(len(self._symbol_prices))
+        self.episode_symbol = int(symbol)
+        if self.lookback > 1:
+            self._windows = self._symbol_windows[self.episode_symbol]
+        else:
+            self._features = self._symbol_features[self.episode_symbol]
+        self._prices = self._symbol_prices[self.episode_symbol]
+
+        if self.episode_sampler is not None:
+            self.episode_start = int(self.episode_sampler.sample(self.np_random, 1)[0])
+            self._episode_end = self.episode_start + self.episode_sampler.episode_length
+        self.current_step = self.episode_start
+        self.balance = float(self.initial_balance)
+        self.btc_held = 0.0
+        self.total_reward = 0.0
+
         return self._get_observation(), {}
-    
+
     def step(self, action):
         """
         Execute trading action
         """
-        current_price = self.data[self.current_step, 0]  # Closing price
-        
+        current_price = self._prices[self.current_step]
+
         # Trade execution logic
         if action == 1 and self.balance > current_price:  # Buy
             self.btc_held = self.balance / current_price
-            self.balance = 0
+            self.balance = 0.0
         elif action == 2 and self.btc_held > 0:  # Sell
             self.balance = self.btc_held * current_price
-            self.btc_held = 0
-        
+            self.btc_held = 0.0
+
         # Calculate reward
         reward = self._calculate_reward(current_price)
-        
+
         self.current_step += 1
-        done = (self.current_step >= len(self.data) - 1)
-        
-        return self._get_observation(), reward, done, False, {}
-    
+        terminated = self.current_step >= self._last_step
+        truncated = not terminated and self.current_step >= self._episode_end
+
+        return self._get_observation(), reward, terminated, truncated, {}
+
     def _calculate_reward(self, current_price):
         """
         Calculate trading reward
@@ -61,17 +144,38 @@ class TradingEnvironment(gym.Env):
         total_value = self.balance + (self.btc_held * current_price)
         reward = (total_value - self.initial_balance) / self.initial_balance
         return reward
-    
+
     def _get_observation(self):
         """
         Get current trading state
+
+        The feature row (or lookback window) and the portfolio fields are
+        written into the next of two reused buffers; no new array is
+        allocated. The returned array stays valid until the second next call.
         """
-        portfolio_info = [
+        if self.lookback > 1:
+            return self._get_window_observation()
+        self._buffer_idx ^= 1
+        obs = self._buffers[self._buffer_idx]
+        obs[:self._n_features] = self._features[self.current_step]
+        obs[self._n_features:] = (
             self.balance / self.initial_balance,
             self.btc_held,
             self.total_reward
-        ]
-        return np.concatenate([
-            self.data[self.current_step], 
-            portfolio_info
-        ])
+        )
+        return obs
+
+    def _get_window_observation(self):
+        """
+        Lookback window ending at the current step plus portfolio fields, in the next of two buffers
+        """
+        self._buffer_idx ^= 1
+        obs = self._buffers[self._buffer_idx]
+        window_size = self._windows.size
+        self._windows.write(obs[:window_size].reshape(self.lookback, self._n_features), self.current_step)
+        obs[window_size:] = (
+            self.balance / self.initial_balance,
+            self.btc_held,
+            self.total_reward
+        )
+        return obs
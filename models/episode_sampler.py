@@ -0,0 +1,168 @@
+import copy
+import numpy as np
+
+
+class EpisodeSampler:
+    """
+    Start rows of fixed-length training episodes
+
+    Samplers index the history once when built; sample() is then O(size)
+    whatever the number of rows. An episode starting at s covers rows
+    s .. s + episode_length, so starts range over
+    first_row .. n_rows - 1 - episode_length (first_row skips rows without a
+    full lookback window).
+    """
+    def __init__(self, n_rows, episode_length, first_row=0):
+        available = n_rows - 1 - first_row
+        if available < 1:
+            raise ValueError("Episodes need at least two rows of data after first_row")
+        self.first_row = first_row
+        self.episode_length = min(episode_length or available, available)
+        self.max_start = n_rows - 1 - self.episode_length
+
+    def sample(self, rng, size):
+        """
+        Draw size episode starts
+
+        Args:
+            rng (np.random.Generator): Source of randomness (the environment's)
+            size (int): Number of starts
+
+        Returns:
+            np.ndarray: (size,) int64 start rows
+        """
+        raise NotImplementedError
+
+    def for_worker(self, worker_idx, n_workers):
+        """
+        Sampler for worker worker_idx of n_workers drawing from the same history
+
+        Stateless samplers are shared as they are.
+        """
+        return self
+
+
+class RandomWindowSampler(EpisodeSampler):
+    """
+    Uniformly random start rows
+    """
+    def sample(self, rng, size):
+        return rng.integers(self.first_row, self.max_start + 1, size=size)
+
+
+class VolatilityStratifiedSampler(EpisodeSampler):
+    """
+    Starts drawn evenly across volatility regimes
+
+    Every possible window is scored by its mean ATR / price and binned into
+    n_strata equal-count quantiles; a sample picks a stratum (uniformly, or
+    by weights) and then a window inside it. Rare high- and low-volatility
+    periods are seen as often as the common middle, and weights can shift
+    the mix, e.g. calm regimes first as a curriculum.
+
+    Args:
+        atr (np.ndarray): (n,) or (n, n_symbols) ATR per row; a universe is
+            scored by its mean over symbols
+        prices (np.ndarray): Close prices of the same shape
+        weights (list): Relative probability of each stratum, lowest volatility first
+    """
+    def __init__(self, atr, prices, episode_length, n_strata=4, weights=None, first_row=0):
+        atr = np.asarray(atr, dtype=np.float64)
+        super().__init__(len(atr), episode_length, first_row)
+        volatility = atr / np.asarray(prices, dtype=np.float64)
+        if volatility.ndim == 2:
+            volatility = volatility.mean(axis=1)
+
+        # Mean volatility of every window, from one cumulative sum
+        cumulative = np.concatenate([[0.0], np.cumsum(np.nan_to_num(volatility))])
+        starts = np.arange(first_row, self.max_start + 1)
+        score = (cumulative[starts + self.episode_length] - cumulative[starts]) / self.episode_length
+
+        edges = np.quantile(score, np.linspace(0, 1, n_strata + 1)[1:-1])
+        strata = np.searchsorted(edges, score, side='right')
+        self.starts = starts[np.argsort(strata, kind='stable')]
+        self.counts = np.bincount(strata, minlength=n_strata)
+        self.offsets = np.concatenate([[0], np.cumsum(self.counts)[:-1]])
+        self.n_strata = n_strata
+        self.set_weights(weights)
+
+    def set_weights(self, weights=None):
+        """
+        Change the stratum mix; empty strata (ties in the scores) are never drawn
+        """
+        weights = np.ones(self.n_strata) if weights is None else np.asarray(weights, dtype=np.float64)
+        if weights.shape != (self.n_strata,) or (weights < 0).any():
+            raise ValueError(f"Expected {self.n_strata} non-negative stratum weights, got {weights}")
+        weights = np.where(self.counts > 0, weights, 0.0)
+        if weights.sum() <= 0:
+            raise ValueError("Stratum weights select no windows")
+        self.cumulative_weights = np.cumsum(weights / weights.sum())
+
+    def sample(self, rng, size):
+        strata = np.searchsorted(self.cumulative_weights, rng.random(size), side='right')
+        strata = np.minimum(strata, self.n_strata - 1)
+        positions = self.offsets[strata] + (rng.random(size) * self.counts[strata]).astype(np.int64)
+        return self.starts[positions]
+
+
+class WalkForwardSampler(EpisodeSampler):
+    """
+    Consecutive windows in time order
+
+    Windows start every stride rows (episode_length by default, so they
+    tile the history) and are handed out in order, wrapping around at the
+    end. Successive episodes walk forward through time instead of jumping
+    between regimes. Every step-th window is handed out, so that workers
+    sharing one history (see for_worker) take turns instead of replaying
+    each other's windows.
+    """
+    def __init__(self, n_rows, episode_length, stride=None, position=0, first_row=0, step=1):
+        super().__init__(n_rows, episode_length, first_row)
+        self.stride = stride or self.episode_length
+        self.n_windows = (self.max_start - first_row) // self.stride + 1
+        self.position = position
+        self.step = step
+
+    def sample(self, rng, size):
+        windows = (self.position + np.arange(size) * self.step) % self.n_windows
+        self.position += size * self.step
+        return self.first_row + windows * self.stride
+
+    def for_worker(self, worker_idx, n_workers):
+        """
+        Copy taking windows worker_idx, worker_idx + n_workers, ... of this sampler's walk
+        """
+        sampler = copy.copy(self)
+        sampler.position += worker_idx * self.step
+        sampler.step *= n_workers
+        return sampler
+
+
+EPISODE_SAMPLERS = ('random', 'volatility', 'walk_forward')
+
+
+def make_episode_sampler(kind, data, episode_length, n_strata=4, prices=None, first_row=0):
+    """
+    Episode sampler selected by RL_PARAMS['episode_sampler']
+
+    Args:
+        kind (str): 'random', 'volatility' (needs a TradingDataset with an
+            'atr' column) or 'walk_forward'
+        data: TradingDataset or feature matrix the environment runs on
+        first_row (int): Earliest start, lookback - 1 for lookback observations
+
+    Returns:
+        EpisodeSampler
+    """
+    from models.environments import split_features_and_prices
+
+    features, prices = split_features_and_prices(data, prices)
+    if kind == 'random':
+        return RandomWindowSampler(len(features), episode_length, first_row)
+    if kind == 'walk_forward':
+        return WalkForwardSampler(len(features), episode_length, first_row=first_row)
+    if kind == 'volatility':
+        if not hasattr(data, 'column'):
+            raise ValueError("Volatility-stratified episodes need a TradingDataset with an 'atr' column")
+        return VolatilityStratifiedSampler(data.column('atr'), prices, episode_length, n_strata, first_row=first_row)
+    raise ValueError(f"Unknown episode sampler: {kind}, expected one of {EPISODE_SAMPLERS}")
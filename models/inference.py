@@ -0,0 +1,141 @@
+import numpy as np
+
+# Activations supported in exported policy networks
+ACTIVATIONS = {
+    'Tanh': np.tanh,
+    'ReLU': lambda x, out=None: np.maximum(x, 0.0, out=out),
+    'Identity': None
+}
+
+
+class NumpyPolicy:
+    """
+    Pure NumPy forward pass of a trained PPO MlpPolicy (actor only)
+
+    Holds the policy MLP and action head as float32 matrices, so inference
+    needs neither torch nor stable-baselines3. predict() runs a whole matrix
+    of observations in a few matrix products; predict_one() reuses
+    preallocated layer buffers for the single-observation live path (not
+    thread-safe).
+    """
+    def __init__(self, weights, biases, activation='Tanh'):
+        if activation not in ACTIVATIONS:
+            raise ValueError(f"Unsupported activation: {activation}")
+        self.weights = [np.ascontiguousarray(w, dtype=np.float32) for w in weights]
+        self.biases = [np.ascontiguousarray(b, dtype=np.float32) for b in biases]
+        self.activation = activation
+        self._activation = ACTIVATIONS[activation]
+        self._buffers = [np.empty(b.shape, dtype=np.float32) for b in self.biases]
+        self.rng = np.random.default_rng()
+
+    @property
+    def observation_size(self):
+        return self.weights[0].shape[0]
+
+    @property
+    def n_actions(self):
+        return self.weights[-1].shape[1]
+
+    @classmethod
+    def from_sb3(cls, model):
+        """
+        Export the actor network of a stable-baselines3 PPO model
+
+        Supports the default MlpPolicy layout: flatten features, a policy MLP
+        of Linear + activation layers and a linear categorical action head.
+        """
+        import torch.nn as nn
+
+        policy = model.policy
+        weights, biases, activation = [], [], 'Identity'
+        for layer in list(policy.mlp_extractor.policy_net) + [policy.action_net]:
+            if isinstance(layer, nn.Linear):
+                # Stored (in, out) so a row batch is a plain x @ W
+                weights.append(layer.weight.detach().cpu().numpy().T)
+                biases.append(layer.bias.detach().cpu().numpy())
+            elif type(layer).__name__ in ACTIVATIONS:
+                activation = type(layer).__name__
+            else:
+                raise ValueError(f"Cannot export policy layer: {layer}")
+        return cls(weights, biases, activation)
+
+    def logits(self, observations):
+        """
+        Action logits for an (n, observation_size) batch
+        """
+        h = np.asarray(observations, dtype=np.float32).reshape(-1, self.observation_size)
+        last = len(self.weights) - 1
+        for i, (w, b) in enumerate(zip(self.weights, self.biases)):
+            h = h @ w
+            h += b
+            if i < last and self._activation is not None:
+                self._activation(h, out=h)
+        return h
+
+    def probabilities(self, observations):
+        """
+        Softmax action probabilities for an (n, observation_size) batch
+        """
+        return self._softmax(self.logits(observations))
+
+    @staticmethod
+    def _softmax(logits):
+        logits = logits - logits.max(axis=1, keepdims=True)
+        np.exp(logits, out=logits)
+        logits /= logits.sum(axis=1, keepdims=True)
+        return logits
+
+    def _sample(self, logits, rng):
+        probabilities = self._softmax(logits)
+        draws = (rng or self.rng).random((len(probabilities), 1))
+        return np.minimum((probabilities.cumsum(axis=1) < draws).sum(axis=1), self.n_actions - 1)
+
+    def predict(self, observations, deterministic=True, rng=None):
+        """
+        Actions for an (n, observation_size) batch
+
+        Args:
+            deterministic (bool): Greedy action; otherwise sample from the policy
+            rng (np.random.Generator): Sampling generator, self.rng by default
+
+        Returns:
+            np.ndarray: (n,) integer actions
+        """
+        logits = self.logits(observations)
+        if deterministic:
+            return logits.argmax(axis=1)
+        return self._sample(logits, rng)
+
+    def predict_one(self, observation, deterministic=True, rng=None):
+        """
+        Action for a single observation without per-call allocation
+        """
+        h = np.asarray(observation, dtype=np.float32)
+        last = len(self.weights) - 1
+        for i, (w, b, out) in enumerate(zip(self.weights, self.biases, self._buffers)):
+            np.dot(h, w, out=out)
+            out += b
+            if i < last and self._activation is not None:
+                self._activation(out, out=out)
+            h = out
+        if deterministic:
+            return int(h.argmax())
+        return int(self._sample(h[None], rng)[0])
+
+    def save(self, path):
+        """
+        Save the weights as a .npz file
+        """
+        arrays = {f'w{i}': w for i, w in enumerate(self.weights)}
+        arrays.update({f'b{i}': b for i, b in enumerate(self.biases)})
+        np.savez(path, activation=np.array(self.activation), **arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as f:
+            n_layers = sum(1 for key in f.files if key.startswith('w'))
+            return cls(
+                [f[f'w{i}'] for i in range(n_layers)],
+                [f[f'b{i}'] for i in range(n_layers)],
+                str(f['activation'])
+            )
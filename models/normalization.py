@@ -0,0 +1,100 @@
+import numpy as np
+
+# Rows per chunk of FeatureNormalizer.fit; keeps the float64 temporaries small on memmaps
+_FIT_CHUNK = 65536
+
+
+class FeatureNormalizer:
+    """
+    Per-feature z-score with running (Welford) mean and variance
+
+    Statistics are accumulated in float64 batch by batch with Chan et al.'s
+    parallel merge of Welford's update, so one streaming pass over a
+    (memory-mapped) feature matrix is enough and the result does not depend
+    on the batch size. Universe features ((n, n_symbols, n_features)) pool
+    every symbol into one statistic per feature, as one policy trades them all.
+
+    transform() is the stage applied wherever features enter the policy
+    (TradingEnvironment, VectorTradingEnvironment, BTCBacktester and the live
+    loop): a subtract and a multiply written in place, with no temporaries.
+    Features that never vary pass through centred but unscaled.
+    """
+    def __init__(self, n_features):
+        self.count = 0
+        self.mean = np.zeros(n_features)
+        self.m2 = np.zeros(n_features)
+        self.scale = np.ones(n_features)
+
+    @property
+    def n_features(self):
+        return len(self.mean)
+
+    @property
+    def std(self):
+        return np.sqrt(self.m2 / self.count) if self.count else np.ones(self.n_features)
+
+    @classmethod
+    def fit(cls, features, chunk_rows=_FIT_CHUNK):
+        """
+        Normalizer of a feature matrix, in one pass of chunk_rows-row batches
+        """
+        normalizer = cls(features.shape[-1])
+        for start in range(0, len(features), chunk_rows):
+            normalizer.update(features[start:start + chunk_rows])
+        return normalizer
+
+    def update(self, batch):
+        """
+        Merge a batch of feature rows ((..., n_features), any leading shape) into the statistics
+        """
+        batch = np.asarray(batch, dtype=np.float64).reshape(-1, self.n_features)
+        batch_mean = batch.mean(axis=0) if len(batch) else self.mean
+        self.merge(len(batch), batch_mean, ((batch - batch_mean) ** 2).sum(axis=0))
+
+    def merge(self, count, mean, m2):
+        """
+        Merge statistics of other rows (count, mean, sum of squared deviations)
+        """
+        if not count:
+            return
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean = self.mean + delta * (count / total)
+        self.m2 = self.m2 + m2 + delta * delta * (self.count * count / total)
+        self.count = total
+
+        std = self.std
+        varies = std > 1e-8 * np.maximum(np.abs(self.mean), 1.0)
+        self.scale = 1.0 / np.where(varies, std, 1.0)
+
+    def transform(self, features, out=None):
+        """
+        Normalized float32 features
+
+        Args:
+            features (np.ndarray): (..., n_features) raw features
+            out (np.ndarray): float32 array of the same shape to write into
+                (may be features itself); a new array by default
+
+        Returns:
+            np.ndarray: out
+        """
+        if out is None:
+            out = np.empty(np.shape(features), dtype=np.float32)
+        # Subtracted in float64: the float32 rounding of price-level features happens after centring
+        np.subtract(features, self.mean, out=out)
+        np.multiply(out, self.scale, out=out)
+        return out
+
+    def save(self, path):
+        """
+        Save the statistics as a .npz file
+        """
+        np.savez(path, count=np.array(self.count), mean=self.mean, m2=self.m2)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as f:
+            normalizer = cls(len(f['mean']))
+            normalizer.merge(int(f['count']), f['mean'], f['m2'])
+        return normalizer
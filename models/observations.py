@@ -0,0 +1,116 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Rows per block of rolling_moments; each block is re-centred on its own mean
+_MOMENT_BLOCK = 4096
+
+
+def rolling_moments(features, window):
+    """
+    Mean and standard deviation (ddof=0) of every window-row run along axis 0
+
+    Computed incrementally from running sums of x and x**2, in blocks
+    re-centred on their own mean so the sums of price-level features stay
+    well conditioned. Row i of the result covers features[i:i + window].
+
+    Returns:
+        tuple: (n - window + 1, ...) float64 mean and float32 std; a float32
+            mean of price-level features would be off by ~1e-3
+    """
+    n_windows = len(features) - window + 1
+    mean = np.empty((n_windows,) + features.shape[1:])
+    std = np.empty_like(mean, dtype=np.float32)
+    for start in range(0, n_windows, _MOMENT_BLOCK):
+        stop = min(start + _MOMENT_BLOCK, n_windows)
+        block = np.asarray(features[start:stop + window - 1], dtype=np.float64)
+        centre = block.mean(axis=0)
+        block = block - centre
+        zero = np.zeros((1,) + block.shape[1:])
+        sum1 = np.cumsum(np.concatenate([zero, block]), axis=0)
+        sum2 = np.cumsum(np.concatenate([zero, block * block]), axis=0)
+        block_mean = (sum1[window:] - sum1[:-window]) / window
+        variance = (sum2[window:] - sum2[:-window]) / window - block_mean * block_mean
+        mean[start:stop] = block_mean + centre
+        std[start:stop] = np.sqrt(np.maximum(variance, 0.0))
+    return mean, std
+
+
+def _safe_std(std, mean):
+    # Features constant within a window (up to rounding) normalize to 0 instead of blowing up
+    return np.where(std > 1e-6 * np.maximum(np.abs(mean), 1.0), std, 1.0).astype(np.float32)
+
+
+class LookbackWindows:
+    """
+    Lookback observations over a feature matrix without copying it
+
+    sliding_window_view exposes the last lookback rows of every row as a
+    view of the matrix. With normalize, each window is z-scored per feature
+    with its own mean and std, precomputed once by rolling_moments. write()
+    fills observation buffers in place, so a step costs one lookback x
+    n_features copy whatever the history length. Rows before lookback - 1
+    have no full window (first_row).
+
+    Args:
+        features (np.ndarray): (n, n_features) or (n, n_symbols, n_features)
+        lookback (int): Rows per observation, oldest first
+        normalize (bool): Z-score every window per feature
+    """
+    def __init__(self, features, lookback, normalize=True):
+        if lookback < 1 or lookback > len(features):
+            raise ValueError(f"lookback must be between 1 and {len(features)} rows, got {lookback}")
+        self.lookback = lookback
+        self.first_row = lookback - 1
+        self.n_features = features.shape[-1]
+        # (n - lookback + 1, ..., lookback, n_features)
+        self.windows = np.swapaxes(sliding_window_view(features, lookback, axis=0), -1, -2)
+        self.mean = self.std = None
+        if normalize:
+            self.mean, std = rolling_moments(features, lookback)
+            self.std = _safe_std(std, self.mean)
+
+    @property
+    def size(self):
+        """
+        Observation entries per window
+        """
+        return self.lookback * self.n_features
+
+    def write(self, out, rows, symbols=None):
+        """
+        Write the windows ending at rows into out
+
+        Args:
+            out (np.ndarray): (lookback, n_features) for one row, or
+                (len(rows), lookback, n_features)
+            rows: Row index or array of row indices, each >= first_row
+            symbols: Symbol index (array) for (n, n_symbols, n_features) features
+        """
+        index = np.subtract(rows, self.first_row)
+        if symbols is not None:
+            index = (index, symbols)
+        window = self.windows[index]
+        if self.mean is None:
+            out[...] = window
+            return
+        np.subtract(window, self.mean[index][..., None, :], out=out)
+        out /= self.std[index][..., None, :]
+
+
+def window_observation(rows, normalize=True):
+    """
+    Flattened lookback observation of the latest rows, as LookbackWindows builds it
+
+    Used on the live path, where the window is the feed's recent feature rows.
+
+    Args:
+        rows (np.ndarray): (lookback, n_features), oldest first
+
+    Returns:
+        np.ndarray: (lookback * n_features,) float32
+    """
+    rows = np.asarray(rows, dtype=np.float64)
+    if normalize:
+        mean = rows.mean(axis=0)
+        rows = (rows - mean) / _safe_std(rows.std(axis=0), mean)
+    return rows.astype(np.float32).ravel()
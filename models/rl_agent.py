@@ -1,72 +1,346 @@
+import os
+import logging
 import numpy as np
-import torch
-import torch.nn as nn
-import torch.optim as optim
-from stable_baselines3 import PPO
-from stable_baselines3.common.vec_env import DummyVecEnv
+from utils.instrumentation import metrics
+
+logger = logging.getLogger(__name__)
+
+# Inference-only artifact written next to the PPO checkpoint
+POLICY_SUFFIX = '_policy.npz'
+# Feature normalization statistics the model was trained with
+NORMALIZER_SUFFIX = '_normalizer.npz'
 
 class BTCRLTrader:
     def __init__(self, config):
         self.config = config
         self.model = None
+        self.policy = None
+        self.normalizer = None
+        self.dataset = None
         self.train_data = None
+        self.validation_data = None
         self.test_data = None
+        self.throughput_report = None
+        self.checkpoints = None
+        self.evaluations = []
     
-    def prepare_training_data(self, historical_data):
+    @property
+    def lookback(self):
+        """
+        Feature rows per observation (RL_PARAMS['lookback']), read by the backtester and the live loop
+        """
+        return self.config.RL_PARAMS.get('lookback', 1)
+    
+    @property
+    def normalize_lookback(self):
+        return self.config.RL_PARAMS.get('normalize_lookback', True)
+    
+    def prepare_training_data(self, historical_data, train_fraction=0.8, validation_fraction=0.0):
         """
         Prepare data for training
+        
+        Builds one compact TradingDataset (float32 features without the
+        indicator warm-up rows, separate close prices) and chronological
+        train / validation / test views of it.
+        
+        Args:
+            historical_data (pd.DataFrame or TradingDataset): Features, with a 'close' column
         """
-        # Split data into train and test
-        train_size = int(len(historical_data) * 0.8)
-        self.train_data = historical_data[:train_size]
-        self.test_data = historical_data[train_size:]
+        from data.dataset import TradingDataset
+        
+        if not isinstance(historical_data, TradingDataset):
+            historical_data = TradingDataset.from_frame(historical_data)
+        self.dataset = historical_data
+        self.train_data, self.validation_data, self.test_data = historical_data.split(train_fraction, validation_fraction)
     
-    def train(self):
+    def train(self, callback=None, resume=False):
         """
         Train RL model using PPO
+        
+        With RL_PARAMS['normalize_features'] the FeatureNormalizer is fitted
+        on the training rows first, in one streaming pass; it is saved with
+        the model and applied by the backtester and the live loop.
+        
+        With CHECKPOINT_PARAMS['enabled'] the model (optimizer state
+        included) and the normalizer are checkpointed every interval
+        timesteps into a run directory (see models.checkpoints). When
+        validation rows are set, each checkpoint is backtested on them in a
+        separate process and scored by CHECKPOINT_PARAMS['metric']; with
+        'load_best' the best-scoring checkpoint is the trained model.
+        
+        Args:
+            callback: Extra stable-baselines3 callback (e.g. trial pruning);
+                returning False from it stops training early
+            resume (bool): Continue the latest run's latest checkpoint up to
+                total_timesteps instead of starting a new run
+        """
+        from stable_baselines3 import PPO
+        from stable_baselines3.common.callbacks import CallbackList
+        from models.callbacks import ThroughputCallback
+        
+        rl_params = self.config.RL_PARAMS
+        checkpoint_params = self.config.CHECKPOINT_PARAMS
+        manager = self._checkpoint_manager(resume)
+        resume_from = manager.latest() if resume and manager is not None else None
+        
+        self.normalizer = None
+        if resume_from is not None:
+            # The statistics the checkpointed policy was trained on, not a refit
+            self._load_normalizer(manager.model_path(resume_from))
+        elif rl_params.get('normalize_features', True):
+            from models.normalization import FeatureNormalizer
+            self.normalizer = FeatureNormalizer.fit(self.train_data.features)
+        
+        # Create environment: n_envs accounts stepped together, each episode
+        # starting at a random offset into the training data
+        env, shared_arrays = self._make_vec_env(self.train_data)
+        
+        if resume_from is not None:
+            self.model = PPO.load(
+                manager.model_path(resume_from), env=env,
+                verbose=rl_params['verbose'], tensorboard_log=rl_params['tensorboard_log']
+            )
+            logger.info(f"Resuming training from {resume_from} at {self.model.num_timesteps} timesteps")
+        else:
+            self.model = self._new_model(env)
+        
+        # Train model
+        throughput = ThroughputCallback()
+        callbacks = [throughput]
+        evaluator = None
+        if manager is not None:
+            from models.callbacks import CheckpointCallback
+            evaluator = self._checkpoint_evaluator(manager)
+            callbacks.append(CheckpointCallback(
+                lambda timesteps: manager.save(self, timesteps), checkpoint_params['interval'], evaluator
+            ))
+        if callback is not None:
+            callbacks.append(callback)
+        try:
+            self.model.learn(
+                total_timesteps=max(rl_params['total_timesteps'] - self.model.num_timesteps, 0),
+                callback=CallbackList(callbacks),
+                reset_num_timesteps=resume_from is None
+            )
+        finally:
+            env.close()
+            for array in shared_arrays:
+                array.unlink()
+            if evaluator is not None:
+                evaluator.close()
+                self.evaluations = evaluator.evaluations
+        self.throughput_report = throughput.report
+        self.checkpoints = manager
+        
+        best = manager.best() if manager is not None else None
+        if best is not None and checkpoint_params['load_best']:
+            logger.info(f"Using best checkpoint {best['checkpoint']} ({checkpoint_params['metric']} {best['score']:.4f})")
+            self.load_model(manager.model_path(best['checkpoint']))
+        else:
+            self._refresh_policy()
+    
+    def _checkpoint_manager(self, resume):
+        """
+        CheckpointManager of this training run, None when checkpointing is disabled
         """
-        from models.environments import TradingEnvironment
+        from models.checkpoints import CheckpointManager
         
-        # Create environment
-        env = DummyVecEnv([lambda: TradingEnvironment(self.train_data.values)])
+        checkpoint_params = self.config.CHECKPOINT_PARAMS
+        if not checkpoint_params['enabled']:
+            if resume:
+                raise ValueError("Resuming training needs CHECKPOINT_PARAMS['enabled']")
+            return None
+        directory, keep = checkpoint_params['directory'], checkpoint_params['keep']
+        manager = CheckpointManager.latest_run(directory, keep) if resume else None
+        if resume and manager is None:
+            logger.warning(f"No checkpoint to resume from in {directory}; starting a new run")
+        return manager or CheckpointManager.new_run(directory, keep)
+    
+    def _checkpoint_evaluator(self, manager):
+        """
+        Out-of-process validation backtests of the checkpoints, None without validation rows
+        """
+        from models.checkpoints import CheckpointEvaluator
         
-        # Initialize PPO model
-        self.model = PPO(
+        checkpoint_params = self.config.CHECKPOINT_PARAMS
+        if not checkpoint_params['evaluate']:
+            return None
+        if self.validation_data is None or not len(self.validation_data):
+            logger.warning("No validation rows; checkpoints are saved but not evaluated")
+            return None
+        return CheckpointEvaluator(self.config, manager, self.validation_data, checkpoint_params['metric'])
+    
+    def _new_model(self, env):
+        """
+        PPO model with the RL_PARAMS hyperparameters
+        """
+        from stable_baselines3 import PPO
+        
+        rl_params = self.config.RL_PARAMS
+        return PPO(
             "MlpPolicy", 
             env, 
-            learning_rate=self.config.RL_PARAMS['learning_rate'],
-            n_steps=2048,
-            batch_size=64,
-            n_epochs=10,
-            gamma=0.99,
-            gae_lambda=0.95,
-            clip_range=0.2,
-            ent_coef=0.01,
-            verbose=1,
-            tensorboard_log="./ppo_trading_logs/"
+            learning_rate=rl_params['learning_rate'],
+            n_steps=rl_params['n_steps'],
+            batch_size=rl_params['batch_size'],
+            n_epochs=rl_params['n_epochs'],
+            gamma=rl_params['gamma'],
+            gae_lambda=rl_params['gae_lambda'],
+            clip_range=rl_params['clip_range'],
+            ent_coef=rl_params['ent_coef'],
+            verbose=rl_params['verbose'],
+            tensorboard_log=rl_params['tensorboard_log']
         )
+    
+    def _make_vec_env(self, data):
+        """
+        Build the training VecEnv selected by RL_PARAMS['vec_env']
         
-        # Train model
-        self.model.learn(total_timesteps=100000)
+        'native' steps every account in this process; 'subproc' spreads them
+        over n_workers processes that map the feature matrix and the price
+        vector from shared memory.
+        
+        Args:
+            data (TradingDataset): Training rows
+        
+        Returns:
+            tuple: (VecEnv, list of SharedArrays to unlink after training)
+        """
+        from stable_baselines3.common.vec_env import VecMonitor
+        from models.episode_sampler import make_episode_sampler
+        from models.vec_environment import VectorTradingEnvironment, SubprocVectorTradingEnvironment
+        from utils.shared_array import SharedArray
+        
+        rl_params = self.config.RL_PARAMS
+        env_kwargs = {
+            'n_envs': rl_params['n_envs'],
+            'initial_balance': self.config.TRADING_PARAMS['initial_balance'],
+            'episode_length': rl_params['episode_length'],
+            # Indexed once here; subproc workers receive it with their other arguments
+            'episode_sampler': make_episode_sampler(
+                rl_params.get('episode_sampler', 'random'), data, rl_params['episode_length'],
+                rl_params.get('volatility_strata', 4), first_row=self.lookback - 1
+            ),
+            'lookback': self.lookback,
+            'normalize_lookback': self.normalize_lookback
+        }
+        
+        if rl_params['vec_env'] == 'native':
+            return VecMonitor(VectorTradingEnvironment(data, normalizer=self.normalizer, **env_kwargs)), []
+        if rl_params['vec_env'] == 'subproc':
+            features = data.features if self.normalizer is None else self.normalizer.transform(data.features)
+            shared_data = SharedArray(features)
+            shared_prices = SharedArray(data.prices, dtype=np.float64)
+            env = SubprocVectorTradingEnvironment(
+                shared_data, n_workers=rl_params['n_workers'], shared_prices=shared_prices, **env_kwargs
+            )
+            return VecMonitor(env), [shared_data, shared_prices]
+        raise ValueError(f"Unknown vec_env mode: {rl_params['vec_env']}")
     
-    def predict_action(self, state):
+    def _refresh_policy(self):
+        """
+        Re-export the fast inference policy when RL_PARAMS['inference'] is 'numpy'
+        """
+        if self.config.RL_PARAMS.get('inference', 'sb3') == 'numpy':
+            self.export_policy()
+        else:
+            self.policy = None
+    
+    def export_policy(self, path=None):
+        """
+        Export the trained actor to a NumpyPolicy used by predict_action(s)
+        
+        Args:
+            path (str): Optional .npz file to save the exported weights to
+        """
+        from models.inference import NumpyPolicy
+        
+        if self.model is None:
+            raise ValueError("Model not trained. Call train() first.")
+        
+        self.policy = NumpyPolicy.from_sb3(self.model)
+        if path is not None:
+            self.policy.save(path)
+        return self.policy
+    
+    @metrics.timed('inference.predict_action')
+    def predict_action(self, state, deterministic=False):
         """
         Predict trading action
         """
+        if self.policy is not None:
+            return self.policy.predict_one(state, deterministic)
         if self.model is None:
             raise ValueError("Model not trained. Call train() first.")
         
-        action, _ = self.model.predict(state)
+        action, _ = self.model.predict(state, deterministic=deterministic)
         return action
     
+    @metrics.timed('inference.predict_actions')
+    def predict_actions(self, states, deterministic=True):
+        """
+        Predict trading actions for a batch of observations
+        
+        Args:
+            states (np.ndarray): (n, observation_size) float32 observations
+        
+        Returns:
+            np.ndarray: (n,) integer actions
+        """
+        if self.policy is not None:
+            return self.policy.predict(states, deterministic)
+        if self.model is None:
+            raise ValueError("Model not trained. Call train() first.")
+        
+        actions, _ = self.model.predict(states, deterministic=deterministic)
+        return np.asarray(actions).reshape(len(states))
+    
     def save_model(self, path='btc_trading_model'):
         """
-        Save trained model
+        Save trained model, plus the inference-only policy used by load_policy
+        and the feature normalizer it was trained with
         """
+        from models.inference import NumpyPolicy
+        
         self.model.save(path)
+        NumpyPolicy.from_sb3(self.model).save(path + POLICY_SUFFIX)
+        if self.normalizer is not None:
+            self.normalizer.save(path + NORMALIZER_SUFFIX)
+        elif os.path.exists(path + NORMALIZER_SUFFIX):
+            os.remove(path + NORMALIZER_SUFFIX)
     
     def load_model(self, path='btc_trading_model'):
         """
         Load pre-trained model
         """
+        from stable_baselines3 import PPO
+        
         self.model = PPO.load(path)
+        self._load_normalizer(path)
+        self._refresh_policy()
+    
+    def _load_normalizer(self, path):
+        """
+        Normalizer saved with the model at path; models trained on raw features have none
+        """
+        from models.normalization import FeatureNormalizer
+        
+        self.normalizer = None
+        if os.path.exists(path + NORMALIZER_SUFFIX):
+            self.normalizer = FeatureNormalizer.load(path + NORMALIZER_SUFFIX)
+    
+    def load_policy(self, path='btc_trading_model'):
+        """
+        Load only the inference policy (no torch, no stable-baselines3)
+        
+        Used by the live and backtest scripts. Models saved before the policy
+        artifact existed are loaded once through PPO and exported.
+        """
+        from models.inference import NumpyPolicy
+        
+        if not os.path.exists(path + POLICY_SUFFIX):
+            self.load_model(path)
+            NumpyPolicy.from_sb3(self.model).save(path + POLICY_SUFFIX)
+        self.policy = NumpyPolicy.load(path + POLICY_SUFFIX)
+        self._load_normalizer(path)
+        return self.policy
@@ -0,0 +1,193 @@
+import copy
+import logging
+import multiprocessing as mp
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from data.dataset import TradingDataset
+from utils.shared_array import SharedArray
+
+logger = logging.getLogger(__name__)
+
+
+def suggest_ppo_params(trial):
+    """
+    Default PPO search space, as RL_PARAMS overrides
+    """
+    return {
+        'learning_rate': trial.suggest_float('learning_rate', 1e-5, 1e-3, log=True),
+        'n_steps': trial.suggest_categorical('n_steps', [64, 128, 256, 512]),
+        'batch_size': trial.suggest_categorical('batch_size', [64, 128, 256, 512]),
+        'n_epochs': trial.suggest_int('n_epochs', 3, 20),
+        'gamma': trial.suggest_float('gamma', 0.95, 0.9999),
+        'gae_lambda': trial.suggest_float('gae_lambda', 0.8, 1.0),
+        'clip_range': trial.suggest_categorical('clip_range', [0.1, 0.2, 0.3]),
+        'ent_coef': trial.suggest_float('ent_coef', 1e-6, 0.05, log=True)
+    }
+
+
+def make_storage(url):
+    """
+    Optuna storage for url; SQLite gets a long lock timeout for concurrent trial workers
+    """
+    import optuna
+
+    engine_kwargs = {'connect_args': {'timeout': 60}} if url.startswith('sqlite') else {}
+    return optuna.storages.RDBStorage(url, engine_kwargs=engine_kwargs)
+
+
+class TrialObjective:
+    """
+    Train one PPO agent with sampled RL_PARAMS and score it by a validation backtest
+
+    Intermediate scores are reported every eval_interval timesteps so the
+    study's pruner can stop weak trials early.
+    """
+    def __init__(self, config, train, validation, search_space=suggest_ppo_params):
+        self.config = config
+        self.train = train
+        self.validation = validation
+        self.search_space = search_space
+        self.tuning_params = config.TUNING_PARAMS
+
+    def __call__(self, trial):
+        import optuna
+        from models.callbacks import TrialEvalCallback
+        from models.rl_agent import BTCRLTrader
+
+        trial_config = copy.copy(self.config)
+        trial_config.RL_PARAMS = dict(
+            self.config.RL_PARAMS,
+            **self.search_space(trial),
+            # Trials already run in parallel processes; keep each one in-process and quiet
+            vec_env='native',
+            inference='numpy',
+            verbose=0,
+            tensorboard_log=None
+        )
+        # Trials are scored by this objective and never resumed
+        trial_config.CHECKPOINT_PARAMS = dict(self.config.CHECKPOINT_PARAMS, enabled=False)
+        agent = BTCRLTrader(trial_config)
+        agent.train_data = self.train
+
+        callback = TrialEvalCallback(trial, lambda: self.score(agent), self.tuning_params['eval_interval'])
+        agent.train(callback=callback)
+        if callback.pruned:
+            raise optuna.TrialPruned()
+        return self.score(agent)
+
+    def score(self, agent):
+        """
+        Validation backtest metric of the agent's current policy
+        """
+        from trading.backtester import BTCBacktester
+
+        agent.export_policy()
+        results = BTCBacktester(agent, self.config.TRADING_PARAMS).run_comprehensive_backtest(data=self.validation)
+        return float(results[self.tuning_params['metric']])
+
+
+def _run_trials(config, storage_url, study_name, n_trials, pruner, sampler, shared, columns, symbols, split,
+                search_space, threads_per_worker):
+    """
+    Worker process: take trials from the shared study until n_trials have finished (or failed)
+    """
+    import optuna
+
+    if threads_per_worker:
+        try:
+            import torch
+            torch.set_num_threads(threads_per_worker)
+        except ImportError:
+            pass
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+
+    features, prices = [array.array for array in shared]
+    dataset = TradingDataset(features, columns, prices, symbols=symbols)
+    train, validation = dataset.slice(0, split), dataset.slice(split)
+    study = optuna.load_study(study_name=study_name, storage=make_storage(storage_url), sampler=sampler, pruner=pruner)
+    # Failed trials count too: with catch= a search whose trials all fail would otherwise never stop
+    finished = (optuna.trial.TrialState.COMPLETE, optuna.trial.TrialState.PRUNED, optuna.trial.TrialState.FAIL)
+    if len(study.get_trials(deepcopy=False, states=finished)) >= n_trials:
+        return
+    study.optimize(
+        TrialObjective(config, train, validation, search_space),
+        callbacks=[optuna.study.MaxTrialsCallback(n_trials, states=finished)],
+        catch=(ValueError, RuntimeError)
+    )
+
+
+class HyperparameterSearch:
+    """
+    Parallel optuna search over PPO hyperparameters
+
+    The float32 feature matrix and price vector are written once to
+    SharedArrays that every trial process maps read-only, splitting them
+    into training rows and the validation tail as no-copy views. Trial
+    processes share one study through TUNING_PARAMS['storage'] (SQLite by
+    default), so an interrupted search resumes where it stopped: n_trials
+    counts finished (completed, pruned or failed) trials across runs.
+    """
+    def __init__(self, config, data, n_workers=None, search_space=suggest_ppo_params,
+                 pruner=None, sampler=None, threads_per_worker=1, start_method=None):
+        self.config = config
+        self.data = data
+        self.tuning_params = config.TUNING_PARAMS
+        self.n_workers = n_workers or self.tuning_params['n_workers']
+        self.search_space = search_space
+        self.pruner = pruner
+        self.sampler = sampler
+        self.threads_per_worker = threads_per_worker
+        if start_method is None:
+            start_method = 'forkserver' if 'forkserver' in mp.get_all_start_methods() else 'spawn'
+        self.start_method = start_method
+
+    def _make_pruner(self):
+        import optuna
+
+        if self.pruner is not None:
+            return self.pruner
+        return optuna.pruners.MedianPruner(n_startup_trials=5)
+
+    def run(self, n_trials=None):
+        """
+        Run trials until the study holds n_trials finished ones
+
+        Returns:
+            optuna.Study: The study, with best_params / trials_dataframe()
+        """
+        import optuna
+
+        n_trials = n_trials or self.tuning_params['n_trials']
+        storage_url = self.tuning_params['storage']
+        study_name = self.tuning_params['study_name']
+        pruner = self._make_pruner()
+        study = optuna.create_study(
+            study_name=study_name,
+            storage=make_storage(storage_url),
+            sampler=self.sampler,
+            pruner=pruner,
+            direction='maximize',
+            load_if_exists=True
+        )
+
+        dataset = self.data if isinstance(self.data, TradingDataset) else TradingDataset.from_frame(self.data)
+        split = int(len(dataset) * (1 - self.tuning_params['validation_fraction']))
+        shared = [SharedArray(dataset.features), SharedArray(dataset.prices, dtype=np.float64)]
+        try:
+            with ProcessPoolExecutor(max_workers=self.n_workers, mp_context=mp.get_context(self.start_method)) as pool:
+                futures = [
+                    pool.submit(_run_trials, self.config, storage_url, study_name, n_trials, pruner, self.sampler,
+                                shared, dataset.columns, dataset.symbols, split, self.search_space,
+                                self.threads_per_worker)
+                    for _ in range(self.n_workers)
+                ]
+                for future in futures:
+                    future.result()
+        finally:
+            for array in shared:
+                array.unlink()
+
+        study = optuna.load_study(study_name=study_name, storage=make_storage(storage_url))
+        if study.get_trials(deepcopy=False, states=(optuna.trial.TrialState.COMPLETE,)):
+            logger.info(f"Best trial {study.best_trial.number}: {study.best_value:.4f} with {study.best_params}")
+        return study
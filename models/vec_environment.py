@@ -0,0 +1,316 @@
+import multiprocessing as mp
+import gymnasium as gym
+import numpy as np
+from stable_baselines3.common.vec_env import VecEnv
+from models.environments import PORTFOLIO_FIELDS, split_features_and_prices
+from models.episode_sampler import RandomWindowSampler
+from models.observations import LookbackWindows
+from utils.instrumentation import metrics
+
+class VectorTradingEnvironment(VecEnv):
+    """
+    N trading accounts stepped together over one shared feature matrix
+
+    Follows the TradingEnvironment rules (all-in buy, full sell, reward is
+    portfolio return on the initial balance) but keeps balances, holdings
+    and cursors as arrays so one step() is a handful of NumPy operations
+    whatever the number of accounts. Each episode covers episode_length
+    steps from a start drawn by episode_sampler (a uniformly random offset
+    by default, see models.episode_sampler); finished accounts are reset
+    automatically, as SB3 expects.
+
+    Universe data ((n, n_symbols, n_features) features) spreads the accounts
+    round-robin over the symbols, starting at first_account, so one policy
+    learns from every symbol in the same rollout.
+
+    lookback > 1 gives TradingEnvironment's lookback-window observations;
+    each step writes every account's window straight into the observation
+    buffer from a view of the feature matrix. A FeatureNormalizer is
+    applied to the features once, when the environment is built.
+    """
+    def __init__(self, data, n_envs=64, initial_balance=10000, episode_length=2048, seed=None, prices=None,
+                 first_account=0, episode_sampler=None, lookback=1, normalize_lookback=True, normalizer=None):
+        self.render_mode = None
+        self.initial_balance = initial_balance
+
+        data, prices = split_features_and_prices(data, prices)
+        if data.ndim == 2:
+            data = data[:, None]
+            prices = np.asarray(prices)[:, None]
+        n_rows, n_symbols, n_features = data.shape
+        if normalizer is not None:
+            self._features = normalizer.transform(data)
+        else:
+            self._features = np.ascontiguousarray(data, dtype=np.float32)
+        self._prices = np.ascontiguousarray(prices, dtype=np.float64)
+        self.n_features = n_features
+        self.account_symbol = (first_account + np.arange(n_envs)) % n_symbols
+        self.lookback = lookback
+        self._windows = LookbackWindows(self._features, lookback, normalize_lookback) if lookback > 1 else None
+        episode_sampler = episode_sampler or RandomWindowSampler(n_rows, episode_length, first_row=lookback - 1)
+        if episode_sampler.first_row < lookback - 1:
+            raise ValueError(f"Episode sampler starts before row {lookback - 1}, the first full lookback window")
+        self.episode_sampler = episode_sampler
+        self.episode_length = self.episode_sampler.episode_length
+        self._last_step = n_rows - 1
+
+        self.episode_start = np.zeros(n_envs, dtype=np.int64)
+        self.current_step = np.zeros(n_envs, dtype=np.int64)
+        self.balance = np.full(n_envs, float(initial_balance))
+        self.btc_held = np.zeros(n_envs)
+        self.total_reward = np.zeros(n_envs)
+        self.observation_size = lookback * n_features + PORTFOLIO_FIELDS
+        self._obs = np.zeros((n_envs, self.observation_size), dtype=np.float32)
+        # (n_envs, lookback, n_features) view of the window part of _obs
+        self._window_obs = self._obs[:, :lookback * n_features].reshape(n_envs, lookback, n_features)
+        self._actions = np.zeros(n_envs, dtype=np.int64)
+        self._rng = np.random.default_rng(seed)
+
+        # Same spaces as TradingEnvironment
+        observation_space = gym.spaces.Box(
+            low=-np.inf, high=np.inf,
+            shape=(self.observation_size,),
+            dtype=np.float32
+        )
+        super().__init__(n_envs, observation_space, gym.spaces.Discrete(3))
+
+    def reset(self):
+        if self._seeds[0] is not None:
+            self._rng = np.random.default_rng(self._seeds[0])
+        self._reset_seeds()
+        self._reset_options()
+
+        self._reset_accounts(np.arange(self.num_envs))
+        return self._get_observations()
+
+    def step_async(self, actions):
+        self._actions = np.asarray(actions).reshape(self.num_envs)
+
+    @metrics.timed('env.vec_step')
+    def step_wait(self):
+        price = self._prices[self.current_step, self.account_symbol]
+
+        # Trade execution logic, vectorized over accounts
+        buy = (self._actions == 1) & (self.balance > price)
+        sell = (self._actions == 2) & (self.btc_held > 0)
+        self.btc_held = np.where(buy, self.balance / price, self.btc_held)
+        self.balance = np.where(buy, 0.0, self.balance)
+        self.balance = np.where(sell, self.btc_held * price, self.balance)
+        self.btc_held = np.where(sell, 0.0, self.btc_held)
+
+        # Same reward as TradingEnvironment._calculate_reward
+        rewards = ((self.balance + self.btc_held * price - self.initial_balance) / self.initial_balance).astype(np.float32)
+
+        self.current_step += 1
+        dones = self.current_step - self.episode_start >= self.episode_length
+        dones |= self.current_step >= self._last_step
+        obs = self._get_observations()
+
+        infos = [{} for _ in range(self.num_envs)]
+        done_envs = np.flatnonzero(dones)
+        if len(done_envs):
+            for env_idx in done_envs:
+                infos[env_idx]['terminal_observation'] = obs[env_idx].copy()
+                # Window ends are time limits; only the end of the data is terminal
+                infos[env_idx]['TimeLimit.truncated'] = bool(self.current_step[env_idx] < self._last_step)
+            self._reset_accounts(done_envs)
+            obs = self._get_observations()
+
+        return obs, rewards, dones, infos
+
+    def close(self):
+        pass
+
+    def get_attr(self, attr_name, indices=None):
+        return [getattr(self, attr_name) for _ in self._get_indices(indices)]
+
+    def set_attr(self, attr_name, value, indices=None):
+        setattr(self, attr_name, value)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        """
+        Call a method of the environment once and return its result for every selected account
+
+        The accounts share this one environment object, as for get_attr / set_attr.
+        """
+        result = getattr(self, method_name)(*method_args, **method_kwargs)
+        return [result for _ in self._get_indices(indices)]
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return [False for _ in self._get_indices(indices)]
+
+    def _reset_accounts(self, env_indices):
+        """
+        Start new episodes for the given accounts at sampled offsets
+        """
+        starts = self.episode_sampler.sample(self._rng, len(env_indices))
+        self.episode_start[env_indices] = starts
+        self.current_step[env_indices] = starts
+        self.balance[env_indices] = self.initial_balance
+        self.btc_held[env_indices] = 0.0
+        self.total_reward[env_indices] = 0.0
+
+    def _get_observations(self):
+        """
+        Gather feature rows and portfolio fields for every account into a fresh float32 array
+        """
+        obs = self._obs
+        window_size = self.lookback * self.n_features
+        if self._windows is not None:
+            self._windows.write(self._window_obs, self.current_step, self.account_symbol)
+        else:
+            obs[:, :window_size] = self._features[self.current_step, self.account_symbol]
+        obs[:, window_size] = self.balance / self.initial_balance
+        obs[:, window_size + 1] = self.btc_held
+        obs[:, window_size + 2] = self.total_reward
+        return obs.copy()
+
+
+def _vec_env_worker(remote, parent_remote, shared_data, shared_prices, env_kwargs):
+    """
+    Worker process loop hosting one VectorTradingEnvironment over shared data
+    """
+    parent_remote.close()
+    prices = None if shared_prices is None else shared_prices.array
+    env = VectorTradingEnvironment(shared_data.array, prices=prices, **env_kwargs)
+    try:
+        while True:
+            command, payload = remote.recv()
+            if command == 'step':
+                remote.send(env.step(payload))
+            elif command == 'reset':
+                if payload is not None:
+                    env.seed(payload)
+                remote.send(env.reset())
+            elif command == 'get_attr':
+                remote.send(env.get_attr(payload))
+            elif command == 'set_attr':
+                remote.send(env.set_attr(*payload))
+            elif command == 'env_method':
+                method_name, method_args, method_kwargs = payload
+                remote.send(getattr(env, method_name)(*method_args, **method_kwargs))
+            elif command == 'close':
+                remote.close()
+                break
+            else:
+                raise NotImplementedError(f"Unknown worker command: {command}")
+    except (KeyboardInterrupt, EOFError):
+        pass
+
+
+class SubprocVectorTradingEnvironment(VecEnv):
+    """
+    VectorTradingEnvironment accounts spread over worker processes
+
+    Each worker hosts its own VectorTradingEnvironment over a slice of the
+    n_envs accounts and maps the feature matrix (and the price vector, when
+    given) from SharedArrays, so the data is neither pickled nor copied per
+    process. Steps are dispatched to all workers before any result is
+    awaited. Each worker gets episode_sampler.for_worker(), so stateful
+    samplers such as WalkForwardSampler hand the workers different windows.
+    Features are shared as they are, so a FeatureNormalizer is applied
+    before the SharedArray is written. With universe data the accounts keep
+    the same round-robin symbol assignment as a single
+    VectorTradingEnvironment.
+    """
+    def __init__(self, shared_data, n_envs=64, n_workers=4, initial_balance=10000,
+                 episode_length=2048, seed=None, start_method=None, shared_prices=None, episode_sampler=None,
+                 lookback=1, normalize_lookback=True):
+        n_workers = max(1, min(n_workers, n_envs))
+        self._splits = np.cumsum([len(chunk) for chunk in np.array_split(np.arange(n_envs), n_workers)])[:-1]
+        self._worker_envs = np.diff(np.concatenate([[0], self._splits, [n_envs]]))
+        self.closed = False
+
+        if start_method is None:
+            start_method = 'forkserver' if 'forkserver' in mp.get_all_start_methods() else 'spawn'
+        ctx = mp.get_context(start_method)
+
+        self.remotes, self.processes = [], []
+        first_accounts = np.concatenate([[0], self._splits])
+        for worker_idx, worker_envs in enumerate(self._worker_envs):
+            remote, work_remote = ctx.Pipe()
+            env_kwargs = {
+                'n_envs': int(worker_envs),
+                'initial_balance': initial_balance,
+                'episode_length': episode_length,
+                'seed': None if seed is None else seed + worker_idx,
+                'first_account': int(first_accounts[worker_idx]),
+                'episode_sampler': episode_sampler and episode_sampler.for_worker(worker_idx, len(self._worker_envs)),
+                'lookback': lookback,
+                'normalize_lookback': normalize_lookback
+            }
+            process = ctx.Process(
+                target=_vec_env_worker,
+                args=(work_remote, remote, shared_data, shared_prices, env_kwargs),
+                daemon=True
+            )
+            process.start()
+            work_remote.close()
+            self.remotes.append(remote)
+            self.processes.append(process)
+
+        # Same spaces as TradingEnvironment
+        observation_space = gym.spaces.Box(
+            low=-np.inf, high=np.inf,
+            shape=(lookback * shared_data.array.shape[-1] + PORTFOLIO_FIELDS,),
+            dtype=np.float32
+        )
+        super().__init__(n_envs, observation_space, gym.spaces.Discrete(3))
+
+    def reset(self):
+        for worker_idx, remote in enumerate(self.remotes):
+            seed = self._seeds[0]
+            remote.send(('reset', None if seed is None else seed + worker_idx))
+        self._reset_seeds()
+        self._reset_options()
+        return np.concatenate([remote.recv() for remote in self.remotes])
+
+    def step_async(self, actions):
+        for remote, worker_actions in zip(self.remotes, np.split(np.asarray(actions), self._splits)):
+            remote.send(('step', worker_actions))
+
+    @metrics.timed('env.subproc_step')
+    def step_wait(self):
+        results = [remote.recv() for remote in self.remotes]
+        obs, rewards, dones, infos = zip(*results)
+        return (
+            np.concatenate(obs),
+            np.concatenate(rewards),
+            np.concatenate(dones),
+            [info for worker_infos in infos for info in worker_infos]
+        )
+
+    def close(self):
+        if self.closed:
+            return
+        for remote in self.remotes:
+            remote.send(('close', None))
+        for process in self.processes:
+            process.join()
+        self.closed = True
+
+    def get_attr(self, attr_name, indices=None):
+        for remote in self.remotes:
+            remote.send(('get_attr', attr_name))
+        values = [value for remote in self.remotes for value in remote.recv()]
+        return [values[i] for i in self._get_indices(indices)]
+
+    def set_attr(self, attr_name, value, indices=None):
+        for remote in self.remotes:
+            remote.send(('set_attr', (attr_name, value)))
+        for remote in self.remotes:
+            remote.recv()
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        """
+        Call a method once in each worker hosting a selected account; every account gets its worker's result
+        """
+        workers = np.searchsorted(self._splits, list(self._get_indices(indices)), side='right')
+        targets = sorted(set(workers.tolist()))
+        for worker_idx in targets:
+            self.remotes[worker_idx].send(('env_method', (method_name, method_args, method_kwargs)))
+        results = {worker_idx: self.remotes[worker_idx].recv() for worker_idx in targets}
+        return [results[worker_idx] for worker_idx in workers]
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return [False for _ in self._get_indices(indices)]
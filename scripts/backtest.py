@@ -2,15 +2,18 @@
 import sys
 import os
 import logging
-import pandas as pd
 
 # Add project root to Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config.config import Config
+from utils.instrumentation import Monitoring
 from models.rl_agent import BTCRLTrader
 from trading.backtester import BTCBacktester
-from data.data_fetcher import BTCDataFetcher
+from data.universe import MarketUniverse
+from data.candle_store import CandleStore
+from utils.feature_cache import FeatureCache
+from utils.indicators import IndicatorEngine
 
 def run_backtest():
     """
@@ -20,14 +23,23 @@ def run_backtest():
                         format='%(asctime)s - %(levelname)s: %(message)s')
     logger = logging.getLogger(__name__)
 
+    monitoring = None
     try:
         # Load configuration
         config = Config()
+        monitoring = Monitoring(config.MONITORING_PARAMS).start()
         
         # Fetch historical data
-        logger.info("Fetching historical BTC data...")
-        data_fetcher = BTCDataFetcher()
-        historical_data = data_fetcher.fetch_historical_btc_data(
+        logger.info(f"Fetching historical data for {', '.join(config.TRADING_PARAMS['symbols'])}...")
+        universe = MarketUniverse.from_config(
+            config,
+            store=CandleStore(config.DATA_PARAMS['cache_dir']),
+            indicator_engine=IndicatorEngine(cache=FeatureCache(
+                config.DATA_PARAMS['feature_cache_dir'],
+                config.DATA_PARAMS['feature_cache_max_bytes']
+            ))
+        )
+        historical_data = universe.load(
             start_date='2022-01-01', 
             end_date='2024-01-01'
         )
@@ -35,7 +47,8 @@ def run_backtest():
         # Load pre-trained model
         logger.info("Loading pre-trained BTC trading model...")
         btc_trader = BTCRLTrader(config)
-        btc_trader.load_model('btc_trading_model')
+        btc_trader.load_policy('btc_trading_model')
+        btc_trader.prepare_training_data(historical_data)
         
         # Run comprehensive backtest
         logger.info("Running comprehensive backtest...")
@@ -51,6 +64,9 @@ def run_backtest():
     except Exception as e:
         logger.error(f"Backtest failed: {e}")
         raise
+    finally:
+        if monitoring is not None:
+            monitoring.stop()
 
 if __name__ == "__main__":
     run_backtest()
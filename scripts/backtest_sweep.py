@@ -0,0 +1,78 @@
+# scripts/backtest_sweep.py
+import sys
+import os
+import argparse
+import logging
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.config import Config
+from data.universe import MarketUniverse
+from data.candle_store import CandleStore
+from utils.feature_cache import FeatureCache
+from utils.indicators import IndicatorEngine
+from trading.sweep import BacktestSweep, walk_forward_windows
+
+def run_sweep():
+    """
+    Script to run walk-forward backtests of several models and trading parameters in parallel
+    """
+    parser = argparse.ArgumentParser(description="Parallel walk-forward / parameter-sweep backtests")
+    parser.add_argument('--models', nargs='+', default=['btc_trading_model'])
+    parser.add_argument('--start-date', default='2022-01-01')
+    parser.add_argument('--end-date', default='2024-01-01')
+    parser.add_argument('--window', default='90D')
+    parser.add_argument('--step', default='30D')
+    parser.add_argument('--leverage', nargs='+', type=float)
+    parser.add_argument('--fee-rate', nargs='+', type=float)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--output', default='backtest_sweep.csv')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, 
+                        format='%(asctime)s - %(levelname)s: %(message)s')
+    logger = logging.getLogger(__name__)
+
+    try:
+        # Load configuration
+        config = Config()
+        
+        # Fetch historical data, with the same symbols and feature columns as training
+        logger.info(f"Loading historical data for {', '.join(config.TRADING_PARAMS['symbols'])}...")
+        universe = MarketUniverse.from_config(
+            config,
+            store=CandleStore(config.DATA_PARAMS['cache_dir']),
+            indicator_engine=IndicatorEngine(cache=FeatureCache(
+                config.DATA_PARAMS['feature_cache_dir'],
+                config.DATA_PARAMS['feature_cache_max_bytes']
+            ))
+        )
+        historical_data = universe.load(
+            start_date=args.start_date, 
+            end_date=args.end_date
+        )
+
+        # Build and run the job grid
+        param_grid = {}
+        if args.leverage:
+            param_grid['leverage'] = args.leverage
+        if args.fee_rate:
+            param_grid['trading_fee_rate'] = args.fee_rate
+        
+        sweep = BacktestSweep(config, historical_data, n_workers=args.workers)
+        # Row windows of the dataset (indicator warm-up rows already dropped)
+        windows = walk_forward_windows(sweep.data.index, args.window, args.step)
+        jobs = sweep.make_jobs(args.models, windows, param_grid)
+        logger.info(f"Running {len(jobs)} backtests...")
+        summary = sweep.run(jobs)
+        
+        summary.to_csv(args.output, index=False)
+        logger.info(f"Sweep summary saved to {args.output}")
+
+    except Exception as e:
+        logger.error(f"Backtest sweep failed: {e}")
+        raise
+
+if __name__ == "__main__":
+    run_sweep()
@@ -1,15 +1,114 @@
 import sys
 import os
+import asyncio
 import logging
 import time
+import numpy as np
 
 # Add project root to Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config.config import Config
+from utils.instrumentation import Monitoring
 from models.rl_agent import BTCRLTrader
 from trading.live_trader import BTCLiveTrader
 from data.data_fetcher import BTCDataFetcher
+from data.candle_store import CandleStore
+from data.market_feed import MarketDataFeed, CCXTStreamSource
+from data.universe import timeframe_ms
+from models.observations import window_observation
+
+WARM_UP_BARS = 1000
+
+async def trading_loop(feeds, btc_trader, live_traders, logger):
+    """
+    Decide and trade every symbol on each bar close, in one batched inference call
+
+    Features go through the model's FeatureNormalizer, as in training. A
+    policy trained on lookback windows is fed each feed's latest window,
+    normalized the same way.
+    """
+    atr_column = feeds[0].columns.index('atr')
+    lookback = getattr(btc_trader, 'lookback', 1)
+    normalize = getattr(btc_trader, 'normalize_lookback', True)
+    normalizer = getattr(btc_trader, 'normalizer', None)
+    streams = [feed.bars() for feed in feeds]
+    while True:
+        # Bars of one timestamp close together on every symbol
+        bars = await asyncio.gather(*(anext(stream, None) for stream in streams))
+        if any(bar is None for bar in bars):
+            return
+        try:
+            if len({bar.timestamp for bar in bars}) > 1:
+                logger.warning(f"Misaligned bars across symbols: {[bar.timestamp for bar in bars]}")
+            for bar, live_trader in zip(bars, live_traders):
+                live_trader.risk.update_market(bar.close, bar.features[atr_column])
+            features = np.stack([bar.window if lookback > 1 else bar.features for bar in bars])
+            if normalizer is not None:
+                normalizer.transform(features, out=features)
+            observations = np.stack([
+                np.concatenate([
+                    window_observation(symbol_features, normalize) if lookback > 1 else symbol_features,
+                    live_trader.portfolio_fields()
+                ])
+                for symbol_features, live_trader in zip(features, live_traders)
+            ]).astype(np.float32)
+            trading_decisions = btc_trader.predict_actions(observations, deterministic=False)
+            first_close = min(bar.closed_at for bar in bars)
+            logger.info(f"Bar {bars[0].timestamp}: {len(bars)} symbol(s) decided in "
+                        f"{(time.perf_counter() - first_close) * 1000:.2f} ms")
+
+            # Orders are in flight while the loop waits for the next bars
+            for bar, live_trader, trading_decision in zip(bars, live_traders, trading_decisions):
+                live_trader.execute_trade(int(trading_decision), bar.close, decided_at=bar.closed_at)
+                live_trader.metrics.update(live_trader.equity(bar.close))
+
+        except Exception as trade_error:
+            logger.error(f"Trading error: {trade_error}")
+
+async def run_live_trading(config, btc_trader, live_traders, logger):
+    trading_params = config.TRADING_PARAMS
+    timeframe = trading_params['timeframe']
+    higher_timeframes = trading_params['higher_timeframes']
+    store = CandleStore(config.DATA_PARAMS['cache_dir'])
+
+    # Enough history to warm up the indicators of the largest timeframe
+    now = int(time.time() * 1000)
+    warm_up_ms = WARM_UP_BARS * max(timeframe_ms(frame) for frame in [timeframe, *higher_timeframes])
+
+    # One REST client for every backfill and one websocket client for every stream
+    rest_exchange, stream_exchange = None, None
+    feeds = []
+    for live_trader in live_traders:
+        fetcher = BTCDataFetcher(
+            symbol=live_trader.symbol,
+            timeframe=timeframe,
+            exchange=rest_exchange,
+            max_workers=config.DATA_PARAMS['max_workers'],
+            store=store
+        )
+        rest_exchange = fetcher.exchange
+        history = fetcher.load_ohlcv(now - warm_up_ms, now)
+
+        source = CCXTStreamSource(live_trader.symbol, timeframe, stream_exchange)
+        stream_exchange = source.exchange
+        feed = MarketDataFeed(source, window_size=WARM_UP_BARS, timeframe=timeframe,
+                              higher_timeframes=higher_timeframes, lookback=btc_trader.lookback)
+        feed.warm_up(history)
+        feeds.append(feed)
+
+    await asyncio.gather(*(live_trader.start() for live_trader in live_traders))
+    feed_tasks = [asyncio.create_task(feed.run()) for feed in feeds]
+    try:
+        await trading_loop(feeds, btc_trader, live_traders, logger)
+    finally:
+        for feed_task in feed_tasks:
+            feed_task.cancel()
+        await feeds[0].source.close()
+        # Traders share one session; the first closes it after the others drain
+        for live_trader in live_traders[1:]:
+            await live_trader.close(close_session=False)
+        await live_traders[0].close()
 
 def start_live_trading():
     """
@@ -19,42 +118,37 @@ def start_live_trading():
                         format='%(asctime)s - %(levelname)s: %(message)s')
     logger = logging.getLogger(__name__)
 
+    monitoring = None
     try:
         # Load configuration
         config = Config()
+        monitoring = Monitoring(config.MONITORING_PARAMS).start()
         
         # Load pre-trained model
         logger.info("Loading pre-trained BTC trading model...")
         btc_trader = BTCRLTrader(config)
-        btc_trader.load_model('btc_trading_model')
+        btc_trader.load_policy('btc_trading_model')
         
-        # Initialize live trader
+        # Initialize one live trader per symbol on a shared session and rate limit
         logger.info("Initializing live trading...")
-        live_trader = BTCLiveTrader(config, btc_trader)
+        symbols = config.TRADING_PARAMS['symbols']
+        allocation = 1.0 / len(symbols)
+        live_trader = BTCLiveTrader(config, btc_trader, symbol=symbols[0], allocation=allocation)
+        live_traders = [live_trader] + [
+            BTCLiveTrader(config, btc_trader, live_trader.exchange, symbol, allocation, live_trader.engine.rate_limiter)
+            for symbol in symbols[1:]
+        ]
         
-        # Start continuous trading loop
-        logger.info("Starting live trading on Binance Testnet...")
-        while True:
-            try:
-                # Fetch latest market data
-                latest_data = BTCDataFetcher().fetch_latest_btc_data()
-                
-                # Make trading decision
-                trading_decision = btc_trader.predict_action(latest_data)
-                
-                # Execute trade
-                live_trader.execute_trade(trading_decision)
-                
-                # Wait before next iteration
-                time.sleep(60)  # 1-minute interval
-                
-            except Exception as trade_error:
-                logger.error(f"Trading error: {trade_error}")
-                time.sleep(60)  # Wait before retry
+        # Start streaming trading loop
+        logger.info(f"Starting live trading of {', '.join(symbols)} on Binance Testnet...")
+        asyncio.run(run_live_trading(config, btc_trader, live_traders, logger))
 
     except Exception as e:
         logger.error(f"Live trading initialization failed: {e}")
         raise
+    finally:
+        if monitoring is not None:
+            monitoring.stop()
 
 if __name__ == "__main__":
     start_live_trading()
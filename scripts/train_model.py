@@ -1,6 +1,7 @@
 import sys
 import os
 import logging
+import argparse
 import numpy as np
 import pandas as pd
 import torch
@@ -10,27 +11,43 @@ from stable_baselines3 import PPO
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config.config import Config
-from data.data_fetcher import BTCDataFetcher
+from utils.instrumentation import Monitoring
+from data.universe import MarketUniverse
+from data.candle_store import CandleStore
+from utils.feature_cache import FeatureCache
+from utils.indicators import IndicatorEngine
 from models.rl_agent import BTCRLTrader
 from trading.backtester import BTCBacktester
 
-def train_model():
+def train_model(resume=False):
     """
     Script to train the BTC trading model
+
+    Args:
+        resume (bool): Continue the latest checkpointed run (CHECKPOINT_PARAMS['directory'])
     """
     # Configure logging
     logging.basicConfig(level=logging.INFO, 
                         format='%(asctime)s - %(levelname)s: %(message)s')
     logger = logging.getLogger(__name__)
 
+    monitoring = None
     try:
         # Load configuration
         config = Config()
+        monitoring = Monitoring(config.MONITORING_PARAMS).start()
         
         # Fetch historical data
-        logger.info("Fetching historical BTC data...")
-        data_fetcher = BTCDataFetcher()
-        historical_data = data_fetcher.fetch_historical_btc_data(
+        logger.info(f"Fetching historical data for {', '.join(config.TRADING_PARAMS['symbols'])}...")
+        universe = MarketUniverse.from_config(
+            config,
+            store=CandleStore(config.DATA_PARAMS['cache_dir']),
+            indicator_engine=IndicatorEngine(cache=FeatureCache(
+                config.DATA_PARAMS['feature_cache_dir'],
+                config.DATA_PARAMS['feature_cache_max_bytes']
+            ))
+        )
+        historical_data = universe.load(
             start_date='2022-01-01', 
             end_date='2024-01-01'
         )
@@ -38,10 +55,11 @@ def train_model():
         # Initialize and train RL agent
         logger.info("Initializing BTC trading agent...")
         btc_trader = BTCRLTrader(config)
-        btc_trader.prepare_training_data(historical_data)
+        # Validation rows score the training checkpoints; the test tail stays unseen
+        btc_trader.prepare_training_data(historical_data, train_fraction=0.7, validation_fraction=0.1)
         
-        logger.info("Starting model training...")
-        btc_trader.train()
+        logger.info("Resuming model training..." if resume else "Starting model training...")
+        btc_trader.train(resume=resume)
         
         # Backtest the model
         logger.info("Running backtest...")
@@ -57,8 +75,14 @@ def train_model():
     except Exception as e:
         logger.error(f"Training failed: {e}")
         raise
+    finally:
+        if monitoring is not None:
+            monitoring.stop()
 
 if __name__ == "__main__":
-    train_model()
+    parser = argparse.ArgumentParser(description="Train the BTC trading model")
+    parser.add_argument('--resume', action='store_true', help="Continue the latest checkpointed run")
+    args = parser.parse_args()
+    train_model(resume=args.resume)
 
 
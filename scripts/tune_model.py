@@ -0,0 +1,78 @@
+# scripts/tune_model.py
+import sys
+import os
+import argparse
+import logging
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.config import Config
+from utils.instrumentation import Monitoring
+from data.universe import MarketUniverse
+from data.candle_store import CandleStore
+from utils.feature_cache import FeatureCache
+from utils.indicators import IndicatorEngine
+from models.tuning import HyperparameterSearch
+
+def tune_model():
+    """
+    Script to search PPO hyperparameters with parallel, pruned optuna trials
+    """
+    parser = argparse.ArgumentParser(description="Parallel optuna search over BTCRLTrader hyperparameters")
+    parser.add_argument('--start-date', default='2022-01-01')
+    parser.add_argument('--end-date', default='2024-01-01')
+    parser.add_argument('--trials', type=int, default=None, help="Finished trials to reach (TUNING_PARAMS['n_trials'])")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--storage', default=None, help="Optuna storage URL (TUNING_PARAMS['storage'])")
+    parser.add_argument('--study-name', default=None)
+    parser.add_argument('--output', default='tuning_trials.csv')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, 
+                        format='%(asctime)s - %(levelname)s: %(message)s')
+    logger = logging.getLogger(__name__)
+
+    monitoring = None
+    try:
+        # Load configuration
+        config = Config()
+        if args.storage:
+            config.TUNING_PARAMS['storage'] = args.storage
+        if args.study_name:
+            config.TUNING_PARAMS['study_name'] = args.study_name
+        monitoring = Monitoring(config.MONITORING_PARAMS).start()
+        
+        # Load historical data (features come from the shared feature cache)
+        logger.info(f"Loading historical data for {', '.join(config.TRADING_PARAMS['symbols'])}...")
+        universe = MarketUniverse.from_config(
+            config,
+            store=CandleStore(config.DATA_PARAMS['cache_dir']),
+            indicator_engine=IndicatorEngine(cache=FeatureCache(
+                config.DATA_PARAMS['feature_cache_dir'],
+                config.DATA_PARAMS['feature_cache_max_bytes']
+            ))
+        )
+        historical_data = universe.load(
+            start_date=args.start_date, 
+            end_date=args.end_date
+        )
+        
+        # Tune on the training split only; the test split stays unseen
+        train_data, _, _ = historical_data.split(0.8)
+        
+        search = HyperparameterSearch(config, train_data, n_workers=args.workers)
+        study = search.run(n_trials=args.trials)
+        
+        study.trials_dataframe().to_csv(args.output, index=False)
+        logger.info(f"Trial summary saved to {args.output}")
+
+    except Exception as e:
+        logger.error(f"Hyperparameter search failed: {e}")
+        raise
+    finally:
+        if monitoring is not None:
+            monitoring.stop()
+
+if __name__ == "__main__":
+    tune_model()
@@ -0,0 +1,172 @@
+import unittest
+import numpy as np
+import pandas as pd
+from data.dataset import TradingDataset
+from trading.backtester import BTCBacktester, BUY, SELL, LIQUIDATION
+from trading.sweep import BacktestSweep, walk_forward_windows
+
+TRADING_PARAMS = {
+    'leverage': 3,
+    'initial_balance': 10000,
+    'trading_fee_rate': 0.0004
+}
+
+class ScriptedAgent:
+    """
+    Deterministic stand-in policy: the 'signal' feature shifted by whether a position is held
+    """
+    def __init__(self, test_data, shift=0):
+        self.test_data = test_data
+        self.signal_col = list(test_data.columns).index('signal')
+        self.n_features = test_data.shape[1]
+        self.shift = shift
+        self.calls = 0
+
+    def predict_actions(self, states):
+        self.calls += 1
+        holding = states[:, self.n_features + 1] > 0
+        return ((states[:, self.signal_col].astype(np.int64) + holding + self.shift) % 3)
+
+class SweepConfig:
+    TRADING_PARAMS = TRADING_PARAMS
+
+def scripted_agent_factory(config, model):
+    """
+    Picklable agent factory for sweep workers; the model id is the policy shift
+    """
+    return ScriptedAgent(make_bars(), shift=model)
+
+def make_bars(n=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 30000 * np.exp(np.cumsum(rng.normal(0, 0.003, n)))
+    low = close * (1 - np.abs(rng.normal(0, 0.002, n)))
+    signal = rng.choice([0, 1, 2], size=n, p=[0.96, 0.02, 0.02])
+    return pd.DataFrame({'open': close, 'high': close, 'low': low, 'close': close, 'signal': signal.astype(float)})
+
+def make_warm_up_bars():
+    """
+    make_bars with an 'atr' column whose first 100 rows are indicator warm-up NaNs
+    """
+    data = make_bars()
+    data['atr'] = data['close'] * 0.002
+    data.loc[:99, 'atr'] = np.nan
+    data.index = pd.date_range('2023-01-01', periods=len(data), freq='1h')
+    return data
+
+def warm_up_agent_factory(config, model):
+    return ScriptedAgent(make_warm_up_bars(), shift=model)
+
+def reference_backtest(agent, data, params):
+    """
+    Bar-by-bar simulation of the same fill, fee and liquidation rules
+    """
+    initial = params['initial_balance']
+    equity, quantity, entry, liq = float(initial), 0.0, 0.0, -np.inf
+    curve, sides = [equity], []
+    for i, row in enumerate(data.values):
+        close, low = data['close'].iloc[i], data['low'].iloc[i]
+        if quantity and low <= liq:
+            equity, quantity, liq = 0.0, 0.0, -np.inf
+            sides.append(LIQUIDATION)
+        obs = np.concatenate([row, [0.0 if quantity else equity / initial, quantity, 0.0]]).astype(np.float32)
+        action = agent.predict_actions(obs[None])[0]
+        if action == BUY and not quantity and equity > 0:
+            notional = equity * params['leverage']
+            quantity = notional / close
+            equity -= notional * params['trading_fee_rate']
+            entry, liq = close, close - equity / quantity
+            sides.append(BUY)
+        elif action == SELL and quantity:
+            equity = max(equity + quantity * (close - entry) - quantity * close * params['trading_fee_rate'], 0.0)
+            quantity, liq = 0.0, -np.inf
+            sides.append(SELL)
+        curve.append(equity + quantity * (close - entry) if quantity else equity)
+    return np.array(curve), sides
+
+class TestBTCBacktester(unittest.TestCase):
+    def test_matches_bar_by_bar_simulation(self):
+        data = make_bars()
+        agent = ScriptedAgent(data)
+        results = BTCBacktester(agent, TRADING_PARAMS).run_comprehensive_backtest()
+
+        expected_curve, expected_sides = reference_backtest(ScriptedAgent(data), data, TRADING_PARAMS)
+
+        np.testing.assert_allclose(results['equity_curve'], expected_curve, rtol=1e-9)
+        self.assertEqual(results['trades']['side'].tolist(), expected_sides)
+        self.assertEqual(results['total_trades'], len(expected_sides))
+        self.assertLess(agent.calls, len(data) / 10)
+
+    def test_liquidation_uses_bar_low(self):
+        data = pd.DataFrame({
+            'open': 100.0, 'high': 100.0,
+            'low': [100.0, 100.0, 60.0, 100.0],
+            'close': [100.0, 100.0, 95.0, 100.0],
+            'signal': [1.0, 0.0, 0.0, 0.0]
+        })
+        results = BTCBacktester(ScriptedAgent(data), TRADING_PARAMS).run_comprehensive_backtest()
+
+        self.assertEqual(results['trades']['side'].tolist(), [BUY, LIQUIDATION])
+        self.assertEqual(results['final_balance'], 0.0)
+        self.assertEqual(results['max_drawdown'], 100.0)
+
+    def test_risk_engine_marks_held_position(self):
+        data = pd.DataFrame({
+            'open': 100.0, 'high': 100.0,
+            'low': [100.0, 100.0, 90.0, 85.0],
+            'close': [100.0, 100.0, 95.0, 90.0],
+            'signal': [1.0, 0.0, 0.0, 0.0],
+            'atr': [1.0, 1.0, 2.0, 3.0]
+        })
+        backtester = BTCBacktester(ScriptedAgent(data), TRADING_PARAMS)
+        backtester.run_comprehensive_backtest()
+
+        # Never exited: the engine still saw the open position's drawdown and the latest ATR
+        self.assertEqual(backtester.risk.price, 85.0)
+        self.assertEqual(backtester.risk.atr, 3.0)
+        self.assertGreater(backtester.risk.drawdown, 0.4)
+
+class TestBacktestSweep(unittest.TestCase):
+    def test_sweep_matches_serial_backtests(self):
+        data = make_bars()
+        data.index = pd.date_range('2023-01-01', periods=len(data), freq='1h')
+        sweep = BacktestSweep(SweepConfig(), data, n_workers=2, agent_factory=scripted_agent_factory)
+        windows = walk_forward_windows(data.index, window='60D', step='30D')
+        jobs = sweep.make_jobs([0, 1], windows, {'leverage': [1, 3]})
+
+        summary = sweep.run(jobs)
+
+        self.assertEqual(len(summary), 2 * len(windows) * 2)
+        for row in summary.itertuples():
+            params = dict(TRADING_PARAMS, leverage=row.leverage)
+            window = data.iloc[row.start_row:row.end_row]
+            expected = BTCBacktester(ScriptedAgent(window, shift=row.model), params).run_comprehensive_backtest()
+            self.assertAlmostEqual(row.final_balance, expected['final_balance'], places=4)
+            self.assertEqual(row.total_trades, expected['total_trades'])
+
+    def test_sweep_drops_indicator_warm_up_rows(self):
+        data = make_warm_up_bars()
+        sweep = BacktestSweep(SweepConfig(), data, n_workers=1, agent_factory=warm_up_agent_factory)
+        windows = walk_forward_windows(sweep.data.index, window='60D', step='30D')
+
+        summary = sweep.run(sweep.make_jobs([0], windows))
+
+        self.assertEqual(len(sweep.data), len(data) - 100)
+        self.assertEqual(windows[0][:2], (0, 60 * 24))
+        clean = TradingDataset.from_frame(data)
+        for row in summary.itertuples():
+            expected = BTCBacktester(ScriptedAgent(data), TRADING_PARAMS).run_comprehensive_backtest(
+                data=clean.slice(row.start_row, row.end_row)
+            )
+            self.assertTrue(np.isfinite(row.final_balance))
+            self.assertAlmostEqual(row.final_balance, expected['final_balance'], places=4)
+
+    def test_walk_forward_windows(self):
+        index = pd.date_range('2022-01-01', '2022-12-31 23:00', freq='1h')
+        windows = walk_forward_windows(index, window='90D', step='30D')
+
+        self.assertEqual(windows[0], (0, 90 * 24, '2022-01-01'))
+        self.assertEqual(windows[1][0], 30 * 24)
+        self.assertTrue(all(end <= len(index) for _, end, _ in windows))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import json
+import unittest
+import numpy as np
+from benchmarks.run_suite import compare, run_suite
+from benchmarks.synthetic import synthetic_dataset, synthetic_ohlcv
+
+class TestSyntheticData(unittest.TestCase):
+    def test_candles_are_deterministic_and_consistent(self):
+        candles = synthetic_ohlcv(1000, seed=3)
+
+        np.testing.assert_array_equal(candles, synthetic_ohlcv(1000, seed=3))
+        self.assertTrue((np.diff(candles[:, 0]) == 60000).all())
+        self.assertTrue((candles[:, 2] >= candles[:, [1, 4]].max(axis=1)).all())
+        self.assertTrue((candles[:, 3] <= candles[:, [1, 4]].min(axis=1)).all())
+
+    def test_dataset_has_no_warm_up_rows(self):
+        dataset = synthetic_dataset(1000)
+
+        self.assertFalse(np.isnan(dataset.features).any())
+        np.testing.assert_array_equal(dataset.column('close'), dataset.prices.astype(np.float32))
+
+class TestBenchmarkSuite(unittest.TestCase):
+    def test_results_are_json_rates(self):
+        results = run_suite('quick', bars=2000, env_steps=1000, repeats=1, include_ppo=False)
+
+        self.assertEqual(results['config']['bars'], 2000)
+        self.assertIn('backtest.bars_per_sec', results['results'])
+        self.assertIn('metrics.summary_points_per_sec', results['results'])
+        for result in results['results'].values():
+            self.assertGreater(result['value'], 0)
+        self.assertEqual(json.loads(json.dumps(results)), results)
+
+    def test_compare_flags_regressions_beyond_tolerance(self):
+        baseline = {'results': {'a': {'value': 100.0}, 'b': {'value': 100.0}, 'c': {'value': 100.0}}}
+        current = {'results': {
+            'a': {'value': 85.0}, 'b': {'value': 70.0}, 'c': {'value': 130.0}, 'd': {'value': 1.0}
+        }}
+
+        statuses = {row[0]: row[4] for row in compare(current, baseline, tolerance=0.2)}
+
+        self.assertEqual(statuses, {'a': 'ok', 'b': 'regressed', 'c': 'improved', 'd': 'new'})
+
+if __name__ == '__main__':
+    unittest.main()
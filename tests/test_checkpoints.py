@@ -0,0 +1,102 @@
+import os
+import tempfile
+import unittest
+from benchmarks.synthetic import synthetic_dataset
+from config.config import Config
+from models.checkpoints import CheckpointManager
+from models.rl_agent import BTCRLTrader
+
+class FileTrader:
+    """
+    Stand-in for BTCRLTrader.save_model
+    """
+    def save_model(self, path):
+        with open(path + '.zip', 'w') as f:
+            f.write('model')
+
+class TestCheckpointManager(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.manager = CheckpointManager.new_run(self.tmp_dir.name, keep=2)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def names(self):
+        return [os.path.basename(path) for path in self.manager.checkpoints()]
+
+    def test_keeps_recent_and_best_checkpoints(self):
+        first = self.manager.save(FileTrader(), 100)
+        self.assertTrue(os.path.exists(CheckpointManager.model_path(first) + '.zip'))
+        self.assertTrue(self.manager.record_evaluation(first, 1.5, {'sharpe_ratio': 1.5}))
+
+        for timesteps in (200, 300, 400):
+            checkpoint = self.manager.save(FileTrader(), timesteps)
+            self.assertFalse(self.manager.record_evaluation(checkpoint, 0.5))
+
+        self.assertEqual(self.names(), ['step_000000000100', 'step_000000000300', 'step_000000000400'])
+        self.assertEqual(self.manager.latest(), checkpoint)
+        best = self.manager.best()
+        self.assertEqual((best['checkpoint'], best['timesteps'], best['score']), (first, 100, 1.5))
+
+        self.assertTrue(self.manager.record_evaluation(checkpoint, 2.0))
+        self.manager.save(FileTrader(), 500)
+        self.assertEqual(self.names(), ['step_000000000400', 'step_000000000500'])
+
+    def test_protected_checkpoints_survive_pruning(self):
+        pending = self.manager.save(FileTrader(), 100)
+        self.manager.protected.add(pending)
+        for timesteps in (200, 300, 400):
+            self.manager.save(FileTrader(), timesteps)
+        self.assertIn(pending, self.manager.checkpoints())
+
+    def test_latest_run_has_a_checkpoint(self):
+        self.manager.save(FileTrader(), 100)
+        CheckpointManager.new_run(self.tmp_dir.name)
+
+        self.assertEqual(CheckpointManager.latest_run(self.tmp_dir.name).run_dir, self.manager.run_dir)
+        self.assertIsNone(CheckpointManager.latest_run(os.path.join(self.tmp_dir.name, 'missing')))
+
+class TestCheckpointedTraining(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.config = Config()
+        self.config.RL_PARAMS = dict(
+            self.config.RL_PARAMS, total_timesteps=1024, n_envs=4, n_steps=64, episode_length=256,
+            vec_env='native', verbose=0, tensorboard_log=None
+        )
+        self.config.CHECKPOINT_PARAMS = dict(self.config.CHECKPOINT_PARAMS, directory=self.tmp_dir.name, interval=512)
+        self.dataset = synthetic_dataset(6000)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def trader(self):
+        trader = BTCRLTrader(self.config)
+        trader.prepare_training_data(self.dataset, train_fraction=0.7, validation_fraction=0.15)
+        return trader
+
+    def test_checkpoints_are_evaluated_and_resumed(self):
+        trader = self.trader()
+        trader.train()
+
+        self.assertEqual(
+            [os.path.basename(evaluation['checkpoint']) for evaluation in trader.evaluations],
+            ['step_000000000512', 'step_000000001024']
+        )
+        best = trader.checkpoints.best()
+        self.assertEqual(best['score'], max(evaluation['score'] for evaluation in trader.evaluations))
+        # The trained model is the best checkpoint, with its normalizer
+        self.assertEqual(trader.model.num_timesteps, best['timesteps'])
+        self.assertIsNotNone(trader.normalizer)
+
+        self.config.RL_PARAMS['total_timesteps'] = 1536
+        resumed = self.trader()
+        resumed.train(resume=True)
+
+        self.assertEqual(resumed.checkpoints.run_dir, trader.checkpoints.run_dir)
+        self.assertEqual(resumed.throughput_report['env_steps'], 512)
+        self.assertEqual(os.path.basename(resumed.checkpoints.latest()), 'step_000000001536')
+
+if __name__ == '__main__':
+    unittest.main()
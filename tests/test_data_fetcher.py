@@ -1,6 +1,32 @@
 import unittest
+import tempfile
+import ccxt
+import numpy as np
 import pandas as pd
-from data.data_fetcher import BTCDataFetcher
+from data.data_fetcher import BTCDataFetcher, BackfillError
+from data.candle_store import CandleStore
+
+class FakeExchange:
+    """
+    Deterministic in-memory stand-in for a ccxt exchange
+    """
+    rateLimit = 0
+
+    def __init__(self, start_timestamp, end_timestamp, timeframe_ms=60000, failing_since=()):
+        self.timestamps = np.arange(start_timestamp, end_timestamp, timeframe_ms)
+        self.failing_since = set(failing_since)
+        self.calls = []
+
+    def fetch_ohlcv(self, symbol, timeframe, since=None, limit=None):
+        self.calls.append(since)
+        if since in self.failing_since:
+            raise ccxt.NetworkError(f"simulated outage at {since}")
+        first = np.searchsorted(self.timestamps, since)
+        rows = []
+        for ts in self.timestamps[first:first + limit]:
+            price = 20000 + (ts // 60000) % 500
+            rows.append([int(ts), price, price + 5, price - 5, price + 1, 1.0])
+        return rows
 
 class TestBTCDataFetcher(unittest.TestCase):
     def setUp(self):
@@ -19,4 +45,99 @@ class TestBTCDataFetcher(unittest.TestCase):
         
         self.assertIn('rsi', data.columns)
         self.assertIn('macd', data.columns)
-        self.assertIn('atr', data.columns)
\ No newline at end of file
+        self.assertIn('atr', data.columns)
+
+class TestBackfill(unittest.TestCase):
+    start = BTCDataFetcher._date_to_timestamp('2023-01-01')
+    end = BTCDataFetcher._date_to_timestamp('2023-01-15')
+
+    def test_backfill_covers_whole_range(self):
+        exchange = FakeExchange(self.start, self.end)
+        fetcher = BTCDataFetcher(exchange=exchange, max_workers=4)
+
+        data = fetcher.fetch_historical_btc_data('2023-01-01', '2023-01-15', include_advanced_features=False)
+
+        self.assertEqual(len(data), 14 * 24 * 60)
+        self.assertTrue(data.index.is_monotonic_increasing)
+        self.assertTrue(data.index.is_unique)
+        self.assertEqual(data.index[0], pd.Timestamp('2023-01-01'))
+        self.assertEqual(data.index[-1], pd.Timestamp('2023-01-14 23:59'))
+
+    def test_merge_removes_overlapping_candles(self):
+        fetcher = BTCDataFetcher(exchange=FakeExchange(self.start, self.end))
+        chunk = np.array([[0, 1, 1, 1, 1, 1], [60000, 2, 2, 2, 2, 2]], dtype=float)
+        overlap = np.array([[60000, 9, 9, 9, 9, 9], [120000, 3, 3, 3, 3, 3]], dtype=float)
+
+        merged = fetcher._merge_chunks([overlap, chunk])
+
+        np.testing.assert_array_equal(merged[:, 0], [0, 60000, 120000])
+
+    def test_resume_after_partial_failure(self):
+        fetcher = BTCDataFetcher(exchange=FakeExchange(self.start, self.end))
+        fetcher.RETRY_BACKOFF = 0
+        chunks = fetcher._split_range(self.start, self.end)
+        failing_chunk = chunks[1]
+        fetcher.exchange.failing_since = {failing_chunk[0]}
+
+        with self.assertRaises(BackfillError) as ctx:
+            fetcher.fetch_ohlcv_range(self.start, self.end)
+        self.assertEqual(list(ctx.exception.failed_chunks), [failing_chunk])
+
+        # Only the failed chunk is requested again once the outage is over
+        fetcher.exchange.failing_since = set()
+        fetcher.exchange.calls = []
+        ohlcv = fetcher.fetch_ohlcv_range(self.start, self.end)
+
+        self.assertEqual(len(ohlcv), 14 * 24 * 60)
+        self.assertTrue(all(failing_chunk[0] <= since < failing_chunk[1] for since in fetcher.exchange.calls))
+
+class TestCandleStore(unittest.TestCase):
+    start = BTCDataFetcher._date_to_timestamp('2023-01-20')
+    end = BTCDataFetcher._date_to_timestamp('2023-02-10')
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = CandleStore(self.tmp_dir.name)
+        self.exchange = FakeExchange(self.start, BTCDataFetcher._date_to_timestamp('2023-03-01'))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_first_load_populates_monthly_partitions(self):
+        fetcher = BTCDataFetcher(exchange=self.exchange, store=self.store)
+        data = fetcher.fetch_historical_btc_data('2023-01-20', '2023-02-10', include_advanced_features=False)
+
+        self.assertEqual(len(data), 21 * 24 * 60)
+        self.assertEqual(self.store.coverage('BTC/USDT', '1m'), [[self.start, self.end]])
+        cached = self.store.read('BTC/USDT', '1m', self.start, self.end)
+        np.testing.assert_array_equal(cached[:, 4], data['close'].values)
+
+    def test_cached_range_does_not_hit_exchange(self):
+        BTCDataFetcher(exchange=self.exchange, store=self.store).fetch_historical_btc_data('2023-01-20', '2023-02-10')
+        self.exchange.calls = []
+
+        data = BTCDataFetcher(exchange=self.exchange, store=self.store).fetch_historical_btc_data('2023-01-25', '2023-02-05')
+
+        self.assertEqual(self.exchange.calls, [])
+        self.assertEqual(len(data), 11 * 24 * 60)
+
+    def test_only_missing_tail_is_fetched(self):
+        BTCDataFetcher(exchange=self.exchange, store=self.store).fetch_historical_btc_data('2023-01-20', '2023-02-10')
+        self.exchange.calls = []
+
+        data = BTCDataFetcher(exchange=self.exchange, store=self.store).fetch_historical_btc_data('2023-01-20', '2023-02-15')
+
+        self.assertTrue(self.exchange.calls)
+        self.assertTrue(all(since >= self.end for since in self.exchange.calls))
+        self.assertEqual(len(data), 26 * 24 * 60)
+        self.assertTrue(data.index.is_unique)
+
+    def test_missing_ranges(self):
+        self.store.write('BTC/USDT', '1m', np.empty((0, 6)), 100, 200)
+        self.store.write('BTC/USDT', '1m', np.empty((0, 6)), 300, 400)
+
+        self.assertEqual(self.store.missing_ranges('BTC/USDT', '1m', 0, 500), [(0, 100), (200, 300), (400, 500)])
+        self.assertEqual(self.store.missing_ranges('BTC/USDT', '1m', 120, 180), [])
+
+if __name__ == '__main__':
+    unittest.main()
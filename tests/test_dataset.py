@@ -0,0 +1,80 @@
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from data.dataset import TradingDataset
+from models.environments import TradingEnvironment
+from models.vec_environment import VectorTradingEnvironment
+
+def make_frame(n=200, warm_up=14, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(size=n))
+    df = pd.DataFrame({
+        'open': close + 5.0,
+        'high': close + 6.0,
+        'low': close - 1.0,
+        'close': close,
+        'volume': rng.uniform(1, 10, n),
+        'atr': rng.uniform(0.5, 2.0, n)
+    }, index=pd.date_range('2024-01-01', periods=n, freq='h'))
+    df.iloc[:warm_up, df.columns.get_loc('atr')] = np.nan
+    return df
+
+class TestTradingDataset(unittest.TestCase):
+    def setUp(self):
+        self.df = make_frame()
+        self.dataset = TradingDataset.from_frame(self.df)
+
+    def test_compact_float32_layout(self):
+        self.assertEqual(self.dataset.features.dtype, np.float32)
+        self.assertTrue(self.dataset.features.flags.c_contiguous)
+        self.assertEqual(self.dataset.prices.dtype, np.float64)
+        self.assertEqual(self.dataset.offsets['close'], 3)
+        np.testing.assert_array_equal(self.dataset.column('atr'), self.df['atr'].values[14:].astype(np.float32))
+
+    def test_warm_up_rows_dropped(self):
+        self.assertEqual(len(self.dataset), len(self.df) - 14)
+        self.assertFalse(np.isnan(self.dataset.features).any())
+        self.assertEqual(self.dataset.index[0], self.df.index[14])
+
+    def test_prices_are_close_not_first_column(self):
+        np.testing.assert_array_equal(self.dataset.prices, self.df['close'].values[14:])
+        self.assertFalse(np.allclose(self.dataset.prices, self.dataset.features[:, 0]))
+
+    def test_split_views_share_memory(self):
+        train, validation, test = self.dataset.split(0.6, 0.2)
+        self.assertEqual(len(train) + len(validation) + len(test), len(self.dataset))
+        for part in (train, validation, test):
+            self.assertTrue(np.shares_memory(part.features, self.dataset.features))
+            self.assertTrue(np.shares_memory(part.prices, self.dataset.prices))
+        self.assertEqual(test.prices[0], self.dataset.prices[len(train) + len(validation)])
+
+    def test_split_rejects_overlapping_fractions(self):
+        with self.assertRaises(ValueError):
+            self.dataset.split(0.8, 0.3)
+
+    def test_save_and_load_memory_mapped(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.dataset.save(directory)
+            loaded = TradingDataset.load(directory)
+            self.assertIsInstance(loaded.features, np.memmap)
+            self.assertEqual(loaded.columns, self.dataset.columns)
+            np.testing.assert_array_equal(loaded.features, self.dataset.features)
+            np.testing.assert_array_equal(loaded.prices, self.dataset.prices)
+            np.testing.assert_array_equal(loaded.index, self.dataset.index)
+            del loaded
+
+    def test_environment_trades_at_close(self):
+        env = TradingEnvironment(self.dataset)
+        env.step(1)
+        self.assertAlmostEqual(env.btc_held, 10000 / self.dataset.prices[0])
+
+        vec_env = VectorTradingEnvironment(self.dataset, n_envs=1, seed=0)
+        vec_env.reset()
+        start = vec_env.current_step[0]
+        vec_env.step_async(np.array([1]))
+        vec_env.step_wait()
+        np.testing.assert_allclose(vec_env.btc_held[0], 10000 / self.dataset.prices[start])
+
+if __name__ == '__main__':
+    unittest.main()
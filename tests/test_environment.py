@@ -1,6 +1,9 @@
+import pickle
 import unittest
 import numpy as np
 from models.environments import TradingEnvironment
+from models.vec_environment import VectorTradingEnvironment, SubprocVectorTradingEnvironment
+from utils.shared_array import SharedArray
 
 class TestTradingEnvironment(unittest.TestCase):
     def setUp(self):
@@ -23,3 +26,113 @@ class TestTradingEnvironment(unittest.TestCase):
             self.assertIsNotNone(next_obs)
             self.assertIsInstance(reward, float)
             self.assertIn(done, [True, False])
+
+    def test_observation_is_float32_buffer(self):
+        obs, _ = self.env.reset()
+        next_obs, _, _, _, _ = self.env.step(1)
+
+        self.assertEqual(obs.dtype, np.float32)
+        self.assertEqual(next_obs.shape, self.env.observation_space.shape)
+        self.assertFalse(np.shares_memory(obs, next_obs))
+        # A reset revisiting step 0 leaves the observation step() returned intact
+        kept = next_obs.copy()
+        self.env.reset()
+        np.testing.assert_array_equal(next_obs, kept)
+        np.testing.assert_allclose(next_obs[:5], self.env.data[1], rtol=1e-6)
+        # Bought with the whole balance: no cash left, position held
+        self.assertEqual(next_obs[5], 0.0)
+        self.assertGreater(next_obs[6], 0.0)
+
+class TestVectorTradingEnvironment(unittest.TestCase):
+    def setUp(self):
+        self.data = np.random.default_rng(0).uniform(0.5, 1.5, (1000, 5))
+        self.vec_env = VectorTradingEnvironment(self.data, n_envs=8, episode_length=100, seed=0)
+
+    def test_matches_single_environment(self):
+        self.vec_env.reset()
+        starts = np.arange(8) * 50
+        self.vec_env.episode_start[:] = starts
+        self.vec_env.current_step[:] = starts
+        single_envs = [TradingEnvironment(self.data[start:]) for start in starts]
+        actions = np.random.default_rng(1).integers(0, 3, (50, 8))
+
+        for step_actions in actions:
+            obs, rewards, dones, _ = self.vec_env.step(step_actions)
+            for env_idx, env in enumerate(single_envs):
+                expected_obs, expected_reward, _, _, _ = env.step(step_actions[env_idx])
+                np.testing.assert_allclose(obs[env_idx], expected_obs, rtol=1e-6)
+                self.assertAlmostEqual(rewards[env_idx], expected_reward, places=5)
+            self.assertFalse(dones.any())
+
+    def test_episodes_start_at_random_offsets(self):
+        obs = self.vec_env.reset()
+
+        self.assertEqual(obs.shape, (8, 8))
+        self.assertEqual(obs.dtype, np.float32)
+        self.assertGreater(len(np.unique(self.vec_env.episode_start)), 1)
+        self.assertTrue((self.vec_env.episode_start <= 999 - 100).all())
+
+    def test_finished_accounts_are_reset(self):
+        self.vec_env.reset()
+        for _ in range(99):
+            _, _, dones, _ = self.vec_env.step(np.ones(8, dtype=np.int64))
+            self.assertFalse(dones.any())
+
+        _, _, dones, infos = self.vec_env.step(np.zeros(8, dtype=np.int64))
+
+        self.assertTrue(dones.all())
+        self.assertIn('terminal_observation', infos[0])
+        np.testing.assert_array_equal(self.vec_env.current_step, self.vec_env.episode_start)
+        np.testing.assert_array_equal(self.vec_env.balance, 10000)
+
+    def test_env_method_calls_shared_environment(self):
+        self.vec_env.reset()
+        self.vec_env.balance[:] = 0
+
+        results = self.vec_env.env_method('reset', indices=[1, 3])
+        self.assertEqual(len(results), 2)
+        np.testing.assert_array_equal(results[0], results[1])
+        np.testing.assert_array_equal(self.vec_env.balance, 10000)
+
+class TestSubprocVectorTradingEnvironment(unittest.TestCase):
+    def setUp(self):
+        self.data = np.random.default_rng(0).uniform(0.5, 1.5, (1000, 5))
+        self.shared_data = SharedArray(self.data)
+
+    def tearDown(self):
+        self.shared_data.unlink()
+
+    def test_shared_array_pickles_by_path(self):
+        payload = pickle.dumps(self.shared_data)
+
+        self.assertLess(len(payload), 1000)
+        np.testing.assert_allclose(pickle.loads(payload).array, self.data, rtol=1e-6)
+
+    def test_matches_native_environments_per_worker(self):
+        env = SubprocVectorTradingEnvironment(self.shared_data, n_envs=6, n_workers=2, episode_length=50, seed=3)
+        native = [VectorTradingEnvironment(self.shared_data.array, n_envs=3, episode_length=50, seed=seed) for seed in (3, 4)]
+        try:
+            obs = env.reset()
+            np.testing.assert_array_equal(obs, np.concatenate([n.reset() for n in native]))
+
+            actions = np.random.default_rng(1).integers(0, 3, (60, 6))
+            for step_actions in actions:
+                obs, rewards, dones, infos = env.step(step_actions)
+                expected = [n.step(a) for n, a in zip(native, np.split(step_actions, 2))]
+                np.testing.assert_array_equal(obs, np.concatenate([e[0] for e in expected]))
+                np.testing.assert_array_equal(rewards, np.concatenate([e[1] for e in expected]))
+                self.assertEqual(len(infos), 6)
+        finally:
+            env.close()
+
+    def test_env_method_runs_in_the_selected_workers(self):
+        env = SubprocVectorTradingEnvironment(self.shared_data, n_envs=6, n_workers=2, episode_length=50, seed=3)
+        native = VectorTradingEnvironment(self.shared_data.array, n_envs=3, episode_length=50, seed=4)
+        try:
+            results = env.env_method('reset', indices=[4, 5])
+            self.assertEqual(len(results), 2)
+            np.testing.assert_array_equal(results[0], native.reset())
+            np.testing.assert_array_equal(results[1], results[0])
+            self.assertEqual(len(env.env_method('_get_observations')), 6)
+        finally:
+            env.close()
@@ -0,0 +1,121 @@
+import unittest
+import numpy as np
+from data.dataset import TradingDataset
+from models.environments import TradingEnvironment
+from models.episode_sampler import (
+    RandomWindowSampler, VolatilityStratifiedSampler, WalkForwardSampler, make_episode_sampler
+)
+from models.vec_environment import VectorTradingEnvironment, SubprocVectorTradingEnvironment
+from utils.shared_array import SharedArray
+
+def make_dataset(n=2000, seed=0):
+    """
+    Random-walk dataset whose ATR is high in the second half
+    """
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(size=n))
+    atr = np.where(np.arange(n) < n // 2, 0.5, 2.0) * rng.uniform(0.9, 1.1, n)
+    features = np.column_stack([close, close + 1, close - 1, atr])
+    return TradingDataset(features, ['close', 'high', 'low', 'atr'], close + 100)
+
+class TestSamplers(unittest.TestCase):
+    def setUp(self):
+        self.rng = np.random.default_rng(0)
+
+    def test_random_windows_stay_inside_history(self):
+        starts = RandomWindowSampler(1000, 100).sample(self.rng, 10000)
+
+        self.assertEqual(starts.min(), 0)
+        self.assertEqual(starts.max(), 899)
+
+    def test_volatility_strata_are_drawn_evenly(self):
+        dataset = make_dataset()
+        sampler = VolatilityStratifiedSampler(dataset.column('atr'), dataset.prices, 100, n_strata=2)
+        starts = sampler.sample(self.rng, 20000)
+
+        # Half the windows lie (mostly) in the calm first half, but they are drawn half the time
+        self.assertAlmostEqual(np.mean(starts < 1000 - 50), 0.5, delta=0.02)
+        self.assertTrue((starts <= sampler.max_start).all())
+
+        sampler.set_weights([0.0, 1.0])
+        self.assertTrue((sampler.sample(self.rng, 1000) > 900).all())
+        with self.assertRaises(ValueError):
+            sampler.set_weights([1.0])
+
+    def test_walk_forward_tiles_history_in_order(self):
+        sampler = WalkForwardSampler(1001, 250)
+
+        np.testing.assert_array_equal(sampler.sample(self.rng, 3), [0, 250, 500])
+        np.testing.assert_array_equal(sampler.sample(self.rng, 3), [750, 0, 250])
+
+        workers = [WalkForwardSampler(1001, 250).for_worker(i, 2) for i in range(2)]
+        np.testing.assert_array_equal(workers[0].sample(self.rng, 2), [0, 500])
+        np.testing.assert_array_equal(workers[1].sample(self.rng, 2), [250, 750])
+
+    def test_factory(self):
+        dataset = make_dataset()
+        self.assertIsInstance(make_episode_sampler('volatility', dataset, 100), VolatilityStratifiedSampler)
+        with self.assertRaises(ValueError):
+            make_episode_sampler('volatility', dataset.features, 100)
+        with self.assertRaises(ValueError):
+            make_episode_sampler('regime', dataset, 100)
+
+class TestEnvironmentsWithSamplers(unittest.TestCase):
+    def setUp(self):
+        self.dataset = make_dataset()
+
+    def test_single_environment_window_is_truncated(self):
+        env = TradingEnvironment(self.dataset, episode_sampler=WalkForwardSampler(len(self.dataset), 50))
+        # The constructor's reset took the first window
+        env.reset()
+        self.assertEqual(env.current_step, 50)
+        np.testing.assert_array_equal(env._get_observation()[:4], self.dataset.features[50])
+
+        for _ in range(49):
+            _, _, terminated, truncated, _ = env.step(0)
+            self.assertFalse(terminated or truncated)
+        _, _, terminated, truncated, _ = env.step(0)
+        self.assertEqual((terminated, truncated), (False, True))
+
+    def test_full_history_by_default(self):
+        env = TradingEnvironment(self.dataset)
+        env.reset(seed=3)
+        self.assertEqual(env.current_step, 0)
+
+        env = TradingEnvironment(self.dataset, episode_length=100)
+        starts = {env.reset()[0][0] for _ in range(20)}
+        self.assertGreater(len(starts), 1)
+
+    def test_vector_environment_walks_forward(self):
+        sampler = WalkForwardSampler(len(self.dataset), 100)
+        vec_env = VectorTradingEnvironment(self.dataset, n_envs=4, episode_sampler=sampler)
+        vec_env.reset()
+
+        np.testing.assert_array_equal(vec_env.episode_start, [0, 100, 200, 300])
+        for _ in range(100):
+            vec_env.step(np.zeros(4, dtype=np.int64))
+        np.testing.assert_array_equal(vec_env.episode_start, [400, 500, 600, 700])
+
+    def test_subproc_workers_walk_different_windows(self):
+        shared = SharedArray(self.dataset.features)
+        shared_prices = SharedArray(self.dataset.prices, dtype=np.float64)
+        sampler = WalkForwardSampler(len(self.dataset), 100)
+        env = SubprocVectorTradingEnvironment(
+            shared, n_envs=4, n_workers=2, shared_prices=shared_prices, episode_sampler=sampler
+        )
+        try:
+            env.reset()
+            worker_starts = env.get_attr('episode_start', indices=[0, 2])
+            np.testing.assert_array_equal(worker_starts, [[0, 200], [100, 300]])
+
+            for _ in range(100):
+                env.step(np.zeros(4, dtype=np.int64))
+            worker_starts = env.get_attr('episode_start', indices=[0, 2])
+            np.testing.assert_array_equal(worker_starts, [[400, 600], [500, 700]])
+        finally:
+            env.close()
+            shared.unlink()
+            shared_prices.unlink()
+
+if __name__ == '__main__':
+    unittest.main()
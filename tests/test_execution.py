@@ -0,0 +1,152 @@
+import asyncio
+import time
+import unittest
+from config.config import Config
+from trading.execution import TokenBucket, AccountState
+from trading.live_trader import BTCLiveTrader
+
+class MockExchange:
+    """
+    In-process async stand-in for a ccxt async_support exchange
+    """
+    rateLimit = 0
+
+    def __init__(self, price=20000.0, latency=0.005, fee_rate=0.0004, balance=10000.0):
+        self.price = price
+        self.latency = latency
+        self.fee_rate = fee_rate
+        self.balance = balance
+        self.calls = []
+        self.closed = False
+
+    async def fetch_balance(self):
+        self.calls.append('fetch_balance')
+        await asyncio.sleep(self.latency)
+        return {'USDT': {'total': self.balance}}
+
+    async def fetch_ticker(self, symbol):
+        self.calls.append('fetch_ticker')
+        await asyncio.sleep(self.latency)
+        return {'last': self.price}
+
+    async def create_order(self, symbol, type, side, amount):
+        self.calls.append(('create_order', side))
+        await asyncio.sleep(self.latency)
+        return {
+            'symbol': symbol, 'side': side, 'amount': amount, 'filled': amount,
+            'average': self.price, 'fee': {'cost': amount * self.price * self.fee_rate, 'currency': 'USDT'}
+        }
+
+    async def close(self):
+        self.closed = True
+
+class TestTokenBucket(unittest.IsolatedAsyncioTestCase):
+    async def test_burst_then_paced(self):
+        bucket = TokenBucket(rate=100, capacity=5)
+        started = time.monotonic()
+        for _ in range(5):
+            await bucket.acquire()
+        burst = time.monotonic() - started
+        for _ in range(5):
+            await bucket.acquire()
+        paced = time.monotonic() - started
+
+        self.assertLess(burst, 0.01)
+        self.assertGreaterEqual(paced, 0.045)
+
+class TestAccountState(unittest.TestCase):
+    def test_fills_realize_pnl_and_fees(self):
+        state = AccountState(1000.0)
+        state.apply_fill('buy', 1.0, 100.0, fee=0.1)
+        state.apply_fill('buy', 1.0, 110.0, fee=0.1)
+        self.assertAlmostEqual(state.entry_price, 105.0)
+        self.assertAlmostEqual(state.equity(120.0), 1000.0 - 0.2 + 2 * 15.0)
+
+        state.apply_fill('sell', 3.0, 120.0, fee=0.3)
+        self.assertAlmostEqual(state.balance, 1000.0 - 0.5 + 30.0)
+        self.assertAlmostEqual(state.position, -1.0)
+        self.assertAlmostEqual(state.entry_price, 120.0)
+
+class TestExecutionEngine(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.exchange = MockExchange()
+        self.trader = BTCLiveTrader(Config(), None, exchange=self.exchange)
+        await self.trader.start()
+
+    async def test_order_path_skips_reads(self):
+        self.exchange.calls = []
+        order = await self.trader.execute_trade(1, 20000.0)
+
+        self.assertEqual(self.exchange.calls, [('create_order', 'buy')])
+        self.assertAlmostEqual(order['amount'], 10000.0 * 0.01 / 20000.0)
+        self.assertAlmostEqual(self.trader.engine.state.position, order['filled'])
+        self.assertAlmostEqual(self.trader.engine.state.balance, 10000.0 - order['fee']['cost'])
+
+    async def test_fills_feed_live_metrics(self):
+        self.exchange.price = 20000.0
+        buy = await self.trader.execute_trade(1, 20000.0)
+        self.exchange.price = 21000.0
+        sell = await self.trader.execute_trade(2, 21000.0)
+        metrics = self.trader.metrics
+
+        self.assertAlmostEqual(metrics.traded_notional, buy['filled'] * 20000.0 + sell['filled'] * 21000.0)
+        self.assertEqual((metrics.closed_trades, metrics.winning_trades), (1, 1))
+
+    async def test_market_fill_without_price_uses_decision_price(self):
+        create_order = self.exchange.create_order
+
+        async def unpriced(*args):
+            order = await create_order(*args)
+            order['average'] = None
+            return order
+        self.exchange.create_order = unpriced
+
+        order = await self.trader.execute_trade(1, 19000.0)
+        state = self.trader.engine.state
+        self.assertAlmostEqual(state.position, order['filled'])
+        self.assertAlmostEqual(state.entry_price, 19000.0)
+
+    async def test_in_flight_orders_are_reserved(self):
+        self.trader.risk.max_leverage = 0.015
+        first = self.trader.execute_trade(1, 20000.0)
+        second = self.trader.execute_trade(1, 20000.0)
+        orders = await asyncio.gather(first, second)
+
+        # The second order only gets the leverage room the first one left
+        self.assertAlmostEqual(orders[1]['amount'] * 2, orders[0]['amount'], places=9)
+        self.assertEqual((self.trader.risk.pending_buy, self.trader.risk.pending_sell), (0.0, 0.0))
+
+    async def test_hold_sends_nothing(self):
+        self.exchange.calls = []
+        self.assertIsNone(self.trader.execute_trade(0, 20000.0))
+        self.assertEqual(self.exchange.calls, [])
+
+    async def test_submit_does_not_block_and_reports_latency(self):
+        started = time.perf_counter()
+        tasks = [self.trader.execute_trade(side, 20000.0, decided_at=started) for side in (1, 2, 1, 2)]
+        self.assertLess(time.perf_counter() - started, self.exchange.latency)
+
+        await asyncio.gather(*tasks)
+        await self.trader.close()
+        report = self.trader.engine.latency_report()
+
+        self.assertTrue(self.exchange.closed)
+        self.assertEqual(report['orders'], 4)
+        self.assertEqual(report['failed_orders'], 0)
+        # Orders overlap instead of queueing behind one another
+        self.assertLess(report['max_ms'], 4 * self.exchange.latency * 1000)
+
+    async def test_failed_order_is_counted(self):
+        async def reject(*args):
+            raise RuntimeError("insufficient margin")
+        self.exchange.create_order = reject
+
+        self.assertIsNone(await self.trader.execute_trade(1, 20000.0))
+        self.assertEqual(self.trader.engine.latency_report()['failed_orders'], 1)
+
+    async def test_risk_engine_caps_order_size(self):
+        self.trader.engine.state.balance = 1e6
+        order = await self.trader.execute_trade(1, 20000.0)
+
+        self.assertAlmostEqual(order['amount'] * 20000.0, Config().TRADING_PARAMS['max_trade_amount'])
+        self.assertEqual(self.trader.risk.position, order['filled'])
@@ -0,0 +1,128 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from utils.indicators import IndicatorEngine, ema
+from utils.feature_cache import FeatureCache
+
+try:
+    import ta
+except ImportError:
+    ta = None
+
+def make_fixture_candles(n=3000, seed=7):
+    """
+    Deterministic random-walk OHLCV fixture around BTC price levels
+    """
+    rng = np.random.default_rng(seed)
+    close = 30000 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    spread = np.abs(rng.normal(0, 20, n))
+    high = np.maximum(open_, close) + spread
+    low = np.minimum(open_, close) - spread
+    volume = rng.uniform(1, 100, n)
+    index = pd.date_range('2023-01-01', periods=n, freq='1min')
+    return pd.DataFrame({'open': open_, 'high': high, 'low': low, 'close': close, 'volume': volume}, index=index)
+
+@unittest.skipIf(ta is None, "ta library not installed")
+class TestIndicatorEngine(unittest.TestCase):
+    def setUp(self):
+        self.df = make_fixture_candles()
+        self.engine = IndicatorEngine()
+        self.batch = self.engine.compute(self.df['high'].values, self.df['low'].values, self.df['close'].values)
+
+    def reference(self):
+        df = self.df
+        macd = ta.trend.MACD(df['close'])
+        bollinger = ta.volatility.BollingerBands(df['close'])
+        atr = ta.volatility.AverageTrueRange(df['high'], df['low'], df['close']).average_true_range()
+        return {
+            'ma_10': df['close'].rolling(10).mean(),
+            'ma_50': df['close'].rolling(50).mean(),
+            'rsi': ta.momentum.RSIIndicator(df['close']).rsi(),
+            'macd': macd.macd(),
+            'macd_signal': macd.macd_signal(),
+            'bb_high': bollinger.bollinger_hband(),
+            'bb_low': bollinger.bollinger_lband(),
+            # ta fills ATR warm-up rows with 0 instead of NaN
+            'atr': atr.where(np.arange(len(atr)) >= 13),
+        }
+
+    def test_batch_matches_ta(self):
+        for name, expected in self.reference().items():
+            with self.subTest(indicator=name):
+                np.testing.assert_array_equal(np.isnan(self.batch[name]), expected.isna().values)
+                np.testing.assert_allclose(self.batch[name], expected.values, rtol=1e-9, atol=1e-6, equal_nan=True)
+
+    def test_streaming_matches_batch(self):
+        streaming = self.engine.stream()
+        rows = np.array([
+            streaming.update(high, low, close)
+            for high, low, close in self.df[['high', 'low', 'close']].values
+        ])
+
+        for i, name in enumerate(self.engine.columns):
+            with self.subTest(indicator=name):
+                np.testing.assert_allclose(rows[:, i], self.batch[name], rtol=1e-9, atol=1e-6, equal_nan=True)
+
+    def test_long_ema_is_stable(self):
+        values = np.random.default_rng(0).normal(30000, 100, 200000)
+        expected = pd.Series(values).ewm(span=12, adjust=False).mean().values
+
+        np.testing.assert_allclose(ema(values, 2.0 / 13), expected, rtol=1e-10)
+
+class CountingEngine(IndicatorEngine):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.computed = 0
+
+    def compute(self, high, low, close):
+        self.computed += 1
+        return super().compute(high, low, close)
+
+class TestFeatureCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache = FeatureCache(self.tmp_dir.name)
+        self.df = make_fixture_candles(2000)
+        self.candles = (self.df['high'].values, self.df['low'].values, self.df['close'].values)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_hit_skips_recomputation(self):
+        engine = CountingEngine(cache=self.cache)
+        first = engine.compute_matrix(*self.candles)
+        second = engine.compute_matrix(*self.candles)
+
+        self.assertEqual(engine.computed, 1)
+        self.assertIsInstance(second, np.memmap)
+        self.assertEqual(second.dtype, np.float32)
+        np.testing.assert_array_equal(first, second)
+
+    def test_key_depends_on_candles_and_config(self):
+        key = FeatureCache.key(self.candles, IndicatorEngine().config)
+
+        self.assertEqual(key, FeatureCache.key(self.candles, IndicatorEngine().config))
+        self.assertNotEqual(key, FeatureCache.key(self.candles, IndicatorEngine({'rsi_window': 21}).config))
+        self.assertNotEqual(key, FeatureCache.key([c[:-1] for c in self.candles], IndicatorEngine().config))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        matrix = np.zeros((1000, 8), dtype=np.float32)
+        entry_bytes = matrix.nbytes + 128
+        self.cache.max_bytes = 2 * entry_bytes + entry_bytes // 2
+
+        self.cache.put('a', matrix, ['x'] * 8)
+        self.cache.put('b', matrix, ['x'] * 8)
+        os.utime(os.path.join(self.tmp_dir.name, 'a.npy'), (0, 0))
+        os.utime(os.path.join(self.tmp_dir.name, 'b.npy'), (1, 1))
+        self.cache.get('a')
+        self.cache.put('c', matrix, ['x'] * 8)
+
+        self.assertIsNotNone(self.cache.get('a'))
+        self.assertIsNone(self.cache.get('b'))
+        self.assertIsNotNone(self.cache.get('c'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import torch
+from stable_baselines3 import PPO
+from config.config import Config
+from models.inference import NumpyPolicy
+from models.rl_agent import BTCRLTrader
+from models.vec_environment import VectorTradingEnvironment
+
+class TestNumpyPolicy(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        data = np.random.default_rng(0).uniform(100, 200, (4096, 13))
+        env = VectorTradingEnvironment(data, n_envs=4, seed=0)
+        cls.model = PPO("MlpPolicy", env, n_steps=64, batch_size=64, seed=0, device='cpu')
+        cls.observations = np.random.default_rng(1).normal(size=(2000, 16)).astype(np.float32)
+
+    def setUp(self):
+        self.policy = NumpyPolicy.from_sb3(self.model)
+
+    def test_batch_matches_ppo_predict(self):
+        expected, _ = self.model.predict(self.observations, deterministic=True)
+        np.testing.assert_array_equal(self.policy.predict(self.observations), expected)
+
+    def test_probabilities_match_policy_distribution(self):
+        with torch.no_grad():
+            distribution = self.model.policy.get_distribution(torch.as_tensor(self.observations))
+            expected = distribution.distribution.probs.numpy()
+        np.testing.assert_allclose(self.policy.probabilities(self.observations), expected, rtol=1e-4, atol=1e-6)
+
+    def test_single_matches_batch(self):
+        batch = self.policy.predict(self.observations[:200])
+        self.assertEqual([self.policy.predict_one(obs) for obs in self.observations[:200]], batch.tolist())
+
+    def test_sampling_follows_probabilities(self):
+        observations = np.repeat(self.observations[:1], 20000, axis=0)
+        actions = self.policy.predict(observations, deterministic=False, rng=np.random.default_rng(0))
+        frequencies = np.bincount(actions, minlength=3) / len(actions)
+        np.testing.assert_allclose(frequencies, self.policy.probabilities(observations[:1])[0], atol=0.02)
+
+    def test_save_load_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'policy.npz')
+            self.policy.save(path)
+            loaded = NumpyPolicy.load(path)
+        np.testing.assert_array_equal(loaded.predict(self.observations), self.policy.predict(self.observations))
+        self.assertEqual(loaded.activation, 'Tanh')
+
+class TestAgentInferenceMode(unittest.TestCase):
+    def test_load_model_exports_numpy_policy(self):
+        data = np.random.default_rng(0).uniform(100, 200, (4096, 13))
+        model = PPO("MlpPolicy", VectorTradingEnvironment(data, n_envs=4, seed=0), n_steps=64, batch_size=64, seed=0, device='cpu')
+        states = np.random.default_rng(2).normal(size=(100, 16)).astype(np.float32)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'model')
+            model.save(path)
+            agent = BTCRLTrader(Config())
+            agent.load_model(path)
+
+        self.assertIsInstance(agent.policy, NumpyPolicy)
+        expected, _ = model.predict(states, deterministic=True)
+        np.testing.assert_array_equal(agent.predict_actions(states), expected)
+        self.assertEqual(agent.predict_action(states[0], deterministic=True), int(expected[0]))
+
+    def test_load_policy_exports_legacy_checkpoint_once(self):
+        data = np.random.default_rng(0).uniform(100, 200, (4096, 13))
+        model = PPO("MlpPolicy", VectorTradingEnvironment(data, n_envs=4, seed=0), n_steps=64, batch_size=64, seed=0, device='cpu')
+        states = np.random.default_rng(3).normal(size=(100, 16)).astype(np.float32)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'model')
+            model.save(path)
+            BTCRLTrader(Config()).load_policy(path)
+            self.assertTrue(os.path.exists(path + '_policy.npz'))
+
+            agent = BTCRLTrader(Config())
+            agent.load_policy(path)
+
+        self.assertIsNone(agent.model)
+        expected, _ = model.predict(states, deterministic=True)
+        np.testing.assert_array_equal(agent.predict_actions(states), expected)
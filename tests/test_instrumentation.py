@@ -0,0 +1,153 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+import urllib.request
+import numpy as np
+from utils.instrumentation import (
+    LatencyHistogram, MetricsRegistry, MetricsExporter, Monitoring, SamplingProfiler, metrics
+)
+
+def busy_wait(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+class TestLatencyHistogram(unittest.TestCase):
+    def test_percentiles_within_bucket_width(self):
+        samples = np.random.default_rng(0).lognormal(np.log(1e-3), 1.0, 20000)
+        histogram = LatencyHistogram()
+        for sample in samples:
+            histogram.observe(sample)
+
+        self.assertEqual(histogram.count, len(samples))
+        self.assertAlmostEqual(histogram.total, samples.sum())
+        for q in (50, 90, 99):
+            expected = np.percentile(samples, q)
+            self.assertLess(abs(np.log10(histogram.percentile(q) / expected)), 0.25)
+        self.assertEqual(histogram.percentile(100), samples.max())
+
+class TestMetricsRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = MetricsRegistry()
+
+    def test_timed_counts_and_times_calls(self):
+        @self.registry.timed('work')
+        def work(seconds):
+            busy_wait(seconds)
+            return seconds
+
+        self.assertEqual(work(0.002), 0.002)
+        work(0.002)
+        self.registry.count('items', 5)
+
+        snapshot = self.registry.snapshot()
+        self.assertEqual(snapshot['counters'], {'items': 5})
+        self.assertEqual(snapshot['histograms']['work']['count'], 2)
+        self.assertGreaterEqual(snapshot['histograms']['work']['min_ms'], 2.0)
+
+    def test_disabled_registry_records_nothing(self):
+        self.registry.enabled = False
+
+        @self.registry.timed('work')
+        def work():
+            return 1
+
+        work()
+        with self.registry.timer('block'):
+            pass
+        self.registry.count('items')
+
+        self.assertEqual(self.registry.histogram('work').count, 0)
+        self.assertEqual(self.registry.histogram('block').count, 0)
+        self.assertNotIn('items', self.registry.counters)
+
+    def test_prometheus_text(self):
+        self.registry.observe('order.round_trip', 0.01)
+        self.registry.count('orders.filled')
+        text = self.registry.prometheus_text()
+
+        self.assertIn('trading_orders_filled_total 1', text)
+        self.assertIn('trading_order_round_trip_seconds_count 1', text)
+        self.assertIn('trading_order_round_trip_seconds_bucket{le="+Inf"} 1', text)
+
+class TestExport(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.registry = MetricsRegistry()
+        self.registry.observe('backtest.run', 0.5)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_json_file_and_http_endpoint(self):
+        path = os.path.join(self.tmp_dir.name, 'metrics.json')
+        exporter = MetricsExporter(self.registry, path, interval=0.01, port=0).start()
+        try:
+            with urllib.request.urlopen(f'http://127.0.0.1:{exporter.port}/metrics.json') as response:
+                served = json.load(response)
+            with urllib.request.urlopen(f'http://127.0.0.1:{exporter.port}/metrics') as response:
+                text = response.read().decode()
+        finally:
+            exporter.stop()
+
+        with open(path) as f:
+            written = json.load(f)
+        self.assertEqual(served['histograms']['backtest.run']['count'], 1)
+        self.assertEqual(written['histograms']['backtest.run']['count'], 1)
+        self.assertIn('trading_backtest_run_seconds_sum 0.5', text)
+
+class TestSamplingProfiler(unittest.TestCase):
+    def test_folded_stacks_show_hot_function(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'profile.folded')
+            with SamplingProfiler(interval=0.001) as profiler:
+                worker = threading.Thread(target=busy_wait, args=(0.2,), name='worker')
+                worker.start()
+                worker.join()
+            profiler.write(path)
+
+            with open(path) as f:
+                lines = f.read().splitlines()
+
+        self.assertGreater(profiler.n_samples, 10)
+        stack, count = lines[0].rsplit(' ', 1)
+        worker_samples = sum(int(line.rsplit(' ', 1)[1]) for line in lines if line.startswith('worker;'))
+        self.assertGreater(worker_samples, 10)
+        self.assertTrue(any('busy_wait (test_instrumentation.py' in line for line in lines))
+        self.assertGreater(int(count), 0)
+
+class TestMonitoring(unittest.TestCase):
+    def test_run_writes_metrics_and_profile(self):
+        from trading.backtester import BTCBacktester
+
+        class HoldAgent:
+            def predict_actions(self, states):
+                return np.zeros(len(states), dtype=np.int64)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            params = {
+                'metrics_path': os.path.join(tmp_dir, 'metrics.json'),
+                'profile': True,
+                'profile_path': os.path.join(tmp_dir, 'profile.folded'),
+                'profile_interval': 0.001
+            }
+            with Monitoring(params):
+                close = np.linspace(100, 200, 5000)
+                BTCBacktester(HoldAgent(), {'leverage': 1, 'initial_balance': 1000, 'trading_fee_rate': 0.0}) \
+                    .run_on_arrays(np.ones((5000, 4)), close, close)
+                busy_wait(0.05)
+
+            with open(params['metrics_path']) as f:
+                snapshot = json.load(f)
+            self.assertTrue(os.path.getsize(params['profile_path']) > 0)
+
+        self.assertEqual(snapshot['counters']['backtest.bars'], 5000)
+        self.assertEqual(snapshot['histograms']['backtest.run']['count'], 1)
+        self.assertEqual(snapshot['histograms']['metrics.summary']['count'], 1)
+        self.assertTrue(metrics.enabled)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from stable_baselines3 import PPO
+from config.config import Config
+from models.environments import TradingEnvironment
+from models.normalization import FeatureNormalizer
+from models.rl_agent import BTCRLTrader
+from models.vec_environment import VectorTradingEnvironment
+from trading.backtester import BTCBacktester
+
+def make_features(n=5000, seed=0):
+    """
+    Price-level, volume-like and oscillator-like columns plus a constant one
+    """
+    rng = np.random.default_rng(seed)
+    price = 30000 + np.cumsum(rng.normal(0, 20, n))
+    return np.column_stack([
+        price, rng.uniform(1, 500, n), rng.uniform(0, 100, n), np.full(n, 7.0)
+    ]).astype(np.float32)
+
+class RecordingAgent:
+    """
+    Holds forever, keeping the observations it was asked about
+    """
+    def __init__(self, normalizer):
+        self.normalizer = normalizer
+        self.observations = []
+
+    def predict_actions(self, states):
+        self.observations.append(states.copy())
+        return np.zeros(len(states), dtype=np.int64)
+
+class TestFeatureNormalizer(unittest.TestCase):
+    def setUp(self):
+        self.features = make_features()
+
+    def test_streaming_fit_matches_direct_statistics(self):
+        expected_mean = self.features.astype(np.float64).mean(axis=0)
+        expected_std = self.features.astype(np.float64).std(axis=0)
+        for chunk_rows in (1000, 777, 100000):
+            normalizer = FeatureNormalizer.fit(self.features, chunk_rows=chunk_rows)
+            self.assertEqual(normalizer.count, len(self.features))
+            np.testing.assert_allclose(normalizer.mean, expected_mean, rtol=1e-12)
+            np.testing.assert_allclose(normalizer.std, expected_std, rtol=1e-9, atol=1e-12)
+
+    def test_transform_standardizes_in_place(self):
+        normalizer = FeatureNormalizer.fit(self.features)
+        normalized = normalizer.transform(self.features)
+
+        self.assertEqual(normalized.dtype, np.float32)
+        np.testing.assert_allclose(normalized[:, :3].mean(axis=0), 0.0, atol=1e-5)
+        np.testing.assert_allclose(normalized[:, :3].std(axis=0), 1.0, rtol=1e-5)
+        # Constant features are centred, not blown up
+        np.testing.assert_array_equal(normalized[:, 3], 0.0)
+
+        features = self.features.copy()
+        self.assertIs(normalizer.transform(features, out=features), features)
+        np.testing.assert_array_equal(features, normalized)
+
+    def test_universe_features_pool_symbols(self):
+        universe = np.stack([make_features(seed=seed) for seed in range(3)], axis=1)
+        normalizer = FeatureNormalizer.fit(universe, chunk_rows=999)
+
+        np.testing.assert_allclose(normalizer.mean, universe.reshape(-1, 4).mean(axis=0, dtype=np.float64))
+        self.assertEqual(normalizer.transform(universe).shape, universe.shape)
+
+    def test_save_load_round_trip(self):
+        normalizer = FeatureNormalizer.fit(self.features)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'normalizer.npz')
+            normalizer.save(path)
+            loaded = FeatureNormalizer.load(path)
+
+        self.assertEqual(loaded.count, normalizer.count)
+        np.testing.assert_array_equal(loaded.transform(self.features), normalizer.transform(self.features))
+
+class TestNormalizationStage(unittest.TestCase):
+    def setUp(self):
+        self.features = make_features()
+        self.prices = self.features[:, 0].astype(np.float64)
+        self.normalizer = FeatureNormalizer.fit(self.features)
+        self.normalized = self.normalizer.transform(self.features)
+
+    def test_environments_observe_normalized_features(self):
+        env = TradingEnvironment(self.features, prices=self.prices, normalizer=self.normalizer)
+        obs, _ = env.reset()
+        np.testing.assert_array_equal(obs[:4], self.normalized[0])
+
+        vec_env = VectorTradingEnvironment(self.features, n_envs=4, seed=0, prices=self.prices,
+                                           normalizer=self.normalizer)
+        obs = vec_env.reset()
+        np.testing.assert_array_equal(obs[:, :4], self.normalized[vec_env.current_step])
+        # Fills still happen at raw prices
+        self.assertEqual(vec_env._prices[0, 0], self.prices[0])
+
+    def test_backtester_applies_agent_normalizer(self):
+        agent = RecordingAgent(self.normalizer)
+        BTCBacktester(agent, {'leverage': 1, 'initial_balance': 10000, 'trading_fee_rate': 0.0004}).run_on_arrays(
+            self.features, self.prices, self.prices
+        )
+        np.testing.assert_array_equal(np.concatenate(agent.observations)[:, :4], self.normalized)
+
+    def test_normalizer_is_saved_with_the_model(self):
+        model = PPO("MlpPolicy", VectorTradingEnvironment(self.features, n_envs=4, seed=0), n_steps=64,
+                    batch_size=64, seed=0, device='cpu')
+        agent = BTCRLTrader(Config())
+        agent.model = model
+        agent.normalizer = self.normalizer
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'model')
+            agent.save_model(path)
+            loaded = BTCRLTrader(Config())
+            loaded.load_policy(path)
+            np.testing.assert_array_equal(loaded.normalizer.transform(self.features), self.normalized)
+
+            # Re-saving a model trained on raw features drops the stale statistics
+            agent.normalizer = None
+            agent.save_model(path)
+            loaded.load_model(path)
+            self.assertIsNone(loaded.normalizer)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+import asyncio
+import unittest
+import numpy as np
+from data.market_feed import MarketDataFeed, ReplaySource
+from models.environments import TradingEnvironment
+from models.episode_sampler import RandomWindowSampler
+from models.observations import LookbackWindows, rolling_moments, window_observation
+from models.vec_environment import VectorTradingEnvironment
+from trading.backtester import BTCBacktester
+from tests.test_market_feed import make_candles
+
+LOOKBACK = 16
+
+def make_features(n=3000, n_features=5, seed=0):
+    """
+    Random-walk features at price level, the hard case for running sums
+    """
+    rng = np.random.default_rng(seed)
+    return (20000 + np.cumsum(rng.normal(size=(n, n_features)), axis=0)).astype(np.float32)
+
+class RecordingAgent:
+    """
+    Holds forever, keeping the observations it was asked about
+    """
+    lookback = LOOKBACK
+    normalize_lookback = True
+
+    def __init__(self):
+        self.observations = []
+
+    def predict_actions(self, states):
+        self.observations.append(states.copy())
+        return np.zeros(len(states), dtype=np.int64)
+
+class TestLookbackWindows(unittest.TestCase):
+    def test_rolling_moments_match_direct_computation(self):
+        features = make_features(n=10000)
+        mean, std = rolling_moments(features, LOOKBACK)
+        windows = np.lib.stride_tricks.sliding_window_view(features.astype(np.float64), LOOKBACK, axis=0)
+
+        self.assertEqual(mean.shape, (10000 - LOOKBACK + 1, 5))
+        np.testing.assert_allclose(mean, windows.mean(axis=-1), rtol=1e-6)
+        np.testing.assert_allclose(std, windows.std(axis=-1), rtol=1e-4, atol=1e-4)
+
+    def test_windows_are_views_and_normalized(self):
+        features = make_features()
+        windows = LookbackWindows(features, LOOKBACK)
+        out = np.empty((LOOKBACK, 5), dtype=np.float32)
+        windows.write(out, 100)
+
+        self.assertTrue(np.shares_memory(windows.windows, features))
+        np.testing.assert_allclose(out.ravel(), window_observation(features[85:101]), atol=1e-3)
+        np.testing.assert_allclose(out.mean(axis=0), 0.0, atol=1e-3)
+
+        raw = LookbackWindows(features, LOOKBACK, normalize=False)
+        raw.write(out, 100)
+        np.testing.assert_array_equal(out, features[85:101])
+
+    def test_constant_features_normalize_to_zero(self):
+        features = np.ones((100, 2), dtype=np.float32)
+        out = np.empty((LOOKBACK, 2), dtype=np.float32)
+        LookbackWindows(features, LOOKBACK).write(out, 50)
+
+        np.testing.assert_array_equal(out, 0.0)
+        np.testing.assert_array_equal(window_observation(features[:LOOKBACK]), 0.0)
+
+class TestLookbackEnvironments(unittest.TestCase):
+    def setUp(self):
+        self.features = make_features()
+        self.prices = self.features[:, 0].astype(np.float64)
+
+    def test_single_environment_observation(self):
+        env = TradingEnvironment(self.features, prices=self.prices, episode_length=200, lookback=LOOKBACK)
+        obs, _ = env.reset(seed=0)
+
+        self.assertEqual(obs.shape, env.observation_space.shape)
+        self.assertEqual(obs.shape, (LOOKBACK * 5 + 3,))
+        for _ in range(20):
+            step = env.current_step
+            self.assertGreaterEqual(step, LOOKBACK - 1)
+            np.testing.assert_allclose(
+                obs[:-3], window_observation(self.features[step - LOOKBACK + 1:step + 1]), atol=1e-3
+            )
+            previous = obs
+            obs, *_ = env.step(0)
+        # The step observation is not overwritten by the next one (terminal observations)
+        self.assertFalse(np.shares_memory(obs, previous))
+
+    def test_sampler_must_leave_room_for_the_window(self):
+        with self.assertRaises(ValueError):
+            TradingEnvironment(self.features, prices=self.prices, lookback=LOOKBACK,
+                               episode_sampler=RandomWindowSampler(len(self.features), 200))
+
+    def test_vector_environment_writes_windows_in_place(self):
+        env = VectorTradingEnvironment(self.features, n_envs=8, episode_length=100, seed=0, prices=self.prices,
+                                       lookback=LOOKBACK)
+        self.assertTrue(np.shares_memory(env._window_obs, env._obs))
+
+        obs = env.reset()
+        for _ in range(150):
+            for account in range(env.num_envs):
+                step = env.current_step[account]
+                self.assertGreaterEqual(step, LOOKBACK - 1)
+                np.testing.assert_allclose(
+                    obs[account, :-3], window_observation(self.features[step - LOOKBACK + 1:step + 1]), atol=1e-3
+                )
+            obs, _, _, _ = env.step(np.zeros(env.num_envs, dtype=np.int64))
+
+    def test_universe_windows_follow_account_symbol(self):
+        universe = np.stack([make_features(seed=seed) for seed in range(3)], axis=1)
+        env = VectorTradingEnvironment(universe, n_envs=6, episode_length=100, seed=0,
+                                       prices=universe[:, :, 0].astype(np.float64), lookback=LOOKBACK)
+        obs = env.reset()
+        for account in range(env.num_envs):
+            step, symbol = env.current_step[account], env.account_symbol[account]
+            np.testing.assert_allclose(
+                obs[account, :-3], window_observation(universe[step - LOOKBACK + 1:step + 1, symbol]), atol=1e-3
+            )
+
+class TestLookbackBacktestAndLive(unittest.TestCase):
+    def test_backtest_starts_at_first_full_window(self):
+        features = make_features(n=500)
+        agent = RecordingAgent()
+        backtester = BTCBacktester(agent, {'leverage': 1, 'initial_balance': 10000, 'trading_fee_rate': 0.0004})
+        results = backtester.run_on_arrays(features, features[:, 0], features[:, 0])
+        observations = np.concatenate(agent.observations)
+
+        self.assertEqual(len(observations), 500 - LOOKBACK + 1)
+        np.testing.assert_allclose(observations[0, :-3], window_observation(features[:LOOKBACK]), atol=1e-3)
+        np.testing.assert_allclose(observations[-1, :-3], window_observation(features[-LOOKBACK:]), atol=1e-3)
+        np.testing.assert_array_equal(results['equity_curve'], 10000)
+
+    def test_feed_keeps_the_last_feature_rows(self):
+        async def replay():
+            candles = make_candles()
+            feed = MarketDataFeed(ReplaySource(candles[400:]), window_size=500, lookback=LOOKBACK)
+            feed.warm_up(candles[:400])
+            asyncio.create_task(feed.run())
+            return [bar async for bar in feed.bars()]
+
+        bars = asyncio.run(replay())
+        self.assertEqual(bars[0].window.shape, (LOOKBACK, len(bars[0].features)))
+        np.testing.assert_array_equal(bars[-1].window[-1], bars[-1].features)
+        np.testing.assert_array_equal(
+            bars[-1].window[-LOOKBACK:], np.stack([bar.features for bar in bars[-LOOKBACK:]])
+        )
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+import numpy as np
+from utils.performance_metrics import PerformanceMetrics, StreamingMetrics, periods_per_year
+
+def loop_max_drawdown(portfolio_values):
+    peak, max_drawdown = portfolio_values[0], 0.0
+    for value in portfolio_values[1:]:
+        peak = max(peak, value)
+        max_drawdown = max(max_drawdown, (peak - value) / peak)
+    return max_drawdown * 100
+
+class TestPerformanceMetrics(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.values = 10000 * np.exp(np.cumsum(rng.normal(0, 0.001, 5000)))
+        self.returns = PerformanceMetrics.returns(self.values)
+        self.ppy = periods_per_year('1m')
+
+    def test_max_drawdown_matches_loop(self):
+        self.assertAlmostEqual(PerformanceMetrics.max_drawdown(self.values), loop_max_drawdown(self.values), places=10)
+
+    def test_sharpe_is_annualized_on_excess_returns(self):
+        rf = (1.02) ** (1 / self.ppy) - 1
+        excess = self.returns - rf
+        expected = excess.mean() / excess.std() * np.sqrt(self.ppy)
+
+        self.assertAlmostEqual(PerformanceMetrics.sharpe_ratio(self.returns, 0.02, self.ppy), expected, places=8)
+        self.assertEqual(periods_per_year('1h'), 8760)
+
+    def test_rolling_metrics_match_naive_windows(self):
+        window = 250
+        rolling_sharpe = PerformanceMetrics.rolling_sharpe(self.returns, window)
+        rolling_drawdown = PerformanceMetrics.rolling_max_drawdown(self.values, window)
+
+        self.assertTrue(np.isnan(rolling_sharpe[window - 2]))
+        for end in (window, 1000, len(self.returns)):
+            self.assertAlmostEqual(
+                rolling_sharpe[end - 1], PerformanceMetrics.sharpe_ratio(self.returns[end - window:end]), places=6
+            )
+            self.assertAlmostEqual(
+                rolling_drawdown[end - 1], loop_max_drawdown(self.values[end - window:end]), places=8
+            )
+
+    def test_streaming_matches_batch(self):
+        pnls = np.array([5.0, -3.0, 2.0, -1.0])
+        notional = np.array([1000.0, 2000.0, 1500.0, 500.0])
+        streaming = StreamingMetrics(periods_per_year=self.ppy)
+        for value in self.values:
+            streaming.update(value)
+        for n, pnl in zip(notional, pnls):
+            streaming.record_trade(n, pnl)
+
+        expected = PerformanceMetrics.summary(self.values, pnls, notional, periods_per_year=self.ppy)
+        for name, value in streaming.snapshot().items():
+            with self.subTest(metric=name):
+                self.assertAlmostEqual(value, expected[name], delta=1e-6 * max(1.0, abs(expected[name])))
+
+    def test_short_history_annualization_stays_finite(self):
+        streaming = StreamingMetrics()
+        streaming.update(10000)
+        streaming.update(10050)
+        snapshot = streaming.snapshot()
+
+        self.assertTrue(all(np.isfinite(value) for value in snapshot.values()))
+        self.assertAlmostEqual(snapshot['annualized_return'], 1e6 - 1, delta=1e-3)
+        self.assertEqual(PerformanceMetrics.annualized_return([10000, 10050]), snapshot['annualized_return'])
+        self.assertAlmostEqual(PerformanceMetrics.annualized_return([10000, 9950]), -1.0, delta=1e-5)
+        self.assertTrue(np.isfinite(PerformanceMetrics.calmar_ratio([10000, 9950, 10050])))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+import time
+import unittest
+import numpy as np
+import pandas as pd
+from trading.risk_management import RiskEngine
+from trading.backtester import BTCBacktester, BUY, SELL
+from utils.indicators import average_true_range
+
+TRADING_PARAMS = {
+    'leverage': 5,
+    'initial_balance': 10000,
+    'trading_fee_rate': 0.0004
+}
+
+def price_path(n=2000, drift=0.0, vol=0.002, seed=0):
+    """
+    Synthetic geometric random walk with bar highs and lows
+    """
+    rng = np.random.default_rng(seed)
+    close = 30000 * np.exp(np.cumsum(rng.normal(drift, vol, n)))
+    spread = close * np.abs(rng.normal(0, vol / 2, n))
+    return close + spread, close - spread, close
+
+class FlipAgent:
+    """
+    Buys whenever flat and sells whenever holding, so it trades every bar
+    """
+    def predict_actions(self, states):
+        return np.where(states[:, -2] > 0, SELL, BUY)
+
+class TestRiskEngine(unittest.TestCase):
+    def test_leverage_caps_gross_exposure(self):
+        risk = RiskEngine(TRADING_PARAMS)
+        approved = risk.check_order('buy', 100.0, 20000.0)
+        self.assertAlmostEqual(approved * 20000.0, 10000 * 5)
+        self.assertEqual(risk.last_rejection, 'resized')
+
+        risk.on_fill('buy', approved, 20000.0)
+        self.assertEqual(risk.check_order('buy', 1.0), 0.0)
+        self.assertEqual(risk.last_rejection, 'exposure_limit')
+        self.assertAlmostEqual(risk.margin_used, 10000.0)
+
+    def test_in_flight_orders_count_towards_limits(self):
+        risk = RiskEngine(TRADING_PARAMS)
+        approved = risk.check_order('buy', 100.0, 20000.0)
+        risk.reserve('buy', approved)
+        self.assertEqual(risk.check_order('buy', 1.0), 0.0)
+
+        risk.release('buy', approved)
+        self.assertGreater(risk.check_order('buy', 1.0), 0.0)
+
+    def test_max_trade_amount_caps_order_notional(self):
+        risk = RiskEngine(dict(TRADING_PARAMS, max_trade_amount=100))
+        self.assertAlmostEqual(risk.check_order('buy', 1.0, 25000.0) * 25000.0, 100.0)
+        self.assertAlmostEqual(risk.check_order('buy', 0.001, 25000.0), 0.001)
+
+    def test_drawdown_blocks_new_exposure_only(self):
+        risk = RiskEngine(dict(TRADING_PARAMS, max_drawdown=0.1))
+        _, _, close = price_path(n=500, drift=-0.001, seed=1)
+        risk.on_fill('buy', risk.check_order('buy', 0.5, close[0]), close[0])
+
+        breached = None
+        for i, price in enumerate(close):
+            risk.update_market(price)
+            if breached is None and risk.drawdown > 0.1:
+                breached = i
+        self.assertIsNotNone(breached)
+
+        expected_drawdown = 1 - risk.equity / max(10000, (10000 + risk.position * (close - close[0])).max())
+        self.assertAlmostEqual(risk.drawdown, expected_drawdown)
+        self.assertEqual(risk.check_order('buy', 0.01), 0.0)
+        self.assertEqual(risk.last_rejection, 'max_drawdown')
+        self.assertEqual(risk.check_order('sell', risk.position), risk.position)
+
+    def test_atr_sizing_bounds_stop_loss(self):
+        params = dict(TRADING_PARAMS, risk_per_trade=0.01, atr_stop_multiple=2.0)
+        high, low, close = price_path(seed=2)
+        atr = average_true_range(high, low, close)
+        risk = RiskEngine(params)
+        for i in range(100):
+            risk.update_market(close[i], atr[i])
+
+        approved = risk.check_order('buy', 10.0)
+        self.assertAlmostEqual(approved * 2.0 * atr[99], 10000 * 0.01)
+
+    def test_incremental_state_matches_recomputation(self):
+        rng = np.random.default_rng(3)
+        _, _, close = price_path(n=1000, seed=3)
+        risk = RiskEngine(dict(TRADING_PARAMS, leverage=20))
+        cash, position = 10000.0, 0.0
+        for price in close:
+            risk.update_market(price)
+            side = 'buy' if rng.random() < 0.5 else 'sell'
+            quantity = risk.check_order(side, rng.uniform(0, 0.2))
+            if quantity:
+                # Brute force: track cash flows, equity is cash plus position value
+                signed = quantity if side == 'buy' else -quantity
+                cash -= signed * price
+                position += signed
+                risk.on_fill(side, quantity, price)
+            self.assertAlmostEqual(risk.equity, cash + position * price, places=6)
+            self.assertAlmostEqual(risk.exposure, abs(position) * price, places=6)
+            self.assertLessEqual(risk.exposure, risk.equity * 20 + 1e-6)
+
+    def test_check_is_cheap(self):
+        risk = RiskEngine(dict(TRADING_PARAMS, max_trade_amount=100, max_drawdown=0.2, risk_per_trade=0.01))
+        risk.update_market(30000.0, 50.0)
+        n = 100000
+        started = time.perf_counter()
+        for _ in range(n):
+            risk.check_order('buy', 0.01, 30000.0)
+        self.assertLess((time.perf_counter() - started) / n, 20e-6)
+
+class TestBacktesterRisk(unittest.TestCase):
+    def make_bars(self, n=3000, seed=4):
+        high, low, close = price_path(n, drift=-0.0005, vol=0.004, seed=seed)
+        return pd.DataFrame({'open': close, 'high': high, 'low': low, 'close': close, 'atr': average_true_range(high, low, close)})
+
+    def test_orders_respect_max_trade_amount(self):
+        data = self.make_bars()
+        results = BTCBacktester(FlipAgent(), dict(TRADING_PARAMS, max_trade_amount=500)).run_comprehensive_backtest(data=data)
+
+        entries = results['trades'][results['trades']['side'] == BUY]
+        self.assertGreater(len(entries), 0)
+        self.assertTrue(np.all(entries['price'] * entries['quantity'] <= 500 + 1e-9))
+
+    def test_drawdown_limit_stops_trading(self):
+        data = self.make_bars()
+        params = dict(TRADING_PARAMS, max_drawdown=0.05)
+        results = BTCBacktester(FlipAgent(), params).run_comprehensive_backtest(data=data)
+
+        equity_curve = results['equity_curve']
+        breach = np.argmax(1 - equity_curve / np.maximum.accumulate(equity_curve) > 0.05)
+        self.assertGreater(breach, 0)
+        self.assertGreater(results['risk_rejections'], 0)
+        self.assertTrue(np.all(results['trades']['step'][results['trades']['side'] == BUY] < breach))
@@ -0,0 +1,119 @@
+import asyncio
+import time
+import unittest
+import ccxt
+import numpy as np
+from config.config import Config
+from data.market_feed import CCXTStreamSource
+from trading.live_trader import BTCLiveTrader
+from trading.simulator import SimulatedExchange, SyntheticOrderBook
+
+def make_candles(n=100, price=20000.0):
+    timestamps = 1672531200000 + 60000 * np.arange(n)
+    close = price + np.arange(n, dtype=np.float64)
+    return np.column_stack([timestamps, close - 1, close + 5, close - 5, close, np.ones(n)])
+
+class TestSyntheticOrderBook(unittest.TestCase):
+    def setUp(self):
+        self.book = SyntheticOrderBook(half_spread_bps=1.0, level_bps=1.0, levels=10, depth=1.0)
+
+    def test_small_order_fills_at_touch(self):
+        bid, ask = self.book.quote(10000.0)
+        self.assertEqual(self.book.sweep('buy', 0.5, 10000.0), (0.5, ask))
+        self.assertEqual(self.book.sweep('sell', 0.5, 10000.0), (0.5, bid))
+
+    def test_large_order_walks_the_book(self):
+        # Levels of 1, 2 and 1.5 of 3 at 1, 2 and 3 bps
+        filled, average = self.book.sweep('buy', 4.5, 10000.0)
+        self.assertEqual(filled, 4.5)
+        self.assertAlmostEqual(average, (1 * 10001 + 2 * 10002 + 1.5 * 10003) / 4.5)
+
+        filled, _ = self.book.sweep('sell', 1000.0, 10000.0)
+        self.assertEqual(filled, self.book.cumulative[-1])
+
+class TestSimulatedExchange(unittest.TestCase):
+    def setUp(self):
+        self.exchange = SimulatedExchange(make_candles(), balance=10000.0, fee_rate=0.001, leverage=2, start=10)
+
+    def test_round_trip_pays_fees_and_spread(self):
+        async def round_trip():
+            buy = await self.exchange.create_market_buy_order('BTC/USDT', 0.1)
+            sell = await self.exchange.create_market_sell_order('BTC/USDT', 0.1)
+            return buy, sell, await self.exchange.fetch_balance()
+
+        buy, sell, balance = asyncio.run(round_trip())
+
+        fees = buy['fee']['cost'] + sell['fee']['cost']
+        self.assertAlmostEqual(buy['fee']['cost'], 0.1 * buy['average'] * 0.001)
+        self.assertGreater(buy['average'], sell['average'])
+        self.assertAlmostEqual(balance['USDT']['total'], 10000.0 - fees + 0.1 * (sell['average'] - buy['average']))
+        self.assertEqual(self.exchange.accounts['BTC/USDT'].position, 0.0)
+        self.assertAlmostEqual(self.exchange.cost_report()['fee_bps'], 10.0)
+
+    def test_margin_limits_exposure(self):
+        price = self.exchange.price('BTC/USDT')
+        with self.assertRaises(ccxt.InsufficientFunds):
+            self.exchange.execute('BTC/USDT', 'buy', 2 * 10000.0 / price)
+
+        self.exchange.execute('BTC/USDT', 'sell', 0.9 * 2 * 10000.0 / price)
+        # Reducing the position needs no margin
+        self.exchange.execute('BTC/USDT', 'buy', 0.5)
+        with self.assertRaises(ccxt.BadSymbol):
+            self.exchange.execute('ETH/USDT', 'buy', 0.1)
+
+    def test_latency_delays_requests(self):
+        exchange = SimulatedExchange(make_candles(), latency=0.02)
+
+        start = time.perf_counter()
+        asyncio.run(exchange.fetch_ticker('BTC/USDT'))
+        self.assertGreaterEqual(time.perf_counter() - start, 0.02)
+
+    def test_stream_source_replays_closed_candles(self):
+        candles = make_candles(20)
+        exchange = SimulatedExchange(candles, start=5)
+
+        async def replay():
+            closed = []
+            async for candle, is_closed in CCXTStreamSource('BTC/USDT', '1m', exchange).stream():
+                if is_closed:
+                    closed.append(candle)
+                    # Orders placed on a bar close fill around the next candle's open
+                    self.assertEqual(exchange.price('BTC/USDT'), candles[len(closed) + 4, 1])
+            return closed
+
+        with self.assertRaises(ccxt.ExchangeNotAvailable):
+            asyncio.run(replay())
+        np.testing.assert_array_equal(exchange.history('BTC/USDT'), candles[:19])
+
+class TestLiveTraderOnSimulator(unittest.TestCase):
+    def setUp(self):
+        self.config = Config()
+        self.exchange = SimulatedExchange(make_candles(), balance=10000.0, leverage=self.config.TRADING_PARAMS['leverage'])
+
+    def test_fills_update_cached_state(self):
+        trader = BTCLiveTrader(self.config, None, exchange=self.exchange)
+
+        async def trade():
+            await trader.start()
+            trader.risk.update_market(20000.0, 50.0)
+            for action in (1, 1, 2):
+                trader.execute_trade(action, 20000.0)
+            await trader.close()
+            return await self.exchange.fetch_balance()
+
+        balance = asyncio.run(trade())
+
+        self.assertEqual(trader.engine.latency_report()['orders'], 3)
+        self.assertAlmostEqual(trader.engine.state.balance, balance['USDT']['total'])
+        self.assertAlmostEqual(trader.engine.state.position, self.exchange.accounts['BTC/USDT'].position)
+
+    def test_simulate_trade(self):
+        trader = BTCLiveTrader(self.config, None, exchange=self.exchange)
+
+        self.assertEqual(trader.simulate_trade('buy', 100), 'market_closed')
+        self.assertEqual(trader.simulate_trade('buy', 100, price=20000.0), 'success')
+        self.assertEqual(trader.simulate_trade('buy', 1e9, price=20000.0), 'insufficient_balance')
+        self.assertEqual(trader.engine.state.position, 0.0)
+
+if __name__ == '__main__':
+    unittest.main()
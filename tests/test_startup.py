@@ -0,0 +1,10 @@
+import unittest
+from benchmarks.bench_startup import bench_startup
+
+class TestWarmStart(unittest.TestCase):
+    def test_live_script_starts_without_heavy_imports(self):
+        result = bench_startup(repeats=1)
+
+        self.assertEqual(result['heavy_modules'], [])
+        self.assertLess(result['script_import_sec'], result['first_decision_sec'])
+        self.assertLess(result['first_decision_sec'], 0.5)
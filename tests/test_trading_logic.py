@@ -1,4 +1,6 @@
 import unittest
+import numpy as np
+from models.environments import TradingEnvironment
 from trading.live_trader import BTCLiveTrader
 from config.config import Config
 
@@ -18,5 +20,20 @@ class TestTradingLogic(unittest.TestCase):
         result = self.live_trader.simulate_trade('buy', 100)
         self.assertTrue(result in ['success', 'insufficient_balance', 'market_closed'])
 
+    def test_portfolio_fields_match_environment(self):
+        initial_balance = self.live_trader.config.TRADING_PARAMS['initial_balance']
+        env = TradingEnvironment(np.full((10, 4), 100.0), initial_balance=initial_balance)
+        state = self.live_trader.engine.state
+
+        # Flat: balance ratio, no holding
+        state.balance, state.position = initial_balance * 1.05, 0.0
+        env.balance, env.btc_held = initial_balance * 1.05, 0.0
+        np.testing.assert_allclose(self.live_trader.portfolio_fields(), env._get_observation()[-3:], rtol=1e-6)
+
+        # Long (leveraged live, margin left in the wallet): balance field 0, quantity held
+        state.balance, state.position = initial_balance * 0.999, 2.5
+        env.balance, env.btc_held = 0.0, 2.5
+        np.testing.assert_allclose(self.live_trader.portfolio_fields(), env._get_observation()[-3:], rtol=1e-6)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+import optuna
+from config.config import Config
+from models.tuning import HyperparameterSearch
+
+def tiny_search_space(trial):
+    """
+    Small, fast PPO settings; only the learning rate is searched
+    """
+    return {
+        'learning_rate': trial.suggest_float('learning_rate', 1e-4, 1e-3, log=True),
+        'n_steps': 32,
+        'batch_size': 64,
+        'n_epochs': 1
+    }
+
+def failing_search_space(trial):
+    """
+    Every trial fails, as a diverging or misconfigured run would
+    """
+    trial.suggest_float('learning_rate', 1e-4, 1e-3, log=True)
+    raise ValueError('invalid PPO settings')
+
+def make_data(n=3000, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 30000 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    return pd.DataFrame({
+        'open': close, 'high': close * 1.001, 'low': close * 0.999, 'close': close,
+        'volume': rng.uniform(1, 10, n), 'atr': close * 0.002
+    })
+
+class TestHyperparameterSearch(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.config = Config()
+        self.config.RL_PARAMS = dict(self.config.RL_PARAMS, total_timesteps=512, n_envs=4, episode_length=256)
+        self.config.TUNING_PARAMS = dict(
+            self.config.TUNING_PARAMS,
+            storage=f"sqlite:///{os.path.join(self.tmp_dir.name, 'study.db')}",
+            eval_interval=256
+        )
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def finished_trials(self, study):
+        return study.get_trials(states=(optuna.trial.TrialState.COMPLETE, optuna.trial.TrialState.PRUNED))
+
+    def test_parallel_trials_persist_and_resume(self):
+        search = HyperparameterSearch(self.config, make_data(), n_workers=2, search_space=tiny_search_space)
+        first = self.finished_trials(search.run(n_trials=3))
+        self.assertGreaterEqual(len(first), 3)
+
+        resumed = self.finished_trials(search.run(n_trials=5))
+        self.assertGreaterEqual(len(resumed), 5)
+        self.assertEqual([t.params for t in resumed[:len(first)]], [t.params for t in first])
+        self.assertTrue(all(len(t.intermediate_values) > 0 for t in resumed))
+
+    def test_weak_trials_are_pruned(self):
+        search = HyperparameterSearch(
+            self.config, make_data(), n_workers=2, search_space=tiny_search_space,
+            pruner=optuna.pruners.ThresholdPruner(lower=1e9)
+        )
+        trials = self.finished_trials(search.run(n_trials=2))
+
+        self.assertTrue(all(t.state == optuna.trial.TrialState.PRUNED for t in trials))
+        self.assertTrue(all(max(t.intermediate_values) < 512 for t in trials))
+
+    def test_failing_trials_count_towards_n_trials(self):
+        search = HyperparameterSearch(self.config, make_data(), n_workers=2, search_space=failing_search_space)
+        trials = search.run(n_trials=2).get_trials()
+
+        self.assertGreaterEqual(len(trials), 2)
+        self.assertTrue(all(t.state == optuna.trial.TrialState.FAIL for t in trials))
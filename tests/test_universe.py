@@ -0,0 +1,189 @@
+import asyncio
+import unittest
+import numpy as np
+import pandas as pd
+from data.market_feed import MarketDataFeed, ReplaySource
+from data.universe import (
+    align_ohlcv, available_rows, build_features, build_universe, feature_columns, resample_ohlcv,
+    resample_timeframes
+)
+from models.environments import TradingEnvironment
+from models.vec_environment import VectorTradingEnvironment
+from trading.backtester import BTCBacktester
+from utils.indicators import IndicatorEngine
+
+START = 1672531200000  # 2023-01-01 UTC
+MINUTE = 60000
+
+TRADING_PARAMS = {
+    'leverage': 3,
+    'initial_balance': 10000,
+    'trading_fee_rate': 0.0004
+}
+
+def make_candles(n=3000, seed=0, start=START, gaps=()):
+    """
+    Random-walk (n, 6) 1m candles, with the given row positions removed
+    """
+    rng = np.random.default_rng(seed)
+    close = 20000 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    spread = np.abs(rng.normal(0, 10, n))
+    candles = np.column_stack([
+        start + MINUTE * np.arange(n), open_, np.maximum(open_, close) + spread,
+        np.minimum(open_, close) - spread, close, rng.uniform(1, 50, n)
+    ])
+    return np.delete(candles, list(gaps), axis=0)
+
+class SignalAgent:
+    """
+    Buys on odd bars of the 'open' feature's integer part, sells otherwise
+    """
+    def predict_actions(self, states):
+        return np.where(states[:, 0].astype(np.int64) % 2 == 1, 1, 2)
+
+class TestResampling(unittest.TestCase):
+    def test_matches_pandas_resample(self):
+        candles = make_candles(gaps=[5, 6, 700])
+        df = pd.DataFrame(candles[:, 1:], columns=['open', 'high', 'low', 'close', 'volume'],
+                          index=pd.to_datetime(candles[:, 0].astype(np.int64), unit='ms'))
+        expected = df.resample('15min').agg(
+            {'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'}
+        ).dropna()
+
+        bars = resample_ohlcv(candles, 15 * MINUTE)
+
+        np.testing.assert_array_equal(bars[:, 0], expected.index.as_unit('ms').asi8)
+        np.testing.assert_allclose(bars[:, 1:], expected.values)
+
+    def test_cascade_matches_direct_resample(self):
+        candles = make_candles(gaps=[100])
+        resampled = resample_timeframes(candles, '1m', ['1h', '5m', '15m'])
+
+        self.assertEqual(list(resampled), ['1h', '5m', '15m'])
+        np.testing.assert_allclose(resampled['1h'], resample_ohlcv(candles, 60 * MINUTE))
+
+    def test_bars_known_only_after_close(self):
+        timestamps = make_candles(n=50, gaps=[29])[:, 0]
+        rows = available_rows(timestamps, MINUTE, 15 * MINUTE)
+
+        # Bucket 0 ends with its last minute, bucket 1 misses it and is known from bucket 2's first row
+        self.assertEqual(timestamps[rows[0]], START + 14 * MINUTE)
+        self.assertEqual(timestamps[rows[1]], START + 30 * MINUTE)
+        self.assertEqual(rows[-1], len(timestamps))
+
+class TestBuildFeatures(unittest.TestCase):
+    def setUp(self):
+        self.engine = IndicatorEngine()
+        self.candles = make_candles()
+
+    def test_higher_timeframe_has_no_lookahead(self):
+        features = build_features(self.candles, '1m', ['15m'], self.engine)
+        columns = feature_columns(self.engine, ['15m'])
+        close_15m = features[:, columns.index('close_15m')]
+        bars = resample_ohlcv(self.candles, 15 * MINUTE)
+
+        self.assertEqual(features.shape, (len(self.candles), len(columns)))
+        self.assertTrue(np.isnan(close_15m[:14]).all())
+        for row in (14, 15, 29, 30, 1000):
+            # Latest 15m bar whose last minute is at or before this row
+            closed = bars[bars[:, 0] + 15 * MINUTE <= self.candles[row, 0] + MINUTE]
+            self.assertAlmostEqual(close_15m[row], closed[-1, 4], delta=1e-2)
+
+    def test_live_feed_matches_offline_features(self):
+        higher = ['5m', '15m']
+        offline = build_features(self.candles, '1m', higher, self.engine)
+
+        async def replay():
+            feed = MarketDataFeed(ReplaySource(self.candles[1500:]), higher_timeframes=higher)
+            feed.warm_up(self.candles[:1500])
+            task = asyncio.create_task(feed.run())
+            bars = [bar.features async for bar in feed.bars()]
+            await task
+            return feed.columns, np.array(bars)
+
+        columns, live = asyncio.run(replay())
+
+        self.assertEqual(columns, feature_columns(self.engine, higher))
+        np.testing.assert_allclose(live, offline[1500:], rtol=1e-4)
+
+class TestBuildUniverse(unittest.TestCase):
+    def setUp(self):
+        self.candles = {
+            'BTC/USDT': make_candles(seed=0, gaps=[2000]),
+            'ETH/USDT': make_candles(seed=1),
+            # Listed later than the others
+            'SOL/USDT': make_candles(n=2500, seed=2, start=START + 500 * MINUTE)
+        }
+        self.dataset = build_universe(self.candles, '1m', ['15m'])
+
+    def test_symbols_share_one_index(self):
+        dataset = self.dataset
+        self.assertEqual(dataset.symbols, list(self.candles))
+        self.assertEqual(dataset.features.shape, (len(dataset), 3, len(dataset.columns)))
+        self.assertEqual(dataset.features.dtype, np.float32)
+        self.assertFalse(np.isnan(dataset.features).any())
+        # Warm-up of the late listing decides the first row
+        self.assertGreater(dataset.index[0], np.datetime64(START + 500 * MINUTE, 'ms'))
+
+        timestamps = dataset.index.astype(np.int64)
+        eth = self.candles['ETH/USDT']
+        np.testing.assert_array_equal(dataset.prices[:, 1], eth[np.searchsorted(eth[:, 0], timestamps), 4])
+        np.testing.assert_array_equal(dataset.column('close')[:, 1], dataset.prices[:, 1].astype(np.float32))
+
+    def test_missing_candle_repeats_previous_close(self):
+        aligned = align_ohlcv(self.candles['BTC/USDT'], self.candles['ETH/USDT'][:, 0])
+
+        np.testing.assert_array_equal(aligned[2000, 1:5], np.full(4, aligned[1999, 4]))
+        self.assertEqual(aligned[2000, 5], 0.0)
+
+    def test_split_and_symbol_views(self):
+        train, _, test = self.dataset.split(0.8)
+        self.assertEqual(train.symbols, self.dataset.symbols)
+        self.assertTrue(np.shares_memory(test.features, self.dataset.features))
+
+        eth = self.dataset.symbol('ETH/USDT')
+        self.assertEqual(eth.features.shape, (len(self.dataset), len(self.dataset.columns)))
+        np.testing.assert_array_equal(eth.prices, self.dataset.prices[:, 1])
+
+class TestUniverseTrading(unittest.TestCase):
+    def setUp(self):
+        self.dataset = build_universe(
+            {'BTC/USDT': make_candles(seed=0), 'ETH/USDT': make_candles(seed=1)}, '1m'
+        )
+
+    def test_vector_environment_spreads_accounts_over_symbols(self):
+        vec_env = VectorTradingEnvironment(self.dataset, n_envs=4, initial_balance=100000, episode_length=100, seed=0)
+        vec_env.reset()
+        steps = vec_env.current_step.copy()
+        obs, _, _, _ = vec_env.step(np.ones(4, dtype=np.int64))
+
+        np.testing.assert_array_equal(vec_env.account_symbol, [0, 1, 0, 1])
+        expected_prices = self.dataset.prices[steps, vec_env.account_symbol]
+        np.testing.assert_allclose(vec_env.btc_held, 100000 / expected_prices)
+        np.testing.assert_array_equal(obs[:, :-3], self.dataset.features[steps + 1, vec_env.account_symbol])
+
+    def test_single_environment_trades_chosen_symbol(self):
+        env = TradingEnvironment(self.dataset, initial_balance=100000, symbol=1)
+        obs, _ = env.reset()
+        env.step(1)
+
+        np.testing.assert_array_equal(obs[:-3], self.dataset.features[0, 1])
+        self.assertAlmostEqual(env.btc_held, 100000 / self.dataset.prices[0, 1])
+
+    def test_backtest_sums_equal_weight_sleeves(self):
+        backtester = BTCBacktester(SignalAgent(), TRADING_PARAMS)
+        results = backtester.run_comprehensive_backtest(data=self.dataset)
+
+        sleeves = [
+            BTCBacktester(SignalAgent(), TRADING_PARAMS).run_comprehensive_backtest(5000, self.dataset.symbol(symbol))
+            for symbol in self.dataset.symbols
+        ]
+        np.testing.assert_allclose(results['equity_curve'], sum(sleeve['equity_curve'] for sleeve in sleeves))
+        self.assertEqual(results['total_trades'], sum(sleeve['total_trades'] for sleeve in sleeves))
+        self.assertEqual(set(results['symbols']), set(self.dataset.symbols))
+        self.assertTrue(set(results['trades']['symbol']) <= {0, 1})
+        self.assertTrue((np.diff(results['trades']['step']) >= 0).all())
+
+if __name__ == '__main__':
+    unittest.main()
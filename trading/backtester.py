@@ -1,97 +1,342 @@
 import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
 import json
+from utils.performance_metrics import PerformanceMetrics, periods_per_year
+from trading.risk_management import RiskEngine
+from models.observations import LookbackWindows
+from utils.instrumentation import metrics
+
+# Trade sides recorded in the trades array
+BUY, SELL, LIQUIDATION = 1, 2, 3
+
+TRADE_DTYPE = np.dtype([
+    ('step', np.int64),
+    ('side', np.int8),
+    ('price', np.float64),
+    ('quantity', np.float64),
+    ('fee', np.float64),
+    ('equity', np.float64)
+])
+
+# Trades of a universe backtest also record the symbol index
+UNIVERSE_TRADE_DTYPE = np.dtype(TRADE_DTYPE.descr + [('symbol', np.int16)])
 
 class BTCBacktester:
-    def __init__(self, rl_agent):
+    def __init__(self, rl_agent, trading_params=None, min_chunk=64, max_chunk=8192):
         self.agent = rl_agent
-    
-    def run_comprehensive_backtest(self, initial_balance=10000):
+        self.trading_params = trading_params or rl_agent.config.TRADING_PARAMS
+        self.min_chunk = min_chunk
+        self.max_chunk = max_chunk
+        self.results = None
+        # RiskEngine of the last run_on_arrays call
+        self.risk = None
+
+    def run_comprehensive_backtest(self, initial_balance=None, data=None):
         """
         Run detailed backtest of trading strategy
-        
+
+        Event-driven: the policy is queried in batches over the test matrix
+        while the portfolio state is unchanged, and re-queried from the
+        first bar where an order or a liquidation changes it. Orders fill at
+        the bar close with trading_fee_rate on the notional; positions are
+        opened with the configured leverage and liquidated when the bar low
+        reaches the liquidation price. Every entry is sized through a
+        RiskEngine built from the trading parameters; it is marked at every
+        event (entries, exits, liquidations, and the bar low at the end of
+        each held batch) with the data's 'atr' column when present. An agent
+        trained on lookback windows (its lookback attribute) gets the same
+        observations as in training and starts trading once the first full
+        window is available; its normalizer, when set, is applied to the
+        features first. A universe TradingDataset is run per symbol (see
+        run_universe).
+
+        Args:
+            initial_balance (float): Starting equity, TRADING_PARAMS['initial_balance'] by default
+            data (pd.DataFrame or TradingDataset): Bars to test on, the agent's test_data by default
+
+        Returns:
+            dict: Comprehensive backtest results
+        """
+        if data is None:
+            data = self.agent.test_data
+
+        if hasattr(data, 'offsets') and data.symbols is not None:
+            return self.run_universe(data, initial_balance)
+        if hasattr(data, 'offsets'):
+            # TradingDataset: fill at its price vector, low/atr from the feature columns
+            return self.run_on_arrays(
+                data.features,
+                data.prices,
+                data.column('low'),
+                initial_balance,
+                atr=data.column('atr') if 'atr' in data.offsets else None
+            )
+
+        return self.run_on_arrays(
+            data.values,
+            data['close'].values,
+            data['low'].values,
+            initial_balance,
+            atr=data['atr'].values if 'atr' in data.columns else None
+        )
+
+    @metrics.timed('backtest.run')
+    def run_on_arrays(self, features, close, low, initial_balance=None, atr=None):
+        """
+        Backtest over raw arrays (e.g. memory-mapped windows shared between processes)
+
+        Args:
+            features (np.ndarray): (n, n_features) policy inputs, same columns as training
+            close (np.ndarray): (n,) fill prices
+            low (np.ndarray): (n,) bar lows for liquidation checks
+            initial_balance (float): Starting equity
+            atr (np.ndarray): (n,) ATR per bar for the risk engine's volatility sizing
+
         Returns:
             dict: Comprehensive backtest results
         """
-        balance = initial_balance
-        trades = []
-        portfolio_values = [initial_balance]
-        
-        # Simulate trading
-        for _ in range(len(self.agent.test_data)):
-            action = self.agent.predict_action(self.agent.test_data[_])
-            trade_result = self._simulate_trade(action, balance)
-            
-            balance = trade_result['new_balance']
-            portfolio_values.append(balance)
-            
-            trades.append({
-                'action': action,
-                'price': trade_result['price'],
-                'balance': balance
-            })
-        
-        return {
+        if initial_balance is None:
+            initial_balance = self.trading_params['initial_balance']
+
+        normalizer = getattr(self.agent, 'normalizer', None)
+        if normalizer is not None:
+            features = normalizer.transform(features)
+        else:
+            features = np.ascontiguousarray(features, dtype=np.float32)
+        close = np.asarray(close, dtype=np.float64)
+        low = np.asarray(low, dtype=np.float64)
+        fee_rate = self.trading_params['trading_fee_rate']
+        leverage = self.trading_params['leverage']
+        risk = self.risk = RiskEngine(self.trading_params, initial_balance)
+        if atr is None:
+            atr = np.full(len(close), np.nan)
+
+        n_bars, n_features = features.shape
+        metrics.count('backtest.bars', n_bars)
+        lookback = getattr(self.agent, 'lookback', 1)
+        windows = None
+        if lookback > 1:
+            windows = LookbackWindows(features, lookback, getattr(self.agent, 'normalize_lookback', True))
+        window_size = lookback * n_features
+        equity_curve = np.empty(n_bars + 1)
+        # Flat until the first full lookback window
+        equity_curve[:lookback] = initial_balance
+        trades = np.zeros(2 * n_bars + 1, dtype=TRADE_DTYPE)
+        n_trades = 0
+
+        # Observation buffer reused for every inference batch
+        observations = np.zeros((min(self.max_chunk, n_bars), window_size + 3), dtype=np.float32)
+
+        equity = float(initial_balance)  # Account equity while flat, margin after entry fee while long
+        quantity = 0.0
+        entry_price = 0.0
+        liquidation_price = -np.inf
+        chunk = self.min_chunk
+        step = lookback - 1
+
+        while step < n_bars:
+            end = min(step + chunk, n_bars)
+            rows = end - step
+
+            # Portfolio fields are constant until the next event (same layout as TradingEnvironment)
+            obs = observations[:rows]
+            if windows is not None:
+                windows.write(obs[:, :window_size].reshape(rows, lookback, n_features), np.arange(step, end))
+            else:
+                obs[:, :n_features] = features[step:end]
+            obs[:, window_size] = 0.0 if quantity else equity / initial_balance
+            obs[:, window_size + 1] = quantity
+            obs[:, window_size + 2] = 0.0
+            actions = self.agent.predict_actions(obs)
+
+            if quantity:
+                liquidated = np.flatnonzero(low[step:end] <= liquidation_price)
+                exits = np.flatnonzero(actions == SELL)
+                liquidation_at = liquidated[0] if len(liquidated) else rows
+                event = min(liquidation_at, exits[0] if len(exits) else rows)
+
+                # Mark to market while the position is held
+                equity_curve[step + 1:step + event + 1] = equity + quantity * (close[step:step + event] - entry_price)
+
+                if event:
+                    risk.mark_peak(equity_curve[step + 1:step + event + 1].max())
+
+                if event < rows and event == liquidation_at:
+                    # Margin exhausted intrabar; the bar's close decision is re-queried flat
+                    risk.update_market(liquidation_price, atr[step + event])
+                    trades[n_trades] = (step + event, LIQUIDATION, liquidation_price, quantity, 0.0, 0.0)
+                    n_trades += 1
+                    risk.on_fill('sell', quantity, liquidation_price)
+                    equity, quantity = 0.0, 0.0
+                    liquidation_price = -np.inf
+                    step += event
+                elif event < rows:
+                    price = close[step + event]
+                    risk.update_market(price, atr[step + event])
+                    fee = quantity * price * fee_rate
+                    equity = max(equity + quantity * (price - entry_price) - fee, 0.0)
+                    trades[n_trades] = (step + event, SELL, price, quantity, fee, equity)
+                    n_trades += 1
+                    risk.on_fill('sell', quantity, price, fee)
+                    quantity = 0.0
+                    liquidation_price = -np.inf
+                    equity_curve[step + event + 1] = equity
+                    step += event + 1
+                else:
+                    # Still held: mark the drawdown at the batch's last low
+                    risk.update_market(low[end - 1], atr[end - 1])
+                    step = end
+            else:
+                entries = np.flatnonzero(actions == BUY) if equity > 0 else []
+                event = entries[0] if len(entries) else rows
+
+                equity_curve[step + 1:step + event + 1] = equity
+
+                if event < rows:
+                    price = close[step + event]
+                    risk.update_market(price, atr[step + event])
+                    approved = risk.check_order('buy', equity * leverage / price)
+                    if approved > 0:
+                        notional = approved * price
+                        quantity = approved
+                        fee = notional * fee_rate
+                        equity -= fee
+                        entry_price = price
+                        liquidation_price = price - equity / quantity
+                        trades[n_trades] = (step + event, BUY, price, quantity, fee, equity)
+                        n_trades += 1
+                        risk.on_fill('buy', quantity, price, fee)
+                    equity_curve[step + event + 1] = equity
+                    step += event + 1
+                else:
+                    risk.update_market(close[end - 1], atr[end - 1])
+                    step = end
+
+            # Size the next batch from the spacing of recent events
+            chunk = int(np.clip(2 * max(event, 1), self.min_chunk, self.max_chunk))
+
+        trades = trades[:n_trades].copy()
+        final_balance = float(equity_curve[-1])
+        trade_pnls = self._round_trip_pnls(trades)
+        performance = PerformanceMetrics.summary(
+            equity_curve,
+            trade_pnls=trade_pnls,
+            traded_notional=trades['price'] * trades['quantity'],
+            periods_per_year=periods_per_year(self.trading_params.get('timeframe', '1m'))
+        )
+
+        self.results = {
             'initial_balance': initial_balance,
-            'final_balance': balance,
-            'total_return_percentage': ((balance - initial_balance) / initial_balance) * 100,
-            'max_drawdown': self._calculate_max_drawdown(portfolio_values),
-            'total_trades': len(trades),
-            'winning_trades': sum(1 for t in trades if t['balance'] > initial_balance),
-            'trades': trades
+            'final_balance': final_balance,
+            'total_return_percentage': ((final_balance - initial_balance) / initial_balance) * 100,
+            **performance,
+            'total_trades': n_trades,
+            'winning_trades': int(np.sum(trade_pnls > 0)),
+            'risk_rejections': risk.rejections,
+            'trades': trades,
+            'equity_curve': equity_curve
         }
-    
-    def _simulate_trade(self, action, current_balance):
+        return self.results
+
+    def run_universe(self, dataset, initial_balance=None):
         """
-        Simulate trade based on action
+        Backtest every symbol of a universe TradingDataset as an equal-weight sleeve
+
+        Each symbol trades its own account with initial_balance / n_symbols
+        through run_on_arrays; the portfolio equity curve is the sum of the
+        sleeves and the headline metrics are computed on it.
+
+        Returns:
+            dict: Portfolio results, with per-symbol summaries under 'symbols'
+                and the merged trades tagged with their symbol index
         """
-        # Mock trading logic
-        price = np.random.uniform(9000, 11000)  # Random price simulation
-        trade_amount = current_balance * 0.1  # 10% of balance
-        
-        if action == 'buy':
-            new_balance = current_balance - trade_amount
-        elif action == 'sell':
-            new_balance = current_balance + trade_amount
-        else:
-            new_balance = current_balance
-        
-        return {
-            'new_balance': new_balance,
-            'price': price
+        if initial_balance is None:
+            initial_balance = self.trading_params['initial_balance']
+        sleeve_balance = initial_balance / dataset.n_symbols
+        low = dataset.column('low')
+        atr = dataset.column('atr') if 'atr' in dataset.offsets else None
+
+        equity_curve = np.zeros(len(dataset) + 1)
+        trades, trade_pnls, symbol_results = [], [], {}
+        risk_rejections = 0
+        for i, symbol in enumerate(dataset.symbols):
+            results = self.run_on_arrays(
+                dataset.features[:, i],
+                dataset.prices[:, i],
+                low[:, i],
+                sleeve_balance,
+                atr=None if atr is None else atr[:, i]
+            )
+            equity_curve += results['equity_curve']
+            symbol_trades = np.zeros(len(results['trades']), dtype=UNIVERSE_TRADE_DTYPE)
+            for name in TRADE_DTYPE.names:
+                symbol_trades[name] = results['trades'][name]
+            symbol_trades['symbol'] = i
+            trades.append(symbol_trades)
+            trade_pnls.append(self._round_trip_pnls(results['trades']))
+            risk_rejections += results['risk_rejections']
+            symbol_results[symbol] = {
+                key: value for key, value in results.items() if key not in ('trades', 'equity_curve')
+            }
+
+        trades = np.concatenate(trades)
+        trades = trades[np.argsort(trades['step'], kind='stable')]
+        trade_pnls = np.concatenate(trade_pnls)
+        final_balance = float(equity_curve[-1])
+        performance = PerformanceMetrics.summary(
+            equity_curve,
+            trade_pnls=trade_pnls,
+            traded_notional=trades['price'] * trades['quantity'],
+            periods_per_year=periods_per_year(self.trading_params.get('timeframe', '1m'))
+        )
+
+        self.results = {
+            'initial_balance': initial_balance,
+            'final_balance': final_balance,
+            'total_return_percentage': ((final_balance - initial_balance) / initial_balance) * 100,
+            **performance,
+            'total_trades': len(trades),
+            'winning_trades': int(np.sum(trade_pnls > 0)),
+            'risk_rejections': risk_rejections,
+            'symbols': symbol_results,
+            'trades': trades,
+            'equity_curve': equity_curve
         }
-    
-    def _calculate_max_drawdown(self, portfolio_values):
+        return self.results
+
+    @staticmethod
+    def _round_trip_pnls(trades):
         """
-        Calculate maximum drawdown
+        Net PnL of each closed round trip (exit equity minus equity before the entry fee)
         """
-        peak = portfolio_values[0]
-        max_drawdown = 0
-        
-        for value in portfolio_values[1:]:
-            if value > peak:
-                peak = value
-            drawdown = (peak - value) / peak
-            max_drawdown = max(max_drawdown, drawdown)
-        
-        return max_drawdown * 100
-    
+        is_entry = trades['side'] == BUY
+        entries = trades['equity'][is_entry] + trades['fee'][is_entry]
+        exits = trades['equity'][~is_entry]
+        return exits - entries[:len(exits)]
+
     def plot_performance(self):
         """
         Create performance visualization
         """
+        import matplotlib.pyplot as plt
+
         plt.figure(figsize=(12, 6))
+        if self.results is not None:
+            plt.plot(self.results['equity_curve'])
         plt.title('Portfolio Performance')
         plt.xlabel('Trading Steps')
         plt.ylabel('Portfolio Value')
         plt.tight_layout()
         plt.savefig('portfolio_performance.png')
         plt.close()
-    
+
     def save_backtest_results(self, results, filename='backtest_results.json'):
         """
         Save backtest results to JSON
         """
+        import pandas as pd
+
+        serializable = dict(results)
+        serializable['trades'] = pd.DataFrame(results['trades']).to_dict(orient='records')
+        serializable['equity_curve'] = results['equity_curve'].tolist()
         with open(filename, 'w') as f:
-            json.dump(results, f, indent=4)
+            json.dump(serializable, f, indent=4)
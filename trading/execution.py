@@ -0,0 +1,212 @@
+import asyncio
+import logging
+import time
+import numpy as np
+from utils.instrumentation import metrics
+
+
+class TokenBucket:
+    """
+    Async token-bucket rate limiter
+
+    Tokens refill continuously at rate per second up to capacity; acquire()
+    only waits when the bucket is empty, so bursts within the exchange limit
+    go out immediately instead of behind a fixed sleep.
+    """
+    def __init__(self, rate, capacity=1):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    def for_exchange(cls, exchange, capacity=10):
+        """
+        Bucket matching a ccxt exchange's rateLimit (milliseconds between requests)
+        """
+        return cls(1000.0 / exchange.rateLimit if exchange.rateLimit else 1e9, capacity)
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, cost=1):
+        """
+        Wait until cost tokens are available and take them
+        """
+        async with self._lock:
+            self._refill()
+            while self.tokens < cost:
+                await asyncio.sleep((cost - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= cost
+
+
+class AccountState:
+    """
+    Cached balance and position, updated from order fills
+
+    balance is the quote-currency wallet balance (realized PnL net of fees);
+    position is signed base quantity with its average entry price.
+    """
+    def __init__(self, balance=0.0):
+        self.balance = float(balance)
+        self.position = 0.0
+        self.entry_price = 0.0
+
+    def apply_fill(self, side, filled, price, fee=0.0):
+        """
+        Update the cached state with one fill
+
+        Returns:
+            float: PnL realized by the fill net of its fee, None when it only opens or adds
+        """
+        signed = filled if side == 'buy' else -filled
+        realized = None
+        if self.position and np.sign(signed) != np.sign(self.position):
+            # Reducing (or flipping) the position realizes PnL on the closed part
+            closed = min(abs(signed), abs(self.position))
+            realized = float(closed * (price - self.entry_price) * np.sign(self.position))
+            self.balance += realized
+            realized -= fee
+        new_position = self.position + signed
+        if new_position and (not self.position or np.sign(new_position) != np.sign(self.position)):
+            self.entry_price = price
+        elif abs(new_position) > abs(self.position):
+            self.entry_price = (self.entry_price * abs(self.position) + price * filled) / abs(new_position)
+        self.position = new_position
+        self.balance -= fee
+        return realized
+
+    def equity(self, price):
+        """
+        Balance plus unrealized PnL at price
+        """
+        return self.balance + self.position * (price - self.entry_price)
+
+
+class ExecutionEngine:
+    """
+    Async order pipeline over one shared ccxt async_support session
+
+    submit() schedules the order as a task and returns immediately; orders
+    are sized from the cached AccountState, so no balance or ticker read
+    sits on the order path. Requests go through a TokenBucket, fills update
+    the cached state, and end-to-end latency (decision to exchange
+    acknowledgement) is recorded per order. on_fill(side, filled, price,
+    fee, pnl) is called after each fill is applied, pnl being the realized
+    PnL from AccountState.apply_fill.
+    """
+    def __init__(self, exchange, symbol='BTC/USDT', rate_limiter=None, on_fill=None):
+        self.exchange = exchange
+        self.symbol = symbol
+        self.rate_limiter = rate_limiter or TokenBucket.for_exchange(exchange)
+        self.on_fill = on_fill
+        self.state = AccountState()
+        self.latencies = []
+        self.failed_orders = 0
+        self._pending = set()
+        self.logger = logging.getLogger(__name__)
+
+    async def sync(self, currency='USDT'):
+        """
+        Reconcile the cached balance with the exchange (off the order path)
+        """
+        await self.rate_limiter.acquire()
+        balance = await self.exchange.fetch_balance()
+        self.state.balance = float(balance[currency]['total'])
+        return self.state.balance
+
+    def submit(self, side, amount, decided_at=None, price=None):
+        """
+        Schedule a market order without waiting for it
+
+        Args:
+            side (str): 'buy' or 'sell'
+            amount (float): Base-currency quantity
+            decided_at (float): perf_counter time the decision's input arrived
+                (e.g. BarClose.closed_at); defaults to now
+            price (float): Price the decision was made at, used as the fill
+                price when the exchange reports none
+
+        Returns:
+            asyncio.Task: Resolves to the exchange's order, or None on failure
+        """
+        if decided_at is None:
+            decided_at = time.perf_counter()
+        task = asyncio.get_running_loop().create_task(self._send(side, amount, decided_at, price))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+        return task
+
+    async def _send(self, side, amount, decided_at, decision_price=None):
+        try:
+            await self.rate_limiter.acquire()
+            order = await self.exchange.create_order(self.symbol, 'market', side, amount)
+        except Exception as e:
+            self.failed_orders += 1
+            metrics.count('orders.failed')
+            self.logger.error(f"Order {side} {amount} failed: {e}")
+            return None
+
+        latency = time.perf_counter() - decided_at
+        self.latencies.append(latency)
+        metrics.observe('orders.round_trip', latency)
+        metrics.count('orders.filled')
+        filled = order.get('filled') or 0.0
+        if filled:
+            fee = (order.get('fee') or {}).get('cost') or 0.0
+            price = self.fill_price(order, filled, decision_price)
+            if price is None:
+                self.logger.warning(f"{side.capitalize()} fill of {filled} has no price; cached state not updated")
+            else:
+                pnl = self.state.apply_fill(side, filled, price, fee)
+                if self.on_fill is not None:
+                    self.on_fill(side, filled, price, fee, pnl)
+        self.logger.info(f"{side.capitalize()} order executed: {order}")
+        return order
+
+    def fill_price(self, order, filled, decision_price=None):
+        """
+        Average fill price of an order
+
+        Many exchanges leave 'average' and 'price' empty on market orders;
+        'cost' / 'filled' is used next, then the price the order was decided at.
+        """
+        price = order.get('average') or order.get('price')
+        if price:
+            return price
+        if order.get('cost'):
+            return order['cost'] / filled
+        if decision_price is not None:
+            self.logger.warning(f"Order {order.get('id')} reports no fill price, using decision price {decision_price}")
+        return decision_price
+
+    async def drain(self):
+        """
+        Wait for all in-flight orders
+        """
+        if self._pending:
+            await asyncio.gather(*list(self._pending))
+
+    async def close(self):
+        await self.drain()
+        await self.exchange.close()
+
+    def latency_report(self):
+        """
+        End-to-end order latency percentiles in milliseconds
+        """
+        latencies = np.array(self.latencies) * 1000
+        if len(latencies) == 0:
+            return {'orders': 0, 'failed_orders': self.failed_orders}
+        return {
+            'orders': len(latencies),
+            'failed_orders': self.failed_orders,
+            'mean_ms': float(latencies.mean()),
+            'p50_ms': float(np.percentile(latencies, 50)),
+            'p99_ms': float(np.percentile(latencies, 99)),
+            'max_ms': float(latencies.max())
+        }
@@ -1,62 +1,174 @@
-import ccxt
 import logging
-import time
+from trading.execution import ExecutionEngine
+from trading.risk_management import RiskEngine
+from utils.instrumentation import metrics
+from utils.performance_metrics import StreamingMetrics, periods_per_year
 
 class BTCLiveTrader:
-    def __init__(self, config, rl_agent):
+    """
+    Live trading account for one symbol
+    
+    A universe is traded by one BTCLiveTrader per symbol sharing the
+    exchange session and rate limiter, each managing allocation of the
+    account balance.
+    """
+    # Model action -> order side
+    ACTION_SIDES = {1: 'buy', 2: 'sell'}
+    
+    def __init__(self, config, rl_agent, exchange=None, symbol=None, allocation=1.0, rate_limiter=None):
         self.config = config
         self.agent = rl_agent
+        self.allocation = allocation
+        
+        # Binance Testnet setup; one async session shared by every order
+        if exchange is None:
+            import ccxt.async_support
+            exchange = ccxt.async_support.binance({
+                'apiKey': config.BINANCE_API_KEY,
+                'secret': config.BINANCE_SECRET_KEY,
+                # Requests are paced by the engine's token bucket
+                'enableRateLimit': False,
+                'options': {
+                    'defaultType': 'future'
+                },
+                'urls': {
+                    'api': ccxt.async_support.binance().urls['test']  # Testnet URL
+                }
+            })
+        self.exchange = exchange
         
-        # Binance Testnet setup
-        self.exchange = ccxt.binance({
-            'apiKey': config.BINANCE_API_KEY,
-            'secret': config.BINANCE_SECRET_KEY,
-            'enableRateLimit': True,
-            'options': {
-                'defaultType': 'future'
-            },
-            'urls': {
-                'api': ccxt.binance().urls['test']  # Testnet URL
-            }
-        })
-        
-        self.symbol = 'BTC/USDT'
+        self.symbol = symbol or config.TRADING_PARAMS['symbol']
         self.logger = logging.getLogger(__name__)
+        
+        self.engine = ExecutionEngine(self.exchange, self.symbol, rate_limiter, on_fill=self._record_fill)
+        self.engine.state.balance = float(config.TRADING_PARAMS['initial_balance']) * allocation
+        
+        # Pre-trade checks read the same account state the fills update
+        self.risk = RiskEngine(config.TRADING_PARAMS, account=self.engine.state)
+        
+        # Running performance of the live account: equity once per bar, trades on every fill
+        self.metrics = StreamingMetrics(periods_per_year=periods_per_year(config.TRADING_PARAMS['timeframe']))
+        self.last_price = None
+    
+    async def start(self):
+        """
+        Load the account balance once before trading (this trader's allocation of it)
+        """
+        await self.engine.sync()
+        self.engine.state.balance *= self.allocation
+        self.risk.peak_equity = self.engine.state.balance
     
-    def execute_trade(self, action):
+    async def close(self, close_session=True):
         """
-        Execute trade on Binance Testnet
+        Wait for in-flight orders and close the exchange session
+        
+        Args:
+            close_session (bool): False leaves a session shared with other traders open
+        """
+        if close_session:
+            await self.engine.close()
+        else:
+            await self.engine.drain()
+        self.logger.info(f"Order latency: {self.engine.latency_report()}")
+    
+    def execute_trade(self, action, current_price, decided_at=None):
         """
+        Send a market order on Binance Testnet without waiting for the fill
+        
+        Orders are sized from the cached balance (updated from fills), so no
+        ticker or balance request precedes them, and then checked inline by
+        the RiskEngine, which may shrink or block them. An approved order
+        stays reserved in the RiskEngine until it fills or fails.
+        
+        Args:
+            action: Model action (0 hold, 1 buy, 2 sell) or 'buy' / 'sell'
+            current_price (float): Latest price from the market feed
+            decided_at (float): perf_counter time of the triggering bar close
+        
+        Returns:
+            asyncio.Task: The in-flight order, None when there is nothing to send
+        """
+        self.last_price = current_price
+        side = self.ACTION_SIDES.get(action, action)
+        if side not in ('buy', 'sell'):
+            return None
+        
+        # Trade amount (1% of account balance)
+        trade_amount = self.calculate_trade_size(self.engine.state.balance)
+        quantity = self.risk.check_order(side, trade_amount / current_price, current_price)
+        if quantity <= 0:
+            metrics.count('orders.risk_blocked')
+            self.logger.warning(f"{side.capitalize()} order blocked by risk engine: {self.risk.last_rejection}")
+            return None
+        self.risk.reserve(side, quantity)
+        task = self.engine.submit(side, quantity, decided_at, current_price)
+        task.add_done_callback(lambda _: self.risk.release(side, quantity))
+        return task
+    
+    def simulate_trade(self, side, amount, price=None):
+        """
+        Dry-run a market order on the local exchange simulator
+        
+        The order is filled by a SimulatedExchange holding this account's
+        cached balance and position, at price or the last price execute_trade
+        saw. Nothing is sent and the cached state is left unchanged.
+        
+        Args:
+            side (str): 'buy' or 'sell'
+            amount (float): Order size in quote currency, like calculate_trade_size
+            price (float): Market price to fill around
+        
+        Returns:
+            str: 'success', 'insufficient_balance' or 'market_closed' (no price known yet)
+        """
+        import ccxt
+        from trading.simulator import SimulatedExchange
+        
+        price = self.last_price if price is None else price
+        if price is None:
+            return 'market_closed'
+        
+        trading_params = self.config.TRADING_PARAMS
+        state = self.engine.state
+        exchange = SimulatedExchange(
+            [[0, price, price, price, price, 0.0]], self.symbol, balance=state.balance,
+            fee_rate=trading_params['trading_fee_rate'], leverage=trading_params['leverage']
+        )
+        account = exchange.accounts[self.symbol]
+        account.position, account.entry_price = state.position, state.entry_price
         try:
-            # Get current market price
-            ticker = self.exchange.fetch_ticker(self.symbol)
-            current_price = ticker['last']
-            
-            # Trade amount (1% of account balance)
-            balance = self.exchange.fetch_balance()
-            trade_amount = balance['USDT']['total'] * 0.01
-            
-            if action == 'buy':
-                order = self.exchange.create_market_buy_order(
-                    self.symbol, 
-                    trade_amount / current_price
-                )
-                self.logger.info(f"Buy order executed: {order}")
-            
-            elif action == 'sell':
-                order = self.exchange.create_market_sell_order(
-                    self.symbol, 
-                    trade_amount / current_price
-                )
-                self.logger.info(f"Sell order executed: {order}")
-            
-            time.sleep(5)  # Prevent rate limiting
-        
-        except Exception as e:
-            self.logger.error(f"Trade execution error: {e}")
+            exchange.execute(self.symbol, side, amount / price)
+        except ccxt.InsufficientFunds:
+            return 'insufficient_balance'
+        except ccxt.ExchangeNotAvailable:
+            return 'market_closed'
+        return 'success'
     
     def calculate_trade_size(self, total_balance, risk_percentage=0.01):
         """
         Calculate appropriate trade size based on risk
         """
         return total_balance * risk_percentage
+    
+    def _record_fill(self, side, filled, price, fee, pnl):
+        """
+        Count a fill's notional, and its PnL when it closes a position, in the live metrics
+        """
+        self.metrics.record_trade(filled * price, pnl)
+    
+    def equity(self, price):
+        """
+        Account equity marked at price, from the cached state
+        """
+        return self.engine.state.equity(price)
+    
+    def portfolio_fields(self):
+        """
+        Portfolio part of the observation, same layout and rules as TradingEnvironment
+
+        As in training and the backtester, the balance field is 0 while a
+        position is held and the holding is a long-only quantity.
+        """
+        state = self.engine.state
+        initial_balance = self.config.TRADING_PARAMS['initial_balance'] * self.allocation
+        return [0.0 if state.position else state.balance / initial_balance, max(state.position, 0.0), 0.0]
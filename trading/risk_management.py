@@ -0,0 +1,165 @@
+import logging
+import numpy as np
+from trading.execution import AccountState
+
+
+class RiskEngine:
+    """
+    Pre-trade risk checks over incrementally maintained account state
+
+    Limits are read from TRADING_PARAMS; a missing key disables its limit:
+        leverage: Maximum gross exposure as a multiple of equity
+        max_trade_amount: Maximum notional of a single order (quote currency)
+        max_drawdown: Drawdown from peak equity (fraction) beyond which new
+            exposure is refused
+        risk_per_trade, atr_stop_multiple: Volatility sizing; a stop
+            atr_stop_multiple * ATR away may lose at most risk_per_trade of equity
+
+    Exposure, margin, equity, peak and drawdown are updated in O(1) from fills
+    and market updates, so check_order can sit inline on the order path.
+    Orders that only reduce the position are never blocked. Orders sent but
+    not yet filled are reserved (reserve / release) and checked as if they
+    had filled on their side, so back-to-back orders cannot overshoot the
+    limits before their fills land.
+    """
+    def __init__(self, trading_params, initial_equity=None, account=None):
+        self.max_leverage = trading_params.get('leverage')
+        self.max_trade_amount = trading_params.get('max_trade_amount')
+        self.max_drawdown = trading_params.get('max_drawdown')
+        self.risk_per_trade = trading_params.get('risk_per_trade')
+        self.atr_stop_multiple = trading_params.get('atr_stop_multiple', 1.0)
+        self.logger = logging.getLogger(__name__)
+        if account is None:
+            account = AccountState(trading_params['initial_balance'] if initial_equity is None else initial_equity)
+        # Shared with the ExecutionEngine in live trading, so fills land here directly
+        self.account = account
+        self.price = 0.0
+        self.atr = np.nan
+        self.peak_equity = account.balance
+        # Base quantity of approved orders still in flight, per side
+        self.pending_buy = 0.0
+        self.pending_sell = 0.0
+        self.rejections = 0
+        self.last_rejection = None
+
+    @property
+    def position(self):
+        return self.account.position
+
+    @property
+    def equity(self):
+        return self.account.equity(self.price)
+
+    @property
+    def exposure(self):
+        return abs(self.position) * self.price
+
+    @property
+    def margin_used(self):
+        return self.exposure / self.max_leverage if self.max_leverage else self.exposure
+
+    @property
+    def drawdown(self):
+        if self.peak_equity <= 0:
+            return 0.0
+        return max(1.0 - self.equity / self.peak_equity, 0.0)
+
+    def update_market(self, price, atr=None):
+        """
+        Mark the position at price and take the latest ATR
+        """
+        self.price = float(price)
+        if atr is not None and atr == atr:
+            self.atr = float(atr)
+        equity = self.equity
+        if equity > self.peak_equity:
+            self.peak_equity = equity
+
+    def mark_peak(self, equity):
+        """
+        Record an equity high reached between updates (e.g. inside a backtest segment)
+        """
+        if equity > self.peak_equity:
+            self.peak_equity = float(equity)
+
+    def on_fill(self, side, quantity, price, fee=0.0):
+        """
+        Apply an executed fill to the account (not needed when the account is
+        shared with an ExecutionEngine, which applies fills itself)
+        """
+        self.account.apply_fill(side, quantity, price, fee)
+        self.update_market(price)
+
+    def reserve(self, side, quantity):
+        """
+        Count an approved order as in flight until release()
+        """
+        if side == 'buy':
+            self.pending_buy += quantity
+        else:
+            self.pending_sell += quantity
+
+    def release(self, side, quantity):
+        """
+        Drop a reserved order once it filled (the fill is in the account) or failed
+        """
+        if side == 'buy':
+            self.pending_buy = max(self.pending_buy - quantity, 0.0)
+        else:
+            self.pending_sell = max(self.pending_sell - quantity, 0.0)
+
+    def check_order(self, side, quantity, price=None):
+        """
+        Approve, shrink or reject an order
+
+        Args:
+            side (str): 'buy' or 'sell'
+            quantity (float): Requested base quantity
+            price (float): Expected fill price, the last marked price by default
+
+        Returns:
+            float: Approved quantity (0.0 when rejected; see last_rejection)
+        """
+        self.last_rejection = None
+        if price is not None:
+            self.update_market(price)
+        price = self.price
+        signed = quantity if side == 'buy' else -quantity
+        # Position once the in-flight orders on this side have filled
+        position = self.position + self.pending_buy if side == 'buy' else self.position - self.pending_sell
+
+        # Reducing orders are always allowed, up to flat
+        if position and (signed > 0) != (position > 0):
+            if quantity <= abs(position):
+                return quantity
+            reducing = abs(position)
+        else:
+            reducing = 0.0
+        opening = quantity - reducing
+
+        equity = self.equity
+        if equity <= 0 or price <= 0:
+            return self._reject('no_equity', reducing)
+        if self.max_drawdown is not None and self.drawdown > self.max_drawdown:
+            return self._reject('max_drawdown', reducing)
+
+        limit = opening
+        held = abs(position) - reducing
+        if self.max_leverage:
+            limit = min(limit, (equity * self.max_leverage - held * price) / price)
+        if self.max_trade_amount:
+            limit = min(limit, self.max_trade_amount / price)
+        if self.risk_per_trade and self.atr == self.atr and self.atr > 0:
+            limit = min(limit, equity * self.risk_per_trade / (self.atr_stop_multiple * self.atr) - held)
+
+        if limit <= 0:
+            return self._reject('exposure_limit', reducing)
+        if limit < opening:
+            self.last_rejection = 'resized'
+        return reducing + limit
+
+    def _reject(self, reason, approved=0.0):
+        self.rejections += 1
+        self.last_rejection = reason
+        self.logger.debug(f"Order blocked: {reason}")
+        return approved
@@ -0,0 +1,258 @@
+import asyncio
+import itertools
+import ccxt
+import numpy as np
+from trading.execution import AccountState
+
+
+class SyntheticOrderBook:
+    """
+    Static L2 book around a mid price
+
+    Each side has levels price levels, the first half_spread_bps from mid
+    and each next one level_bps further out; level i holds depth * (i + 1)
+    base quantity, so the book thickens away from the touch. Market orders
+    sweep the levels, which is where slippage comes from.
+    """
+    def __init__(self, half_spread_bps=0.5, level_bps=0.5, levels=50, depth=0.5):
+        self.half_spread_bps = half_spread_bps
+        self.offsets = (half_spread_bps + level_bps * np.arange(levels)) / 1e4
+        self.sizes = depth * np.arange(1, levels + 1, dtype=np.float64)
+        self.cumulative = np.cumsum(self.sizes)
+
+    def quote(self, mid):
+        """
+        Best bid and ask around mid
+        """
+        return mid * (1 - self.half_spread_bps / 1e4), mid * (1 + self.half_spread_bps / 1e4)
+
+    def sweep(self, side, quantity, mid):
+        """
+        Fill a market order level by level
+
+        Returns:
+            tuple: (filled quantity, average fill price); filled is capped at the book's depth
+        """
+        filled = min(quantity, self.cumulative[-1])
+        if filled <= 0:
+            return 0.0, mid
+        prices = mid * (1 + self.offsets) if side == 'buy' else mid * (1 - self.offsets)
+        last = int(np.searchsorted(self.cumulative, filled))
+        full = self.cumulative[last - 1] if last else 0.0
+        cost = self.sizes[:last] @ prices[:last] + (filled - full) * prices[last]
+        return float(filled), float(cost / filled)
+
+
+class SimulatedExchange:
+    """
+    Offline stand-in for the ccxt async_support / ccxt.pro client of the live path
+
+    Replays stored (or generated) candles per symbol: the candle at the
+    replay cursor is the one in progress, priced at its open, and each
+    watch_ohlcv call closes it and opens the next, in the list form
+    CCXTStreamSource expects. Market orders fill against a
+    SyntheticOrderBook around that price, pay fee_rate on the notional and
+    are margined futures-style (one USDT wallet, a signed position per
+    symbol, exposure up to leverage times equity).
+
+    Every request waits a sampled network latency (median latency seconds,
+    lognormal latency_jitter); fills use the price at the time the order
+    arrives. Orders raise ccxt.InsufficientFunds when margin is short and
+    ccxt.ExchangeNotAvailable when the symbol has no candle to trade at
+    (market closed).
+
+    Args:
+        candles: (n, 6) candles for symbol, or a dict symbol -> candles
+        start (int): Candles before this row are history (see history()); the
+            replay starts with this row in progress
+        bar_interval (float): Seconds watch_ohlcv waits per bar; at 0 the
+            replay runs as fast as the event loop allows and bars queue up
+            when the consumer is slower
+    """
+    # No client-side pacing (TokenBucket.for_exchange treats 0 as unlimited)
+    rateLimit = 0
+
+    def __init__(self, candles, symbol='BTC/USDT', balance=10000.0, fee_rate=0.0004, leverage=1,
+                 book=None, latency=0.0, latency_jitter=0.0, start=0, bar_interval=0.0, seed=0):
+        if not isinstance(candles, dict):
+            candles = {symbol: candles}
+        self.candles = {name: np.asarray(ohlcv, dtype=np.float64) for name, ohlcv in candles.items()}
+        self.initial_balance = float(balance)
+        self.fee_rate = fee_rate
+        self.leverage = leverage
+        self.book = book or SyntheticOrderBook()
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.bar_interval = bar_interval
+        self.rng = np.random.default_rng(seed)
+        self.cursor = {name: start for name in self.candles}
+        self.accounts = {name: AccountState() for name in self.candles}
+        self._order_ids = itertools.count(1)
+        self._watching = set()
+        self.fills = {'orders': 0, 'notional': 0.0, 'fees': 0.0, 'slippage': 0.0}
+
+    def _candles(self, symbol):
+        candles = self.candles.get(symbol)
+        if candles is None:
+            raise ccxt.BadSymbol(f"SimulatedExchange does not list {symbol}")
+        return candles
+
+    def is_open(self, symbol):
+        candles = self._candles(symbol)
+        return self.cursor[symbol] < len(candles)
+
+    def price(self, symbol):
+        """
+        Current mid price: the open of the candle in progress
+        """
+        if not self.is_open(symbol):
+            raise ccxt.ExchangeNotAvailable(f"Market closed: no {symbol} candle to trade at")
+        return float(self.candles[symbol][self.cursor[symbol], 1])
+
+    def history(self, symbol):
+        """
+        Closed candles before the replay cursor, for MarketDataFeed.warm_up
+        """
+        return self._candles(symbol)[:self.cursor[symbol]]
+
+    def equity(self):
+        """
+        Wallet balance plus unrealized PnL of every open market
+        """
+        equity = self.wallet_balance()
+        for symbol, account in self.accounts.items():
+            if account.position and self.is_open(symbol):
+                equity += account.position * (self.price(symbol) - account.entry_price)
+        return equity
+
+    def wallet_balance(self):
+        return self.initial_balance + sum(account.balance for account in self.accounts.values())
+
+    def margin_used(self):
+        return sum(abs(account.position) * account.entry_price for account in self.accounts.values()) / self.leverage
+
+    def execute(self, symbol, side, amount):
+        """
+        Fill a market order now, without latency
+
+        Returns:
+            dict: ccxt-style order
+        """
+        if side not in ('buy', 'sell'):
+            raise ccxt.InvalidOrder(f"Unknown order side {side}")
+        mid = self.price(symbol)
+        account = self.accounts[symbol]
+        filled, average = self.book.sweep(side, float(amount), mid)
+        notional = filled * average
+        fee = notional * self.fee_rate
+
+        signed = filled if side == 'buy' else -filled
+        exposure = abs(account.position + signed)
+        if exposure > abs(account.position):
+            # Only orders that add exposure need margin
+            other_margin = self.margin_used() - abs(account.position) * account.entry_price / self.leverage
+            if other_margin + exposure * average / self.leverage + fee > self.equity():
+                raise ccxt.InsufficientFunds(
+                    f"Insufficient margin for {side} {amount} {symbol} (equity {self.equity():.2f})"
+                )
+
+        account.apply_fill(side, filled, average, fee)
+        self.fills['orders'] += 1
+        self.fills['notional'] += notional
+        self.fills['fees'] += fee
+        self.fills['slippage'] += abs(average - mid) * filled
+        return {
+            'id': str(next(self._order_ids)),
+            'symbol': symbol,
+            'timestamp': int(self.candles[symbol][self.cursor[symbol], 0]),
+            'type': 'market',
+            'side': side,
+            'amount': float(amount),
+            'filled': filled,
+            'remaining': float(amount) - filled,
+            'price': average,
+            'average': average,
+            'cost': notional,
+            'status': 'closed',
+            'fee': {'cost': fee, 'currency': 'USDT', 'rate': self.fee_rate}
+        }
+
+    def cost_report(self):
+        """
+        Fees and slippage paid so far, absolute and in basis points of traded notional
+        """
+        notional = self.fills['notional']
+        return dict(
+            self.fills,
+            fee_bps=self.fills['fees'] / notional * 1e4 if notional else 0.0,
+            slippage_bps=self.fills['slippage'] / notional * 1e4 if notional else 0.0
+        )
+
+    async def _network(self):
+        if self.latency > 0:
+            await asyncio.sleep(self.latency * np.exp(self.latency_jitter * self.rng.standard_normal()))
+
+    async def fetch_ticker(self, symbol):
+        await self._network()
+        mid = self.price(symbol)
+        bid, ask = self.book.quote(mid)
+        return {
+            'symbol': symbol,
+            'timestamp': int(self.candles[symbol][self.cursor[symbol], 0]),
+            'last': mid,
+            'close': mid,
+            'bid': bid,
+            'ask': ask
+        }
+
+    async def fetch_balance(self):
+        await self._network()
+        total = self.wallet_balance()
+        used = self.margin_used()
+        free = self.equity() - used
+        return {
+            'USDT': {'free': free, 'used': used, 'total': total},
+            'free': {'USDT': free},
+            'used': {'USDT': used},
+            'total': {'USDT': total}
+        }
+
+    async def create_order(self, symbol, type, side, amount, price=None, params=None):
+        if type != 'market':
+            raise ccxt.InvalidOrder("SimulatedExchange only fills market orders")
+        await self._network()
+        return self.execute(symbol, side, amount)
+
+    async def create_market_buy_order(self, symbol, amount, params=None):
+        return await self.create_order(symbol, 'market', 'buy', amount)
+
+    async def create_market_sell_order(self, symbol, amount, params=None):
+        return await self.create_order(symbol, 'market', 'sell', amount)
+
+    async def watch_ohlcv(self, symbol, timeframe='1m', since=None, limit=None, params=None):
+        """
+        Close the candle in progress and open the next one
+
+        Returns the closed candle in full and the new one as a first,
+        open-only update. Raises ccxt.ExchangeNotAvailable when the replay
+        has no next candle, which ends a CCXTStreamSource; the last candle
+        stays in progress, so orders still fill at its open.
+        """
+        candles = self._candles(symbol)
+        cursor = self.cursor[symbol]
+        if symbol in self._watching and cursor < len(candles) - 1:
+            # Even at 0 this yields, so consumers and in-flight orders run between bars
+            await asyncio.sleep(self.bar_interval)
+            cursor = self.cursor[symbol] = cursor + 1
+        elif symbol in self._watching or cursor >= len(candles):
+            raise ccxt.ExchangeNotAvailable(f"{symbol} replay finished")
+        self._watching.add(symbol)
+
+        timestamp, open_ = candles[cursor, :2]
+        update = [[timestamp, open_, open_, open_, open_, 0.0]]
+        if cursor > 0:
+            update.insert(0, candles[cursor - 1].tolist())
+        return update
+
+    async def close(self):
+        pass
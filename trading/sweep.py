@@ -0,0 +1,173 @@
+import itertools
+import logging
+import multiprocessing as mp
+import time
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from data.dataset import TradingDataset
+from utils.shared_array import SharedArray
+
+logger = logging.getLogger(__name__)
+
+# Per-process state set up by _init_worker
+_worker = {}
+
+
+def walk_forward_windows(index, window='90D', step='30D'):
+    """
+    Row ranges of successive test windows over a DatetimeIndex
+
+    Args:
+        index: Bar timestamps, sorted (pd.DatetimeIndex or datetime64 array, e.g. TradingDataset.index)
+        window (str): Length of each test window (pandas offset)
+        step (str): Offset between window starts
+
+    Returns:
+        list: (start_row, end_row, label) tuples
+    """
+    windows = []
+    index = pd.DatetimeIndex(index)
+    window, step = pd.Timedelta(window), pd.Timedelta(step)
+    start = index[0]
+    while start + window <= index[-1] + pd.Timedelta(1, 'ns'):
+        lo, hi = index.searchsorted([start, start + window])
+        windows.append((int(lo), int(hi), f"{start:%Y-%m-%d}"))
+        start += step
+    return windows
+
+
+def load_trained_agent(config, model_path):
+    """
+    Default agent factory: a BTCRLTrader with a saved policy loaded (NumPy inference, no torch)
+    """
+    from models.rl_agent import BTCRLTrader
+
+    agent = BTCRLTrader(config)
+    agent.load_policy(model_path)
+    return agent
+
+
+def _init_worker(features, prices, columns, symbols, config, agent_factory, threads_per_worker):
+    """
+    Map the shared dataset once per worker process
+    """
+    if threads_per_worker:
+        try:
+            import torch
+            torch.set_num_threads(threads_per_worker)
+        except ImportError:
+            pass
+    _worker.update({
+        'dataset': TradingDataset(features.array, columns, prices.array, symbols=symbols),
+        'config': config,
+        'agent_factory': agent_factory,
+        'agents': {}
+    })
+
+
+def _run_job(job):
+    """
+    Run one backtest job inside a worker
+    """
+    from trading.backtester import BTCBacktester
+
+    agents = _worker['agents']
+    if job['model'] not in agents:
+        agents[job['model']] = _worker['agent_factory'](_worker['config'], job['model'])
+
+    trading_params = dict(_worker['config'].TRADING_PARAMS, **job['params'])
+    start, end = job['start'], job['end']
+
+    started = time.perf_counter()
+    results = BTCBacktester(agents[job['model']], trading_params).run_comprehensive_backtest(
+        data=_worker['dataset'].slice(start, end)
+    )
+    return {
+        'model': job['model'],
+        'window': job['window'],
+        'start_row': start,
+        'end_row': end,
+        **job['params'],
+        'final_balance': results['final_balance'],
+        'total_return_percentage': results['total_return_percentage'],
+        'max_drawdown': results['max_drawdown'],
+        'total_trades': results['total_trades'],
+        'winning_trades': results['winning_trades'],
+        'elapsed_sec': time.perf_counter() - started
+    }
+
+
+class BacktestSweep:
+    """
+    Run many backtests (models x windows x trading parameters) on a process pool
+
+    data is a TradingDataset (a DataFrame is converted with
+    TradingDataset.from_frame, dropping the indicator warm-up rows), so
+    windows are row ranges of the cleaned data, e.g. walk_forward_windows
+    over its index. Its feature matrix and prices are written once to
+    SharedArrays; workers map them read-only and slice their windows without
+    copying; low and atr come from the feature columns as in any backtest.
+    Each worker keeps the models it has loaded, and torch is limited to
+    threads_per_worker threads so processes do not oversubscribe cores.
+    """
+    def __init__(self, config, data, n_workers=None, agent_factory=load_trained_agent,
+                 threads_per_worker=1, start_method=None):
+        self.config = config
+        self.data = data if isinstance(data, TradingDataset) else TradingDataset.from_frame(data)
+        self.n_workers = n_workers or mp.cpu_count()
+        self.agent_factory = agent_factory
+        self.threads_per_worker = threads_per_worker
+        if start_method is None:
+            start_method = 'forkserver' if 'forkserver' in mp.get_all_start_methods() else 'spawn'
+        self.start_method = start_method
+
+    def make_jobs(self, models, windows=None, param_grid=None):
+        """
+        Expand models x windows x parameter combinations into job dicts
+
+        Args:
+            models (list): Model identifiers passed to agent_factory (saved model paths by default)
+            windows (list): (start_row, end_row, label) tuples, the full data by default
+            param_grid (dict): TRADING_PARAMS key -> list of values to sweep
+        """
+        if windows is None:
+            windows = [(0, len(self.data), 'full')]
+        param_grid = param_grid or {}
+        keys = sorted(param_grid)
+        combinations = [dict(zip(keys, values)) for values in itertools.product(*(param_grid[k] for k in keys))]
+
+        return [
+            {'model': model, 'start': start, 'end': end, 'window': label, 'params': params}
+            for model in models
+            for start, end, label in windows
+            for params in combinations
+        ]
+
+    def run(self, jobs):
+        """
+        Run jobs in parallel and collect one summary row per job
+
+        Returns:
+            pd.DataFrame: Summary table in job order
+        """
+        shared = [SharedArray(self.data.features), SharedArray(self.data.prices, dtype=np.float64)]
+        rows = [None] * len(jobs)
+        started = time.perf_counter()
+        try:
+            with ProcessPoolExecutor(
+                max_workers=min(self.n_workers, len(jobs)) or 1,
+                mp_context=mp.get_context(self.start_method),
+                initializer=_init_worker,
+                initargs=(*shared, self.data.columns, self.data.symbols, self.config, self.agent_factory,
+                          self.threads_per_worker)
+            ) as pool:
+                futures = {pool.submit(_run_job, job): i for i, job in enumerate(jobs)}
+                for future in as_completed(futures):
+                    rows[futures[future]] = future.result()
+        finally:
+            for array in shared:
+                array.unlink()
+
+        logger.info(f"Ran {len(jobs)} backtests on {self.n_workers} workers in {time.perf_counter() - started:.1f}s")
+        return pd.DataFrame(rows)
@@ -0,0 +1,111 @@
+# utils/feature_cache.py
+import hashlib
+import json
+import logging
+import os
+import numpy as np
+
+
+class FeatureCache:
+    """
+    Content-addressed on-disk cache of float32 feature matrices
+
+    Entries are keyed by a hash of the input candles plus the indicator
+    config, stored as <key>.npy (read back memory-mapped) with a <key>.json
+    column list, and evicted least-recently-used once the cache grows past
+    max_bytes.
+    """
+    def __init__(self, root='feature_cache', max_bytes=4 * 1024 ** 3):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.logger = logging.getLogger(__name__)
+
+    @staticmethod
+    def key(arrays, config):
+        """
+        Hash candle arrays and an indicator config into a cache key
+        """
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(json.dumps(config, sort_keys=True).encode())
+        for array in arrays:
+            array = np.ascontiguousarray(array, dtype=np.float64)
+            digest.update(str(array.shape).encode())
+            digest.update(array.data)
+        return digest.hexdigest()
+
+    def get(self, key):
+        """
+        Look up an entry
+
+        Returns:
+            tuple: (memory-mapped matrix, column names), or None on a miss
+        """
+        matrix_path, columns_path = self._paths(key)
+        if not (os.path.exists(matrix_path) and os.path.exists(columns_path)):
+            return None
+        with open(columns_path, 'r') as f:
+            columns = json.load(f)
+        # Touch the entry so eviction sees it as recently used
+        os.utime(matrix_path)
+        return np.load(matrix_path, mmap_mode='r'), columns
+
+    def put(self, key, matrix, columns):
+        """
+        Store a feature matrix and evict old entries above max_bytes
+        """
+        os.makedirs(self.root, exist_ok=True)
+        matrix_path, columns_path = self._paths(key)
+        for path, write in (
+            (matrix_path, lambda f: np.save(f, np.ascontiguousarray(matrix, dtype=np.float32))),
+            (columns_path, lambda f: f.write(json.dumps(list(columns)).encode())),
+        ):
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                write(f)
+            os.replace(tmp_path, path)
+        self._evict(keep=key)
+
+    def get_or_compute(self, arrays, config, compute_fn):
+        """
+        Return the cached matrix for (arrays, config), computing and storing it on a miss
+
+        Args:
+            arrays (list): Input candle arrays the features are derived from
+            config (dict): Indicator settings
+            compute_fn (callable): Returns (float32 matrix, column names)
+        """
+        key = self.key(arrays, config)
+        cached = self.get(key)
+        if cached is not None:
+            self.logger.debug(f"Feature cache hit {key}")
+            return cached
+        matrix, columns = compute_fn()
+        self.put(key, matrix, columns)
+        return self.get(key)
+
+    def _paths(self, key):
+        base = os.path.join(self.root, key)
+        return base + '.npy', base + '.json'
+
+    def _evict(self, keep=None):
+        """
+        Delete least-recently-used entries until the cache fits in max_bytes
+        """
+        entries = []
+        for name in os.listdir(self.root):
+            if name.endswith('.npy'):
+                path = os.path.join(self.root, name)
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, stat.st_size, name[:-len('.npy')]))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, key in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            for path in self._paths(key):
+                if os.path.exists(path):
+                    os.remove(path)
+            total -= size
+            self.logger.info(f"Evicted feature cache entry {key}")
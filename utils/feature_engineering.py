@@ -1,34 +1,15 @@
-import numpy as np
-import pandas as pd
-import ta
+from utils.indicators import IndicatorEngine
 
 class FeatureEngineer:
     @staticmethod
-    def add_technical_indicators(df):
+    def add_technical_indicators(df, config=None, cache=None):
         """
         Add multiple technical indicators to DataFrame
+
+        Moving averages, RSI, MACD, Bollinger Bands and ATR are computed by
+        IndicatorEngine (reusing a FeatureCache entry if one is given);
+        warm-up rows are dropped.
         """
-        # Moving Averages
-        df['MA_10'] = df['close'].rolling(window=10).mean()
-        df['MA_50'] = df['close'].rolling(window=50).mean()
-        
-        # RSI
-        df['RSI'] = ta.momentum.RSIIndicator(df['close']).rsi()
-        
-        # MACD
-        macd = ta.trend.MACD(df['close'])
-        df['MACD'] = macd.macd()
-        df['MACD_Signal'] = macd.macd_signal()
-        
-        # Bollinger Bands
-        bollinger = ta.volatility.BollingerBands(df['close'])
-        df['BB_High'] = bollinger.bollinger_hband()
-        df['BB_Low'] = bollinger.bollinger_lband()
-        
-        # ATR for volatility
-        df['ATR'] = ta.volatility.AverageTrueRange(
-            df['high'], df['low'], df['close']
-        ).average_true_range()
-        
+        IndicatorEngine(config, cache=cache).add_indicators(df)
         return df.dropna()
 
@@ -0,0 +1,354 @@
+# utils/indicators.py
+import numpy as np
+from collections import deque
+from numpy.lib.stride_tricks import sliding_window_view
+from utils.instrumentation import metrics
+
+DEFAULT_INDICATOR_CONFIG = {
+    'ma_windows': [10, 50],
+    'rsi_window': 14,
+    'macd_fast': 12,
+    'macd_slow': 26,
+    'macd_signal': 9,
+    'bb_window': 20,
+    'bb_dev': 2,
+    'atr_window': 14
+}
+
+# Largest decay**-k factor allowed inside one EMA block (keeps float64 error ~1e-6 relative)
+_MAX_BLOCK_GROWTH = 1e10
+_MAX_BLOCK_SIZE = 4096
+
+
+def _ema_recursive(values, alpha, previous):
+    """
+    Evaluate y[t] = (1 - alpha) * y[t-1] + alpha * x[t] for all t, given y[-1] = previous
+
+    The series is cut into blocks small enough for the closed form
+    y[k] = decay**(k+1) * y_prev + alpha * decay**k * cumsum(x * decay**-k)
+    to stay accurate. Blocks are solved as one 2-D array operation and only the
+    block boundary values are carried over in a scalar loop.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    if n == 0:
+        return np.empty(0)
+    decay = 1.0 - alpha
+    if decay <= 0:
+        return values.copy()
+
+    block = int(np.clip(np.log(_MAX_BLOCK_GROWTH) / -np.log(decay), 1, _MAX_BLOCK_SIZE))
+    n_blocks = -(-n // block)
+    padded = np.zeros(n_blocks * block)
+    padded[:n] = values
+    padded = padded.reshape(n_blocks, block)
+
+    k = np.arange(block)
+    local = alpha * np.cumsum(padded * decay ** -k, axis=1) * decay ** k
+    carry = decay ** (k + 1)
+
+    block_start = np.empty(n_blocks)
+    block_decay = carry[-1]
+    block_end = local[:, -1]
+    for b in range(n_blocks):
+        block_start[b] = previous
+        previous = block_decay * previous + block_end[b]
+
+    return (local + block_start[:, None] * carry).ravel()[:n]
+
+
+def ema(values, alpha, min_periods=1):
+    """
+    Exponential moving average with pandas ewm(adjust=False) semantics
+
+    Leading NaNs are skipped; the average starts at the first valid value.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(len(values), np.nan)
+    valid = np.flatnonzero(~np.isnan(values))
+    if len(valid) == 0:
+        return out
+    first = valid[0]
+    out[first] = values[first]
+    out[first + 1:] = _ema_recursive(values[first + 1:], alpha, values[first])
+    out[first:first + min_periods - 1] = np.nan
+    return out
+
+
+def rolling_mean(values, window):
+    """
+    Trailing simple moving average, NaN for the first window - 1 rows
+    """
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(len(values), np.nan)
+    if len(values) >= window:
+        cumsum = np.cumsum(np.concatenate([[0.0], values]))
+        out[window - 1:] = (cumsum[window:] - cumsum[:-window]) / window
+    return out
+
+
+def rolling_std(values, window):
+    """
+    Trailing population standard deviation (ddof=0), NaN for the first window - 1 rows
+    """
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(len(values), np.nan)
+    if len(values) >= window:
+        out[window - 1:] = sliding_window_view(values, window).std(axis=1)
+    return out
+
+
+def wilder_rsi(close, window=14):
+    """
+    Relative Strength Index with Wilder smoothing
+    """
+    diff = np.diff(np.asarray(close, dtype=np.float64), prepend=np.nan)
+    diff[0] = 0.0
+    up = ema(np.maximum(diff, 0.0), 1.0 / window, min_periods=window)
+    down = ema(np.maximum(-diff, 0.0), 1.0 / window, min_periods=window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = np.where(down == 0, 100.0, 100.0 - 100.0 / (1.0 + up / down))
+    rsi[np.isnan(up)] = np.nan
+    return rsi
+
+
+def true_range(high, low, close):
+    """
+    True range; the first row has no previous close and falls back to high - low
+    """
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    prev_close = np.concatenate([[np.nan], np.asarray(close, dtype=np.float64)[:-1]])
+    return np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+
+
+def average_true_range(high, low, close, window=14):
+    """
+    Wilder ATR seeded with the mean of the first window true ranges
+    """
+    tr = true_range(high, low, close)
+    out = np.full(len(tr), np.nan)
+    if len(tr) >= window:
+        seed = tr[:window].mean()
+        out[window - 1] = seed
+        out[window:] = _ema_recursive(tr[window:], 1.0 / window, seed)
+    return out
+
+
+class IndicatorEngine:
+    """
+    Technical indicator engine with a vectorized batch mode and an O(1) streaming mode
+
+    Both modes produce the same columns (see `columns`) and agree with the
+    `ta` library definitions: Wilder RSI, MACD on adjust=False EMAs, ddof=0
+    Bollinger bands and Wilder ATR. Warm-up rows are NaN.
+
+    With a FeatureCache, batch results are reused whenever the same candles
+    are seen again with the same config.
+    """
+    def __init__(self, config=None, cache=None):
+        self.config = dict(DEFAULT_INDICATOR_CONFIG, **(config or {}))
+        self.cache = cache
+
+    @property
+    def columns(self):
+        return [f'ma_{window}' for window in self.config['ma_windows']] + [
+            'rsi', 'macd', 'macd_signal', 'bb_high', 'bb_low', 'atr'
+        ]
+
+    def compute(self, high, low, close):
+        """
+        Compute every indicator over the full history
+
+        Returns:
+            dict: column name -> np.ndarray aligned with the inputs
+        """
+        cfg = self.config
+        close = np.asarray(close, dtype=np.float64)
+        result = {}
+
+        for window in cfg['ma_windows']:
+            result[f'ma_{window}'] = rolling_mean(close, window)
+
+        result['rsi'] = wilder_rsi(close, cfg['rsi_window'])
+
+        ema_fast = ema(close, 2.0 / (cfg['macd_fast'] + 1))
+        ema_slow = ema(close, 2.0 / (cfg['macd_slow'] + 1))
+        macd = ema_fast - ema_slow
+        macd[:cfg['macd_slow'] - 1] = np.nan
+        result['macd'] = macd
+        result['macd_signal'] = ema(macd, 2.0 / (cfg['macd_signal'] + 1), min_periods=cfg['macd_signal'])
+
+        bb_mid = rolling_mean(close, cfg['bb_window'])
+        bb_std = rolling_std(close, cfg['bb_window'])
+        result['bb_high'] = bb_mid + cfg['bb_dev'] * bb_std
+        result['bb_low'] = bb_mid - cfg['bb_dev'] * bb_std
+
+        result['atr'] = average_true_range(high, low, close, cfg['atr_window'])
+        return result
+
+    @metrics.timed('features.compute_matrix')
+    def compute_matrix(self, high, low, close):
+        """
+        Compute all indicators as one float32 (n, len(columns)) matrix, via the cache if set
+        """
+        def compute():
+            result = self.compute(high, low, close)
+            return np.column_stack([result[name] for name in self.columns]).astype(np.float32), self.columns
+
+        if self.cache is None:
+            return compute()[0]
+        matrix, _ = self.cache.get_or_compute([high, low, close], self.config, compute)
+        return matrix
+
+    def add_indicators(self, df):
+        """
+        Add float32 indicator columns to an OHLCV DataFrame in place
+        """
+        matrix = self.compute_matrix(df['high'].values, df['low'].values, df['close'].values)
+        for i, name in enumerate(self.columns):
+            df[name] = matrix[:, i]
+        return df
+
+    def stream(self, history=None):
+        """
+        Create a streaming state, optionally warmed up on (high, low, close) history rows
+        """
+        streaming = StreamingIndicators(self.config)
+        if history is not None:
+            for high, low, close in history:
+                streaming.update(high, low, close)
+        return streaming
+
+
+class _StreamingEMA:
+    """
+    Incremental ewm(adjust=False), seeded with the first value; NaN until min_periods values
+    """
+    def __init__(self, alpha, min_periods=1):
+        self.alpha = alpha
+        self.min_periods = min_periods
+        self.value = np.nan
+        self.count = 0
+
+    def update(self, x):
+        self.count += 1
+        if self.count == 1:
+            self.value = x
+        else:
+            self.value += self.alpha * (x - self.value)
+        return self.value if self.count >= self.min_periods else np.nan
+
+
+class _StreamingWindow:
+    """
+    Fixed-size trailing window with O(1) mean and population std
+
+    Mean and sum of squared deviations are updated on every push and
+    recomputed exactly from the buffer once per window to cancel drift.
+    """
+    def __init__(self, window):
+        self.window = window
+        self.buffer = deque(maxlen=window)
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.pushes = 0
+
+    def push(self, x):
+        self.pushes += 1
+        if len(self.buffer) < self.window:
+            self.buffer.append(x)
+            delta = x - self.mean
+            self.mean += delta / len(self.buffer)
+            self.m2 += delta * (x - self.mean)
+        else:
+            old = self.buffer[0]
+            self.buffer.append(x)
+            old_mean = self.mean
+            self.mean += (x - old) / self.window
+            self.m2 += (x - old) * (x - self.mean + old - old_mean)
+            if self.pushes % self.window == 0:
+                values = np.fromiter(self.buffer, dtype=np.float64, count=self.window)
+                self.mean = values.mean()
+                self.m2 = ((values - self.mean) ** 2).sum()
+
+    @property
+    def ready(self):
+        return len(self.buffer) == self.window
+
+    @property
+    def std(self):
+        return np.sqrt(max(self.m2, 0.0) / self.window)
+
+
+class StreamingIndicators:
+    """
+    O(1)-per-candle counterpart of IndicatorEngine.compute
+
+    Each update consumes one closed candle and returns the indicator row in
+    IndicatorEngine(config).columns order.
+    """
+    def __init__(self, config=None):
+        self.config = cfg = dict(DEFAULT_INDICATOR_CONFIG, **(config or {}))
+        self.ma = [_StreamingWindow(window) for window in cfg['ma_windows']]
+        self.rsi_up = _StreamingEMA(1.0 / cfg['rsi_window'], min_periods=cfg['rsi_window'])
+        self.rsi_down = _StreamingEMA(1.0 / cfg['rsi_window'], min_periods=cfg['rsi_window'])
+        self.ema_fast = _StreamingEMA(2.0 / (cfg['macd_fast'] + 1))
+        self.ema_slow = _StreamingEMA(2.0 / (cfg['macd_slow'] + 1), min_periods=cfg['macd_slow'])
+        self.macd_signal = _StreamingEMA(2.0 / (cfg['macd_signal'] + 1), min_periods=cfg['macd_signal'])
+        self.bb = _StreamingWindow(cfg['bb_window'])
+        self.atr_window = cfg['atr_window']
+        self.atr = np.nan
+        self.tr_sum = 0.0
+        self.count = 0
+        self.prev_close = np.nan
+
+    def update(self, high, low, close):
+        """
+        Consume one candle and return the latest indicator values
+        """
+        cfg = self.config
+        self.count += 1
+        row = []
+
+        for window in self.ma:
+            window.push(close)
+            row.append(window.mean if window.ready else np.nan)
+
+        diff = 0.0 if self.count == 1 else close - self.prev_close
+        up = self.rsi_up.update(max(diff, 0.0))
+        down = self.rsi_down.update(max(-diff, 0.0))
+        if np.isnan(up):
+            row.append(np.nan)
+        else:
+            row.append(100.0 if down == 0 else 100.0 - 100.0 / (1.0 + up / down))
+
+        fast = self.ema_fast.update(close)
+        slow = self.ema_slow.update(close)
+        if np.isnan(slow):
+            row.extend([np.nan, np.nan])
+        else:
+            macd = fast - slow
+            row.extend([macd, self.macd_signal.update(macd)])
+
+        self.bb.push(close)
+        if self.bb.ready:
+            band = cfg['bb_dev'] * self.bb.std
+            row.extend([self.bb.mean + band, self.bb.mean - band])
+        else:
+            row.extend([np.nan, np.nan])
+
+        if self.count == 1:
+            tr = high - low
+        else:
+            tr = max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+        if self.count < self.atr_window:
+            self.tr_sum += tr
+        elif self.count == self.atr_window:
+            self.atr = (self.tr_sum + tr) / self.atr_window
+        else:
+            self.atr += (tr - self.atr) / self.atr_window
+        row.append(self.atr)
+
+        self.prev_close = close
+        return np.array(row)
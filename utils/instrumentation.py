@@ -0,0 +1,405 @@
+# utils/instrumentation.py
+import bisect
+import collections
+import functools
+import json
+import logging
+import math
+import os
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds in seconds: 4 per decade from 1 microsecond to 100 seconds
+LATENCY_BUCKETS = tuple(10 ** (exponent / 4) for exponent in range(-24, 9))
+
+
+class Counter:
+    """
+    Monotonic event counter
+    """
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0
+
+    def add(self, amount=1):
+        self.value += amount
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket latency histogram
+
+    observe() is a bisect over LATENCY_BUCKETS plus a few additions, cheap
+    enough for per-bar and per-order paths. Percentiles are interpolated
+    inside the bucket, so they are accurate to the bucket width (~78%
+    steps, 4 buckets per decade).
+    """
+    __slots__ = ('bounds', 'counts', 'count', 'total', 'min', 'max')
+
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.clear()
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def clear(self):
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def percentile(self, q):
+        """
+        Approximate q-th percentile (0-100) in seconds
+        """
+        if not self.count:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = self.bounds[i - 1] if i > 0 else 0.0
+                upper = self.bounds[i] if i < len(self.bounds) else self.max
+                value = lower + (upper - lower) * (rank - seen) / bucket_count
+                return min(max(value, self.min), self.max)
+            seen += bucket_count
+        return self.max
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'sum_sec': self.total,
+            'mean_ms': self.total / self.count * 1000 if self.count else 0.0,
+            'min_ms': self.min * 1000 if self.count else 0.0,
+            'p50_ms': self.percentile(50) * 1000,
+            'p90_ms': self.percentile(90) * 1000,
+            'p99_ms': self.percentile(99) * 1000,
+            'max_ms': self.max * 1000
+        }
+
+
+class MetricsRegistry:
+    """
+    Named counters and latency histograms for the hot paths
+
+    Instruments are created on first use and live for the process. With
+    enabled False, timed() wrappers call straight through and observe() /
+    count() return immediately. Worker processes (subprocess envs, sweep
+    and tuning workers) have their own registry; only the parent's is
+    exported.
+    """
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.counters = {}
+        self.histograms = {}
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+
+    def counter(self, name):
+        counter = self.counters.get(name)
+        if counter is None:
+            with self._lock:
+                counter = self.counters.setdefault(name, Counter())
+        return counter
+
+    def histogram(self, name):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(name, LatencyHistogram())
+        return histogram
+
+    def count(self, name, amount=1):
+        if self.enabled:
+            self.counter(name).add(amount)
+
+    def observe(self, name, seconds):
+        if self.enabled:
+            self.histogram(name).observe(seconds)
+
+    def timed(self, name):
+        """
+        Decorator recording each call's duration in histogram name
+        """
+        def decorator(func):
+            histogram = self.histogram(name)
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    histogram.observe(time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def timer(self, name):
+        """
+        Context manager recording the duration of its block in histogram name
+        """
+        return _Timer(self, self.histogram(name))
+
+    def reset(self):
+        with self._lock:
+            for counter in self.counters.values():
+                counter.value = 0
+            for histogram in self.histograms.values():
+                histogram.clear()
+            self.started_at = time.time()
+
+    def snapshot(self):
+        """
+        Plain-dict view of every instrument, for JSON export
+        """
+        return {
+            'timestamp': time.time(),
+            'uptime_sec': time.time() - self.started_at,
+            'counters': {name: counter.value for name, counter in sorted(self.counters.items())},
+            'histograms': {
+                name: histogram.snapshot() for name, histogram in sorted(self.histograms.items()) if histogram.count
+            }
+        }
+
+    def write_json(self, path):
+        """
+        Atomically write the current snapshot to path
+        """
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.snapshot(), f, indent=2)
+        os.replace(tmp_path, path)
+
+    def prometheus_text(self):
+        """
+        Snapshot in the Prometheus text exposition format
+        """
+        lines = []
+        for name, counter in sorted(self.counters.items()):
+            metric = _prometheus_name(name) + '_total'
+            lines += [f'# TYPE {metric} counter', f'{metric} {counter.value}']
+        for name, histogram in sorted(self.histograms.items()):
+            metric = _prometheus_name(name) + '_seconds'
+            lines.append(f'# TYPE {metric} histogram')
+            cumulative = 0
+            for bound, bucket_count in zip(histogram.bounds, histogram.counts):
+                cumulative += bucket_count
+                lines.append(f'{metric}_bucket{{le="{bound:.6g}"}} {cumulative}')
+            lines.append(f'{metric}_bucket{{le="+Inf"}} {histogram.count}')
+            lines += [f'{metric}_sum {histogram.total}', f'{metric}_count {histogram.count}']
+        return '\n'.join(lines) + '\n'
+
+
+class _Timer:
+    __slots__ = ('registry', 'histogram', 'start')
+
+    def __init__(self, registry, histogram):
+        self.registry = registry
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.registry.enabled:
+            self.histogram.observe(time.perf_counter() - self.start)
+
+
+def _prometheus_name(name):
+    return 'trading_' + ''.join(c if c.isalnum() else '_' for c in name)
+
+
+# Process-wide registry used by the instrumented modules
+metrics = MetricsRegistry()
+
+
+class MetricsExporter:
+    """
+    Periodically write the registry to a JSON file and/or serve it over HTTP
+
+    The endpoint answers /metrics (Prometheus text) and /metrics.json on
+    localhost; port 0 picks a free port (see self.port).
+    """
+    def __init__(self, registry=metrics, path=None, interval=60.0, port=None, host='127.0.0.1'):
+        self.registry = registry
+        self.path = path
+        self.interval = interval
+        self.port = port
+        self.host = host
+        self._stop = threading.Event()
+        self._thread = None
+        self._server = None
+
+    def start(self):
+        if self.path:
+            self._thread = threading.Thread(target=self._run, name='metrics-exporter', daemon=True)
+            self._thread.start()
+        if self.port is not None:
+            self._start_server()
+        return self
+
+    def stop(self):
+        """
+        Stop exporting and write a final snapshot
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        if self.path:
+            self.registry.write_json(self.path)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.registry.write_json(self.path)
+            except OSError as e:
+                logger.warning(f"Metrics export to {self.path} failed: {e}")
+
+    def _start_server(self):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == '/metrics':
+                    body, content_type = registry.prometheus_text(), 'text/plain; version=0.0.4'
+                elif self.path == '/metrics.json':
+                    body, content_type = json.dumps(registry.snapshot()), 'application/json'
+                else:
+                    self.send_error(404)
+                    return
+                body = body.encode()
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, name='metrics-endpoint', daemon=True).start()
+        logger.info(f"Serving metrics on http://{self.host}:{self.port}/metrics")
+
+
+class SamplingProfiler:
+    """
+    Wall-clock sampling profiler producing folded stacks
+
+    A background thread snapshots every other thread's Python stack each
+    interval seconds and counts identical stacks. write() emits one
+    'thread;outer;...;inner count' line per stack, the input format of
+    flamegraph.pl and speedscope. Blocked threads are sampled too, so the
+    profile shows where wall time goes (including waits on I/O).
+    """
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.samples = collections.Counter()
+        self.n_samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.samples[';'.join(reversed(stack))] += 1
+            self.n_samples += 1
+
+    def write(self, path):
+        """
+        Write the folded stacks, heaviest first
+        """
+        with open(path, 'w') as f:
+            for stack, count in self.samples.most_common():
+                f.write(f'{stack} {count}\n')
+        logger.info(f"Wrote {self.n_samples} profile samples to {path}")
+
+
+class Monitoring:
+    """
+    Instrumentation for one run, configured from MONITORING_PARAMS
+
+    start() resets the registry, starts the exporter and, when 'profile' is
+    set, the sampling profiler; stop() writes the final metrics file and
+    the profile dump.
+    """
+    def __init__(self, monitoring_params, registry=metrics):
+        self.params = monitoring_params
+        self.registry = registry
+        self.exporter = None
+        self.profiler = None
+
+    def start(self):
+        params = self.params
+        self.registry.enabled = params.get('enabled', True)
+        self.registry.reset()
+        if self.registry.enabled and (params.get('metrics_path') or params.get('metrics_port') is not None):
+            self.exporter = MetricsExporter(
+                self.registry,
+                params.get('metrics_path'),
+                params.get('export_interval', 60.0),
+                params.get('metrics_port')
+            ).start()
+        if params.get('profile'):
+            self.profiler = SamplingProfiler(params.get('profile_interval', 0.005)).start()
+        return self
+
+    def stop(self):
+        if self.exporter is not None:
+            self.exporter.stop()
+        if self.profiler is not None:
+            self.profiler.stop()
+            self.profiler.write(self.params.get('profile_path', 'profile.folded'))
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
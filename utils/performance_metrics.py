@@ -1,36 +1,291 @@
 # utils/performance_metrics.py
 import numpy as np
-import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from utils.instrumentation import metrics
+
+_TIMEFRAME_MINUTES = {'m': 1, 'h': 60, 'd': 1440, 'w': 10080}
+
+
+def timeframe_minutes(timeframe='1m'):
+    """
+    Length of a ccxt-style timeframe ('1m', '15m', '4h', '1d', ...) in minutes
+    """
+    return int(timeframe[:-1]) * _TIMEFRAME_MINUTES[timeframe[-1]]
+
+
+def periods_per_year(timeframe='1m'):
+    """
+    Number of bars per year for a ccxt-style timeframe ('1m', '15m', '4h', '1d', ...)
+    """
+    return 365 * 24 * 60 / timeframe_minutes(timeframe)
+
+
+def _per_period_rate(annual_rate, periods):
+    return (1 + annual_rate) ** (1 / periods) - 1
+
+
+# Annualized log growth cap: compounding a few minute bars over a year would otherwise overflow
+_MAX_LOG_GROWTH = np.log(1e6)
+
+
+def _annualize(growth, periods, periods_per_year):
+    """
+    Annualized return of total growth over periods bars, in log space and capped at 1e6 - 1
+    """
+    if growth <= 0:
+        return -1.0
+    log_growth = periods_per_year / periods * np.log(growth)
+    return float(np.expm1(np.clip(log_growth, -_MAX_LOG_GROWTH, _MAX_LOG_GROWTH)))
+
 
 class PerformanceMetrics:
+    """
+    Vectorized performance metrics over equity curves and per-bar returns
+
+    Ratios are annualized with periods_per_year (bars per year); the annual
+    risk-free rate is converted to a per-bar rate before it is subtracted.
+    """
     @staticmethod
-    def sharpe_ratio(returns, risk_free_rate=0.02):
+    def returns(portfolio_values):
         """
-        Calculate Sharpe Ratio
+        Simple per-bar returns of an equity curve
         """
-        return (np.mean(returns) - risk_free_rate) / np.std(returns)
-    
+        values = np.asarray(portfolio_values, dtype=np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns = np.diff(values) / values[:-1]
+        return np.nan_to_num(returns, nan=0.0, posinf=0.0, neginf=0.0)
+
+    @staticmethod
+    def sharpe_ratio(returns, risk_free_rate=0.02, periods_per_year=525600):
+        """
+        Calculate annualized Sharpe Ratio
+        """
+        excess = np.asarray(returns, dtype=np.float64) - _per_period_rate(risk_free_rate, periods_per_year)
+        std = excess.std()
+        if std == 0:
+            return 0.0
+        return float(excess.mean() / std * np.sqrt(periods_per_year))
+
+    @staticmethod
+    def sortino_ratio(returns, risk_free_rate=0.02, periods_per_year=525600):
+        """
+        Calculate annualized Sortino Ratio (downside deviation of excess returns)
+        """
+        excess = np.asarray(returns, dtype=np.float64) - _per_period_rate(risk_free_rate, periods_per_year)
+        downside = np.sqrt(np.mean(np.minimum(excess, 0.0) ** 2)) if len(excess) else 0.0
+        if downside == 0:
+            return 0.0
+        return float(excess.mean() / downside * np.sqrt(periods_per_year))
+
+    @staticmethod
+    def drawdown(portfolio_values):
+        """
+        Drawdown from the running peak at every bar, as a fraction
+        """
+        values = np.asarray(portfolio_values, dtype=np.float64)
+        peak = np.maximum.accumulate(values)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(peak > 0, (peak - values) / peak, 0.0)
+
     @staticmethod
     def max_drawdown(portfolio_values):
         """
-        Calculate Maximum Drawdown
+        Calculate Maximum Drawdown (percent)
+        """
+        if len(portfolio_values) == 0:
+            return 0.0
+        return float(PerformanceMetrics.drawdown(portfolio_values).max() * 100)
+
+    @staticmethod
+    def annualized_return(portfolio_values, periods_per_year=525600):
+        """
+        Compound annual growth rate of an equity curve
+
+        Computed in log space and capped at 1e6 - 1, so short histories stay finite.
         """
-        peak = portfolio_values[0]
-        max_drawdown = 0
-        
-        for value in portfolio_values[1:]:
-            if value > peak:
-                peak = value
-            drawdown = (peak - value) / peak
-            max_drawdown = max(max_drawdown, drawdown)
-        
-        return max_drawdown * 100
-    
+        values = np.asarray(portfolio_values, dtype=np.float64)
+        if len(values) < 2 or values[0] <= 0:
+            return 0.0
+        return _annualize(max(values[-1], 0.0) / values[0], len(values) - 1, periods_per_year)
+
     @staticmethod
-    def sortino_ratio(returns, risk_free_rate=0.02):
+    def calmar_ratio(portfolio_values, periods_per_year=525600):
         """
-        Calculate Sortino Ratio
+        Calculate Calmar Ratio (annualized return over maximum drawdown)
         """
-        negative_returns = returns[returns < 0]
-        return (np.mean(returns) - risk_free_rate) / np.std(negative_returns)
+        max_drawdown = PerformanceMetrics.max_drawdown(portfolio_values) / 100
+        if max_drawdown == 0:
+            return 0.0
+        return PerformanceMetrics.annualized_return(portfolio_values, periods_per_year) / max_drawdown
+
+    @staticmethod
+    def turnover(traded_notional, portfolio_values, periods_per_year=525600):
+        """
+        Annualized turnover: traded notional per year relative to average equity
+        """
+        values = np.asarray(portfolio_values, dtype=np.float64)
+        mean_equity = values.mean() if len(values) else 0.0
+        if mean_equity <= 0 or len(values) < 2:
+            return 0.0
+        years = (len(values) - 1) / periods_per_year
+        return float(np.sum(np.abs(traded_notional)) / mean_equity / years)
+
+    @staticmethod
+    def hit_rate(trade_pnls):
+        """
+        Fraction of closed trades with a positive PnL
+        """
+        trade_pnls = np.asarray(trade_pnls, dtype=np.float64)
+        if len(trade_pnls) == 0:
+            return 0.0
+        return float(np.mean(trade_pnls > 0))
+
+    @staticmethod
+    def rolling_sharpe(returns, window, risk_free_rate=0.02, periods_per_year=525600):
+        """
+        Annualized Sharpe Ratio over a trailing window, NaN for the first window - 1 bars
+        """
+        import pandas as pd
+
+        excess = pd.Series(np.asarray(returns, dtype=np.float64) - _per_period_rate(risk_free_rate, periods_per_year))
+        mean = excess.rolling(window).mean().values
+        std = excess.rolling(window).std(ddof=0).values
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = np.where(std > 0, mean / std, 0.0) * np.sqrt(periods_per_year)
+        ratio[np.isnan(mean)] = np.nan
+        return ratio
+
+    @staticmethod
+    def rolling_sortino(returns, window, risk_free_rate=0.02, periods_per_year=525600):
+        """
+        Annualized Sortino Ratio over a trailing window, NaN for the first window - 1 bars
+        """
+        import pandas as pd
+
+        excess = np.asarray(returns, dtype=np.float64) - _per_period_rate(risk_free_rate, periods_per_year)
+        mean = pd.Series(excess).rolling(window).mean().values
+        downside = np.sqrt(pd.Series(np.minimum(excess, 0.0) ** 2).rolling(window).mean().values)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = np.where(downside > 0, mean / downside, 0.0) * np.sqrt(periods_per_year)
+        ratio[np.isnan(mean)] = np.nan
+        return ratio
+
+    @staticmethod
+    def rolling_max_drawdown(portfolio_values, window):
+        """
+        Maximum drawdown (percent) inside each trailing window of window bars
+        """
+        values = np.asarray(portfolio_values, dtype=np.float64)
+        out = np.full(len(values), np.nan)
+        if len(values) < window:
+            return out
+
+        windows = sliding_window_view(values, window)
+        # Process windows in blocks so the (rows, window) temporaries stay bounded
+        block = max(1, (1 << 22) // window)
+        for start in range(0, len(windows), block):
+            chunk = windows[start:start + block]
+            peaks = np.maximum.accumulate(chunk, axis=1)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                drawdowns = np.where(peaks > 0, (peaks - chunk) / peaks, 0.0)
+            out[window - 1 + start:window - 1 + start + len(chunk)] = drawdowns.max(axis=1) * 100
+        return out
+
+    @staticmethod
+    @metrics.timed('metrics.summary')
+    def summary(portfolio_values, trade_pnls=(), traded_notional=(), risk_free_rate=0.02, periods_per_year=525600):
+        """
+        All headline metrics for one equity curve
+        """
+        returns = PerformanceMetrics.returns(portfolio_values)
+        return {
+            'sharpe_ratio': PerformanceMetrics.sharpe_ratio(returns, risk_free_rate, periods_per_year),
+            'sortino_ratio': PerformanceMetrics.sortino_ratio(returns, risk_free_rate, periods_per_year),
+            'calmar_ratio': PerformanceMetrics.calmar_ratio(portfolio_values, periods_per_year),
+            'annualized_return': PerformanceMetrics.annualized_return(portfolio_values, periods_per_year),
+            'max_drawdown': PerformanceMetrics.max_drawdown(portfolio_values),
+            'turnover': PerformanceMetrics.turnover(traded_notional, portfolio_values, periods_per_year),
+            'hit_rate': PerformanceMetrics.hit_rate(trade_pnls)
+        }
+
+
+class StreamingMetrics:
+    """
+    O(1)-per-bar accumulator of the PerformanceMetrics headline figures
+
+    Feed it the account equity once per bar (and closed trades as they
+    happen); snapshot() returns the same keys as PerformanceMetrics.summary.
+    """
+    def __init__(self, risk_free_rate=0.02, periods_per_year=525600):
+        self.risk_free_rate = risk_free_rate
+        self.periods_per_year = periods_per_year
+        self._rf = _per_period_rate(risk_free_rate, periods_per_year)
+        self.first_value = None
+        self.last_value = None
+        self.peak = -np.inf
+        self.max_drawdown_fraction = 0.0
+        self.bars = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._downside_sq = 0.0
+        self._equity_sum = 0.0
+        self.traded_notional = 0.0
+        self.closed_trades = 0
+        self.winning_trades = 0
+
+    def update(self, equity):
+        """
+        Consume the equity value of one bar
+        """
+        equity = float(equity)
+        if self.last_value is None:
+            self.first_value = equity
+        else:
+            ret = (equity - self.last_value) / self.last_value if self.last_value else 0.0
+            excess = ret - self._rf
+            self.bars += 1
+            delta = excess - self._mean
+            self._mean += delta / self.bars
+            self._m2 += delta * (excess - self._mean)
+            if excess < 0:
+                self._downside_sq += excess * excess
+
+        self.last_value = equity
+        self._equity_sum += equity
+        if equity > self.peak:
+            self.peak = equity
+        if self.peak > 0:
+            self.max_drawdown_fraction = max(self.max_drawdown_fraction, (self.peak - equity) / self.peak)
+
+    def record_trade(self, notional, pnl=None):
+        """
+        Record traded notional, and the PnL when the trade closes a position
+        """
+        self.traded_notional += abs(notional)
+        if pnl is not None:
+            self.closed_trades += 1
+            self.winning_trades += pnl > 0
+
+    def snapshot(self):
+        """
+        Current metrics, same keys as PerformanceMetrics.summary
+        """
+        ppy = self.periods_per_year
+        std = np.sqrt(self._m2 / self.bars) if self.bars else 0.0
+        downside = np.sqrt(self._downside_sq / self.bars) if self.bars else 0.0
+        n_values = self.bars + 1 if self.last_value is not None else 0
+
+        annualized_return = 0.0
+        if self.bars and self.first_value and self.first_value > 0:
+            annualized_return = _annualize(max(self.last_value, 0.0) / self.first_value, self.bars, ppy)
+        mean_equity = self._equity_sum / n_values if n_values else 0.0
 
+        return {
+            'sharpe_ratio': float(self._mean / std * np.sqrt(ppy)) if std > 0 else 0.0,
+            'sortino_ratio': float(self._mean / downside * np.sqrt(ppy)) if downside > 0 else 0.0,
+            'calmar_ratio': annualized_return / self.max_drawdown_fraction if self.max_drawdown_fraction else 0.0,
+            'annualized_return': annualized_return,
+            'max_drawdown': self.max_drawdown_fraction * 100,
+            'turnover': self.traded_notional / mean_equity / (self.bars / ppy) if self.bars and mean_equity > 0 else 0.0,
+            'hit_rate': self.winning_trades / self.closed_trades if self.closed_trades else 0.0
+        }
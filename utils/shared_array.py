@@ -0,0 +1,53 @@
+# utils/shared_array.py
+import os
+import tempfile
+import uuid
+import numpy as np
+
+
+class SharedArray:
+    """
+    Read-only NumPy array shared between processes through a memory-mapped .npy file
+
+    Pickling a SharedArray only sends the file path, so worker processes map
+    the same pages instead of receiving a copy of the data. The file lives in
+    /dev/shm when available (RAM-backed on Linux).
+    """
+    def __init__(self, array, directory=None, dtype=np.float32):
+        if directory is None:
+            directory = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+        self.path = os.path.join(directory, f'shared_array_{uuid.uuid4().hex}.npy')
+        self.owner = True
+        np.save(self.path, np.ascontiguousarray(array, dtype=dtype))
+        self._array = None
+
+    @property
+    def array(self):
+        """
+        The shared data, mapped into this process on first access
+        """
+        if self._array is None:
+            self._array = np.load(self.path, mmap_mode='r')
+        return self._array
+
+    def unlink(self):
+        """
+        Delete the backing file; processes that already mapped it keep their view
+        """
+        self._array = None
+        if self.owner and os.path.exists(self.path):
+            os.remove(self.path)
+
+    def __getstate__(self):
+        return {'path': self.path}
+
+    def __setstate__(self, state):
+        self.path = state['path']
+        self.owner = False
+        self._array = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.unlink()